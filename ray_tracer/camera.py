@@ -99,6 +99,8 @@ class Camera:
     def render(self, world: World, parallel_render: bool = False) -> Canvas:
         image_start = time.perf_counter()
 
+        world.prepare()
+
         if parallel_render:
             image = self.render_parallel(world, BLOCK_SIZE)
         else:
@@ -11,6 +11,10 @@ class AbstractTuple(ABC):
     """An abstract class representing the basic operations permissible
     by all Tuple based objects"""
 
+    # Points, vectors and colours are created in huge numbers, so they have slots
+    # rather than an instance dictionary
+    __slots__ = ("x", "y", "z", "w")
+
     x: float
     y: float
     z: float
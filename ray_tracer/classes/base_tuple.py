@@ -8,7 +8,15 @@ from .abstract_tuple import AbstractTuple
 
 
 class Tuple(AbstractTuple):
-    """Base tuple class used by points and vectors"""
+    """Base tuple class used by points and vectors.
+
+    Calling Tuple(x, y, z, w) directly acts as a factory, checking w to give back a
+    Point (w of 1), a Vector (w of 0) or otherwise a plain Tuple.  Points and vectors
+    themselves are built directly by Point(x, y, z) and Vector(x, y, z) (or Point.of()
+    and Vector.of() in hot paths) and override the arithmetic below with versions that
+    don't need to work out what kind of tuple they're dealing with"""
+
+    __slots__ = ()
 
     def __init__(self, x: float, y: float, z: float, w: float) -> None:
         self.x = x
@@ -17,13 +25,16 @@ class Tuple(AbstractTuple):
         self.w = w
 
     def __new__(cls, x: float, y: float, z: float, w: float | None = None) -> Tuple:
+        # Subclasses (Point/Vector) are simply built as what was asked for
+        if cls is not Tuple:
+            return object.__new__(cls)
+
         # Import Point/Vector lazily to avoid circular imports during module
         # initialization (point.py and vector.py import this module).
         from .point import Point
         from .vector import Vector
 
-        # If the caller omitted the `w` value (common when subclass
-        # constructors call into Tuple), return an instance of the requested
+        # If the caller omitted the `w` value, return an instance of the requested
         # runtime class directly.
         if w is None:
             return object.__new__(cls)  # type: ignore
@@ -84,32 +95,7 @@ class Tuple(AbstractTuple):
         )
 
     def __neg__(self: Self) -> Self:
-        # Preserve the runtime subclass (Point/Vector/Tuple) when negating.
-        # Point/Vector constructors accept only (x, y, z) at runtime, so
-        # call the runtime class with three args for those types and use
-        # Tuple(...) for any plain Tuple instances.
-        from .point import Point
-        from .vector import Vector
-
-        if isinstance(self, (Point, Vector)):
-            # Call the concrete constructors explicitly so the type checker
-            # sees a matching signature.
-            if isinstance(self, Point):
-                return Point(-self.x, -self.y, -self.z)
-            return Vector(-self.x, -self.y, -self.z)
-
-        # Explicitly cast to Self for the type checker; at runtime this
-        # constructs a plain Tuple which is compatible with Self when the
-        # actual instance is Tuple.
-        return cast(
-            Self,
-            Tuple(
-                -self.x,
-                -self.y,
-                -self.z,
-                -self.w,
-            ),
-        )
+        return cast(Self, Tuple(-self.x, -self.y, -self.z, -self.w))
 
     @overload
     def __mul__(self: Self, other: float) -> Self: ...
@@ -118,19 +104,10 @@ class Tuple(AbstractTuple):
     def __mul__(self: Self, other: float | AbstractTuple) -> Self: ...
 
     def __mul__(self: Self, other: float | AbstractTuple) -> Self:
-        # Preserve the runtime subclass when multiplying by a scalar.
-        from .point import Point
-        from .vector import Vector
-
         # It's only legal to multiply points and vectors by scalars in this method
         if not isinstance(other, (float, int)):
             raise NotImplementedError
 
-        if isinstance(self, (Point, Vector)):
-            if isinstance(self, Point):
-                return Point(self.x * other, self.y * other, self.z * other)
-            return Vector(self.x * other, self.y * other, self.z * other)
-
         return cast(
             Self,
             Tuple(
@@ -147,13 +124,6 @@ class Tuple(AbstractTuple):
     def __truediv__(self: Self, other: float) -> Self:
         if math.isclose(other, 0.0, rel_tol=EPSILON):
             raise ZeroDivisionError
-        from .point import Point
-        from .vector import Vector
-
-        if isinstance(self, (Point, Vector)):
-            if isinstance(self, Point):
-                return Point(self.x / other, self.y / other, self.z / other)
-            return Vector(self.x / other, self.y / other, self.z / other)
 
         return cast(
             Self,
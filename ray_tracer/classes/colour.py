@@ -6,12 +6,29 @@ from ray_tracer.utils import clamp
 
 from .abstract_tuple import AbstractTuple
 
+_new = object.__new__
+
 
 class Colour(AbstractTuple):
     """Defines an RGB colour"""
 
+    __slots__ = ()
+
     def __init__(self, r: float, g: float, b: float) -> None:
-        super().__init__(x=r, y=g, z=b, w=1.0)
+        self.x = r
+        self.y = g
+        self.z = b
+        self.w = 1.0
+
+    @staticmethod
+    def of(r: float, g: float, b: float) -> Colour:
+        """Builds a colour without going through the constructor, for hot paths"""
+        c = _new(Colour)
+        c.x = r
+        c.y = g
+        c.z = b
+        c.w = 1.0
+        return c
 
     def __repr__(self: Self) -> str:
         return f"{self.__class__.__name__}(r={self.r}, g={self.g}, b={self.b})"
@@ -50,21 +67,13 @@ class Colour(AbstractTuple):
         if not isinstance(other, Colour):
             raise NotImplementedError
 
-        return Colour(
-            self.r + other.r,
-            self.g + other.g,
-            self.b + other.b,
-        )
+        return Colour.of(self.x + other.x, self.y + other.y, self.z + other.z)
 
     def __sub__(self, other: AbstractTuple) -> AbstractTuple:
         if not isinstance(other, Colour):
             raise NotImplementedError
 
-        return Colour(
-            self.r - other.r,
-            self.g - other.g,
-            self.b - other.b,
-        )
+        return Colour.of(self.x - other.x, self.y - other.y, self.z - other.z)
 
     def __neg__(self) -> Self:
         raise NotImplementedError
@@ -85,27 +94,19 @@ class Colour(AbstractTuple):
             )
 
         return (
-            Colour(
-                self.r * other.r,
-                self.g * other.g,
-                self.b * other.b,
-            )
+            Colour.of(self.x * other.x, self.y * other.y, self.z * other.z)
             if isinstance(other, Colour)
-            else Colour(
-                self.r * other,
-                self.g * other,
-                self.b * other,
-            )
+            else Colour.of(self.x * other, self.y * other, self.z * other)
         )
 
     def __truediv__(self, other: float) -> Self:
         if math.isclose(other, 0, abs_tol=EPSILON):
             raise ZeroDivisionError
 
-        return Colour(self.r / other, self.g / other, self.b / other)
+        return Colour.of(self.x / other, self.y / other, self.z / other)
 
     def clamp(self) -> Self:
-        return Colour(
+        return Colour.of(
             clamp(self.x, 0, 1),
             clamp(self.y, 0, 1),
             clamp(self.z, 0, 1),
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from typing import cast
 
 from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.material import Material
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.vector import Vector
@@ -17,7 +18,11 @@ class Computation:
 
     t: float
     obj: AbstractObject
+    material: Material
     point: Point
+    # The object whose patterns are seen at the hit, and where the hit is for it
+    surface: AbstractObject
+    surface_point: Point
     over_point: Point
     under_point: Point
     eyev: Vector
@@ -36,7 +41,9 @@ class Computation:
 
         self.t = hit.t
         self.obj = hit.obj
+        self.material = hit.obj.material_for(hit)
         self.point = ray.position(self.t)
+        self.surface, self.surface_point = hit.obj.surface_for(hit, self.point)
         self.eyev = -ray.direction
         self.normalv = self.obj.normal_at(self.point, hit)
 
@@ -51,21 +58,27 @@ class Computation:
 
         # Compute for transparent/refractive surfaces
         containers: list[AbstractObject] = []
+        materials: dict[AbstractObject, Material] = {}
 
         for i in xs:
             if i == hit:
                 self.n1 = (
-                    1.0 if not containers else containers[-1].material.refractive_index
+                    1.0
+                    if not containers
+                    else materials[containers[-1]].refractive_index
                 )
 
             if i.obj in containers:
                 containers.remove(i.obj)
             else:
                 containers.append(i.obj)
+                materials[i.obj] = i.obj.material_for(i)
 
             if i == hit:
                 self.n2 = (
-                    1.0 if not containers else containers[-1].material.refractive_index
+                    1.0
+                    if not containers
+                    else materials[containers[-1]].refractive_index
                 )
                 break
 
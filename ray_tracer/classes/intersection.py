@@ -6,12 +6,18 @@ if TYPE_CHECKING:
     from ray_tracer.objects.abstract_object import AbstractObject
 
 
-@dataclass
+# Renders make a great many of these, so they're slotted to keep them small and
+# quick to create
+@dataclass(slots=True)
 class Intersection:
     t: float
     obj: "AbstractObject"
     u: float | None = None
     v: float | None = None
+    # For hits on an Instance, the hit on the shared shape in the instance's space
+    inner: Intersection | None = None
+    # For hits on a TriangleMesh, the index of the triangle that was hit
+    face: int | None = None
 
     @staticmethod
     def hit(intersections: list[Intersection]) -> Optional[Intersection]:
@@ -1,6 +1,7 @@
 import math
-from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, cast
+from dataclasses import dataclass, field, fields, replace
+from typing import TYPE_CHECKING, ClassVar, Iterable, cast
+from weakref import WeakValueDictionary
 
 from ray_tracer.classes.colour import Colour, Colours
 from ray_tracer.classes.point import Point
@@ -11,6 +12,7 @@ if TYPE_CHECKING:
     from ray_tracer.objects.abstract_object import AbstractObject
 
 from ray_tracer.patterns.abstract_pattern import AbstractPattern
+from ray_tracer.patterns.compiled import compiled
 
 
 @dataclass
@@ -25,6 +27,82 @@ class Material:
     refractive_index: float = 1.0
     cast_shadows: bool = True
 
+    # Set by freeze().  It isn't a field, so plays no part in comparisons
+    _frozen: ClassVar[bool] = False
+
+    def __setattr__(self, name: str, value: object) -> None:
+        if self._frozen:
+            raise AttributeError("A frozen material can't be changed, use a copy")
+
+        object.__setattr__(self, name, value)
+
+        # A copy handed out for a frozen material (see copy_for()) takes its place
+        # once it's changed
+        pending = self.__dict__.pop("_pending", None)
+
+        if pending is not None:
+            owner, original = pending
+
+            if owner._material is original:
+                owner.material = self
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> Material:
+        """Stops the material from being changed, so that it can be shared by any
+        number of objects, and returns it"""
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    def copy(self) -> Material:
+        """A copy of the material which can be changed"""
+        return replace(self)
+
+    def __reduce_ex__(self, protocol: object) -> object:
+        # Objects tell the shared default from materials of their own by identity, so
+        # it has to come through pickling (eg: to the workers of a parallel render)
+        # as the very same material
+        if self is DEFAULT_MATERIAL:
+            return "DEFAULT_MATERIAL"
+
+        return super().__reduce_ex__(protocol)  # type: ignore[arg-type]
+
+    def copy_for(self, owner: "AbstractObject") -> Material:
+        """A copy of the material which becomes owner's material in place of this one
+        the first time it's changed, unless owner has been given another material by
+        then"""
+        m = self.copy()
+        object.__setattr__(m, "_pending", (owner, self))
+        return m
+
+    def claim(self) -> None:
+        """Stops a copy from copy_for() replacing its owner's material, as it has been
+        given to an object itself"""
+        self.__dict__.pop("_pending", None)
+
+    def interned(self) -> Material:
+        """The frozen material shared by every material with the same settings as
+        this one (a frozen copy of this one if it's the first).  Giving many objects
+        (eg: the triangles of a mesh) interned materials leaves them all referring to
+        one Material rather than one each.  Patterns are matched by identity.  A
+        material is only kept while something refers to it"""
+        key = tuple(_hashable(getattr(self, f.name)) for f in fields(self))
+        m = _interned.get(key)
+
+        if m is None:
+            m = _interned[key] = self if self.frozen else self.copy().freeze()
+
+        return m
+
+    def surface_colour(self, obj: "AbstractObject", point: Point) -> Colour:
+        """The colour of the material at point (in world space) on obj"""
+        if isinstance(self.colour, AbstractPattern):
+            return compiled(self.colour, obj).colour_at(point)
+
+        return self.colour
+
     def lighting(
         self,
         obj: "AbstractObject",
@@ -34,13 +112,53 @@ class Material:
         normal_vector: Vector,
         in_shadow: bool = False,
     ) -> Colour:
-        # Combine the surface colour with the light's colour/intensity
-        if isinstance(self.colour, AbstractPattern):
-            effective_colour: Colour = self.colour.colour_at_object(obj, point)
-        else:
-            effective_colour: Colour = self.colour
+        return self._lighting(
+            self.surface_colour(obj, point),
+            light,
+            point,
+            eye_vector,
+            normal_vector,
+            in_shadow,
+        )
 
-        effective_colour *= light.intensity
+    def shade(
+        self,
+        obj: "AbstractObject",
+        lights: Iterable[Light],
+        point: Point,
+        eye_vector: Vector,
+        normal_vector: Vector,
+        in_shadow: bool = False,
+        surface_point: Point | None = None,
+    ) -> Colour:
+        """The sum of lighting() for each of the lights.  The surface colour (which
+        for a pattern means taking the point into the object's and the pattern's
+        space) is only found once, however many lights there are.  It's found at
+        surface_point, if that's given, rather than point (see
+        AbstractObject.surface_for())"""
+        surface = self.surface_colour(
+            obj, point if surface_point is None else surface_point
+        )
+        total = Colours.BLACK
+
+        for light in lights:
+            total += self._lighting(
+                surface, light, point, eye_vector, normal_vector, in_shadow
+            )
+
+        return total
+
+    def _lighting(
+        self,
+        surface: Colour,
+        light: Light,
+        point: Point,
+        eye_vector: Vector,
+        normal_vector: Vector,
+        in_shadow: bool,
+    ) -> Colour:
+        # Combine the surface colour with the light's colour/intensity
+        effective_colour: Colour = surface * light.intensity
 
         # find the direction to the light source
         lightv: Vector = cast(Vector, light.position - point).normalize()
@@ -75,3 +193,19 @@ class Material:
 
         # combine the three contributions to get the final shading
         return (ambient + diffuse + specular).clamp()
+
+
+def _hashable(value: object) -> object:
+    """Colours don't hash, so they are keyed by their components"""
+    if isinstance(value, Colour):
+        return (value.red, value.green, value.blue)
+
+    return value
+
+
+# The materials returned by Material.interned() which are still in use, by their
+# settings
+_interned: WeakValueDictionary[tuple[object, ...], Material] = WeakValueDictionary()
+
+# Shared by every object until it is given (or changes) a material of its own
+DEFAULT_MATERIAL = Material().freeze()
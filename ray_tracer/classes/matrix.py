@@ -1,4 +1,5 @@
 import math
+from typing import override
 
 import numpy as np
 from numpy.linalg import LinAlgError
@@ -44,17 +45,20 @@ class Matrix:
         return np.allclose(self.data, other.data, atol=EPSILON)
 
     def __mul__(self, other: object) -> Matrix | Tuple | Point | Vector:
-        if isinstance(other, (Tuple, Point, Vector)):
-            t = Tuple(
-                *np.matmul(self.data, np.array([other.x, other.y, other.z, other.w]))
-            )
+        if isinstance(other, (Point, Vector)):
+            x, y, z, _ = np.matmul(
+                self.data, (other.x, other.y, other.z, other.w)
+            ).tolist()
 
             if isinstance(other, Point):
-                return Point(t.x, t.y, t.z)
-            elif isinstance(other, Vector):
-                return Vector(t.x, t.y, t.z)
+                return Point.of(x, y, z)
             else:
-                return t
+                return Vector.of(x, y, z)
+
+        elif isinstance(other, Tuple):
+            return Tuple(
+                *np.matmul(self.data, np.array([other.x, other.y, other.z, other.w]))
+            )
 
         elif isinstance(other, Matrix):
             return Matrix(np.matmul(self.data, other.data))
@@ -86,6 +90,11 @@ class Matrix:
         m = self.minor(row, col)
         return m if (row + col) % 2 == 0 else -m
 
+    def is_identity(self) -> bool:
+        """True only for an exact identity matrix (unlike ==, which allows for small
+        differences)"""
+        return np.array_equal(self.data, np.identity(len(self.data)))
+
     def is_invertible(self) -> bool:
         return not math.isclose(self.det(), 0, rel_tol=EPSILON)
 
@@ -95,7 +104,189 @@ class Matrix:
 
         return Matrix(np.linalg.inv(self.data))
 
+    # Transforming many points, vectors or normals at once: each takes an (N, 3) array
+    # and returns a new (N, 3) array, with the same arithmetic as multiplying each by
+    # the matrix in turn but without making a Point or Vector for every row
+
+    def apply_points(self, points: np.ndarray) -> np.ndarray:
+        return points @ self.data[:3, :3].T + self.data[:3, 3]
+
+    def apply_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        return vectors @ self.data[:3, :3].T
+
+    def apply_normals(self, normals: np.ndarray) -> np.ndarray:
+        """Normals are carried across by the inverse transpose, as in
+        AbstractObject.normal_to_world(), but aren't normalised"""
+        return normals @ self.inverse().data[:3, :3]
+
     @classmethod
     def Identity(cls, size: int = 4) -> Matrix:
-        """Return the identity matrix of a given size (default 4x4)"""
+        """Return the identity matrix of a given size (default 4x4).  The 4x4 identity
+        is an AffineMatrix, so anything built up from it stays affine"""
+        if size == 4:
+            return AffineMatrix._wrap(np.identity(4))
+
         return Matrix(np.identity(size).tolist())
+
+
+_BOTTOM_ROW = np.array([0.0, 0.0, 0.0, 1.0])
+
+
+class AffineMatrix(Matrix):
+    """A 4x4 matrix whose bottom row is always [0, 0, 0, 1]: any combination of
+    translation, scaling, rotation and shearing, which covers every transform in the
+    ray tracer.
+
+    Such a matrix is really a 3x3 matrix and a translation, so it can be inverted in
+    closed form and applied to points and vectors with a dozen plain float
+    multiplications rather than a trip through NumPy.  The top three rows are kept as
+    floats for this alongside the usual array; they are refreshed when an element is
+    set, so the array shouldn't be written to directly.  The inverse is worked out
+    once and kept (it's frozen, as it may be handed out many times).
+
+    A frozen matrix can't be changed at all, so it can be shared freely, eg: by the
+    transforms that Transforms.chain() interns.
+
+    Multiplying two affine matrices gives another, while anything else falls back to
+    the general Matrix behaviour."""
+
+    def __init__(self, data: list[list[float]] | np.ndarray) -> None:
+        super().__init__(data)  # type: ignore[arg-type]
+
+        if self.size != 4 or not np.array_equal(self.data[3], _BOTTOM_ROW):
+            raise ValueError("Matrix is not affine")
+
+        self._rows: tuple[float, ...] | None = None
+        self._inverse: AffineMatrix | None = None
+        self._frozen = False
+
+    @staticmethod
+    def _wrap(data: np.ndarray) -> AffineMatrix:
+        """Wraps a 4x4 array that is already known to be affine"""
+        m = object.__new__(AffineMatrix)
+        m.data = data
+        m.size = 4
+        m._rows = None
+        m._inverse = None
+        m._frozen = False
+        return m
+
+    def __setitem__(self, index: tuple[int, int], value: float) -> None:
+        if self._frozen:
+            raise ValueError("A frozen matrix can't be changed")
+
+        if index[0] == 3 and value != _BOTTOM_ROW[index[1]]:
+            raise ValueError("The bottom row of an affine matrix can't be changed")
+
+        super().__setitem__(index, value)
+        self._rows = None
+        self._inverse = None
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> AffineMatrix:
+        """Stops the matrix from being changed, and returns it"""
+        self._frozen = True
+        self.data.flags.writeable = False
+        return self
+
+    def __reduce_ex__(self, protocol: object) -> object:
+        # The shared identity transform is unpickled as itself rather than a copy
+        if self is IDENTITY:
+            return "IDENTITY"
+
+        return super().__reduce_ex__(protocol)  # type: ignore[arg-type]
+
+    def _link_inverse(self, inverse: AffineMatrix) -> None:
+        """Records a pair of frozen matrices as each other's inverse, for transforms
+        whose inverse is already known (see Transforms.chain())"""
+        self.freeze()
+        inverse.freeze()
+        self._inverse = inverse
+        inverse._inverse = self
+
+    @property
+    def rows(self) -> tuple[float, ...]:
+        """The top three rows of the matrix as twelve floats"""
+        if self._rows is None:
+            self._rows = tuple(self.data[:3].ravel().tolist())
+
+        return self._rows
+
+    @override
+    def __mul__(self, other: object) -> Matrix | Tuple | Point | Vector:
+        kind = type(other)
+
+        if kind is Point:
+            return self.apply_point(other)  # type: ignore[arg-type]
+        elif kind is Vector:
+            return self.apply_vector(other)  # type: ignore[arg-type]
+        elif kind is AffineMatrix:
+            return AffineMatrix._wrap(np.matmul(self.data, other.data))  # type: ignore[attr-defined]
+
+        return super().__mul__(other)
+
+    def apply_point(self, p: Point) -> Point:
+        a, b, c, tx, d, e, f, ty, g, h, i, tz = self.rows
+        x, y, z = p.x, p.y, p.z
+
+        return Point.of(
+            a * x + b * y + c * z + tx,
+            d * x + e * y + f * z + ty,
+            g * x + h * y + i * z + tz,
+        )
+
+    def apply_vector(self, v: Vector) -> Vector:
+        a, b, c, _, d, e, f, _, g, h, i, _ = self.rows
+        x, y, z = v.x, v.y, v.z
+
+        return Vector.of(
+            a * x + b * y + c * z,
+            d * x + e * y + f * z,
+            g * x + h * y + i * z,
+        )
+
+    @override
+    def det(self) -> float:
+        a, b, c, _, d, e, f, _, g, h, i, _ = self.rows
+
+        return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+    @override
+    def inverse(self) -> AffineMatrix:
+        """The inverse of the 3x3 part (by its adjugate) followed by the translation
+        undone"""
+        if self._inverse is None:
+            self._inverse = self._invert().freeze()
+
+        return self._inverse
+
+    def _invert(self) -> AffineMatrix:
+        a, b, c, tx, d, e, f, ty, g, h, i, tz = self.rows
+        det = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+        if math.isclose(det, 0, rel_tol=EPSILON):
+            raise LinAlgError("Matrix is not invertible")
+
+        r = 1.0 / det
+        ia, ib, ic = (e * i - f * h) * r, (c * h - b * i) * r, (b * f - c * e) * r
+        id_, ie, if_ = (f * g - d * i) * r, (a * i - c * g) * r, (c * d - a * f) * r
+        ig, ih, ii = (d * h - e * g) * r, (b * g - a * h) * r, (a * e - b * d) * r
+
+        return AffineMatrix._wrap(
+            np.array(
+                [
+                    [ia, ib, ic, -(ia * tx + ib * ty + ic * tz)],
+                    [id_, ie, if_, -(id_ * tx + ie * ty + if_ * tz)],
+                    [ig, ih, ii, -(ig * tx + ih * ty + ii * tz)],
+                    [0.0, 0.0, 0.0, 1.0],
+                ]
+            )
+        )
+
+
+# Shared by every object, pattern etc. until it is given a transform of its own
+IDENTITY = AffineMatrix._wrap(np.identity(4))
+IDENTITY._link_inverse(IDENTITY)
@@ -1,12 +1,20 @@
 import inspect
-from typing import cast, overload
+import math
+from typing import Self, overload
 
+from ..constants import EPSILON
+from .abstract_tuple import AbstractTuple
 from .base_tuple import Tuple
+from .vector import Vector
+
+_new = object.__new__
 
 
 class Point(Tuple):
     """Defines a point in 3D space"""
 
+    __slots__ = ()
+
     # Provide overloads for static type checkers: external callers should
     # consider only the (x, y, z) signature. The implementation accepts an
     # optional `w` for compatibility with the Tuple factory.
@@ -21,14 +29,57 @@ class Point(Tuple):
         # (which pass the w component) won't raise a TypeError when the
         # returned object's class is Point. We ignore the passed `w` and
         # always initialize a Point with w == 1.0.
-        super().__init__(x, y, z, 1.0)
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = 1.0
 
-    def __new__(cls, x: float, y: float, z: float) -> Point:
-        return cast(cls, super().__new__(cls, x, y, z, 1))
+    @staticmethod
+    def of(x: float, y: float, z: float) -> Point:
+        """Builds a point without going through the constructor, for hot paths"""
+        p = _new(Point)
+        p.x = x
+        p.y = y
+        p.z = z
+        p.w = 1.0
+        return p
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(x={self.x}, y={self.y}, z={self.z})"
 
+    # Points only ever meet vectors and other points, so the common cases are
+    # handled here and anything else is left to Tuple to check and report
+
+    def __add__(self, other: AbstractTuple) -> AbstractTuple:
+        if type(other) is Vector:
+            return Point.of(self.x + other.x, self.y + other.y, self.z + other.z)
+
+        return super().__add__(other)
+
+    def __sub__(self, other: AbstractTuple) -> AbstractTuple:
+        if type(other) is Point:
+            return Vector.of(self.x - other.x, self.y - other.y, self.z - other.z)
+
+        if type(other) is Vector:
+            return Point.of(self.x - other.x, self.y - other.y, self.z - other.z)
+
+        return super().__sub__(other)
+
+    def __neg__(self) -> Self:
+        return Point.of(-self.x, -self.y, -self.z)
+
+    def __mul__(self, other: float | AbstractTuple) -> Self:
+        if not isinstance(other, (float, int)):
+            raise NotImplementedError
+
+        return Point.of(self.x * other, self.y * other, self.z * other)
+
+    def __truediv__(self, other: float) -> Self:
+        if math.isclose(other, 0.0, rel_tol=EPSILON):
+            raise ZeroDivisionError
+
+        return Point.of(self.x / other, self.y / other, self.z / other)
+
     def __reduce__(self) -> tuple:
         """Support for pickling Point objects for multiprocessing"""
         return (self.__class__, (self.x, self.y, self.z))
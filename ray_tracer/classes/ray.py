@@ -1,6 +1,6 @@
 from typing import cast
 
-from ray_tracer.classes.matrix import Matrix
+from ray_tracer.classes.matrix import AffineMatrix, Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.vector import Vector
 
@@ -14,6 +14,9 @@ class Ray:
         return cast(Point, self.origin + (time * self.direction))
 
     def transform(self, m: Matrix) -> Ray:
+        if type(m) is AffineMatrix:
+            return Ray(m.apply_point(self.origin), m.apply_vector(self.direction))
+
         p: Point = cast(Point, m * self.origin)
         d: Vector = cast(Vector, m * self.direction)
         return Ray(p, d)
@@ -0,0 +1,114 @@
+"""Phong shading of many hits at once, as Material.lighting() does for one"""
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from ray_tracer.classes.material import Material
+from ray_tracer.lights.light import Light
+
+FloatOrArray = float | np.ndarray
+
+
+def material_arrays(
+    materials: Sequence[Material],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """The ambient, diffuse, specular and shininess of each of the materials, as (N,)
+    arrays"""
+    settings = np.array(
+        [(m.ambient, m.diffuse, m.specular, m.shininess) for m in materials],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+
+    return settings[:, 0], settings[:, 1], settings[:, 2], settings[:, 3]
+
+
+def lighting_batch(
+    colours: np.ndarray,
+    light: Light,
+    points: np.ndarray,
+    eye_vectors: np.ndarray,
+    normal_vectors: np.ndarray,
+    in_shadow: np.ndarray,
+    ambient: FloatOrArray,
+    diffuse: FloatOrArray,
+    specular: FloatOrArray,
+    shininess: FloatOrArray,
+) -> np.ndarray:
+    """The colour of each of N hits lit by a single light, as an (N, 3) array (see
+    Material.lighting()).  The hits' colours, points, eye and normal vectors are
+    (N, 3) arrays and in_shadow an (N,) array, while the material settings are
+    (N,) arrays (see material_arrays()) or single values shared by every hit"""
+    intensity = np.array(
+        [light.intensity.red, light.intensity.green, light.intensity.blue]
+    )
+    position = np.array([light.position.x, light.position.y, light.position.z])
+
+    # Material settings given per hit need to line up with the colour channels
+    ambient, diffuse, specular, shininess = (
+        np.asarray(s, dtype=np.float64)[..., np.newaxis]
+        for s in (ambient, diffuse, specular, shininess)
+    )
+
+    # Combine the surface colour with the light's colour/intensity
+    effective_colour = colours * intensity
+
+    # find the direction to the light source
+    lightv = position - points
+    lightv = lightv / np.sqrt(_dot(lightv, lightv))
+
+    result = effective_colour * ambient
+
+    # Hits facing away from the light, or in shadow, only get the ambient light
+    light_dot_normal = _dot(lightv, normal_vectors)
+    lit = (light_dot_normal >= 0) & ~np.asarray(in_shadow, dtype=bool)[:, np.newaxis]
+
+    result += np.where(lit, effective_colour * diffuse * light_dot_normal, 0.0)
+
+    # Only hits where the light reflects towards the eye get a highlight
+    reflectv = -(lightv - normal_vectors * (2 * light_dot_normal))
+    reflect_dot_eye = _dot(reflectv, eye_vectors)
+    shiny = lit & (reflect_dot_eye > 0)
+
+    # The power is only taken where it's used, as it overflows for the others
+    factor = np.power(np.where(shiny, reflect_dot_eye, 1.0), shininess)
+    result += np.where(shiny, intensity * specular * factor, 0.0)
+
+    return np.clip(result, 0.0, 1.0)
+
+
+def shade_batch(
+    colours: np.ndarray,
+    lights: Iterable[Light],
+    points: np.ndarray,
+    eye_vectors: np.ndarray,
+    normal_vectors: np.ndarray,
+    in_shadow: np.ndarray,
+    ambient: FloatOrArray,
+    diffuse: FloatOrArray,
+    specular: FloatOrArray,
+    shininess: FloatOrArray,
+) -> np.ndarray:
+    """The sum of lighting_batch() for each of the lights (see Material.shade())"""
+    total = np.zeros_like(colours, dtype=np.float64)
+
+    for light in lights:
+        total += lighting_batch(
+            colours,
+            light,
+            points,
+            eye_vectors,
+            normal_vectors,
+            in_shadow,
+            ambient,
+            diffuse,
+            specular,
+            shininess,
+        )
+
+    return total
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row by row dot products of two (N, 3) arrays, as an (N, 1) column"""
+    return (a[:, 0] * b[:, 0] + a[:, 1] * b[:, 1] + a[:, 2] * b[:, 2])[:, np.newaxis]
@@ -1,13 +1,22 @@
 import math
+from functools import lru_cache
 from typing import cast
 
-from ray_tracer.classes.matrix import Matrix
+from numpy.linalg import LinAlgError
+
+from ray_tracer.classes.matrix import AffineMatrix, Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.vector import Vector
 
 
 class Transforms:
-    """A class of static factories that generate standard transformation Matrices"""
+    """A class of static factories that generate standard transformation Matrices.
+    They all start from Matrix.Identity(), so they're all AffineMatrix instances"""
+
+    @staticmethod
+    def chain() -> TransformChain:
+        """Starts a chain of transforms (see TransformChain)"""
+        return TransformChain()
 
     @staticmethod
     def translation(x: float, y: float, z: float) -> Matrix:
@@ -70,7 +79,7 @@ class Transforms:
         forward = cast(Vector, (to - from_)).normalize()
         left = forward.cross(up.normalize())
         true_up = left.cross(forward)
-        orientation = Matrix(
+        orientation = AffineMatrix(
             [
                 [left.x, left.y, left.z, 0],
                 [true_up.x, true_up.y, true_up.z, 0],
@@ -81,3 +90,110 @@ class Transforms:
         return cast(
             Matrix, orientation * Transforms.translation(-from_.x, -from_.y, -from_.z)
         )
+
+
+# A chain's steps, as the name of the Transforms factory and its arguments
+Step = tuple[str, tuple[float, ...]]
+
+
+class TransformChain:
+    """Builds a transform from a chain of steps, applied in the order they're given:
+
+        Transforms.chain().scale(2, 2, 2).rotate_y(math.pi / 4).translate(0, 1, 0)
+
+    is the same transform as translation * rotation_y * scaling.  Chains can't be
+    changed; each step returns a new chain, so a common start can be shared and
+    extended in different ways.
+
+    build() makes the matrix along with its inverse, which is put together from the
+    inverse of each step in reverse order (a translation undone is the opposite
+    translation, a scaling undone is the reciprocal scaling etc.) rather than by
+    inverting the result.  The two are frozen and interned, so building the same
+    chain again (while it's among the most recently built) returns the very same
+    matrix, and objects given it share it rather than each holding a copy and
+    working out its inverse again."""
+
+    __slots__ = ("steps",)
+
+    def __init__(self, steps: tuple[Step, ...] = ()) -> None:
+        self.steps = steps
+
+    def _then(self, name: str, *args: float) -> TransformChain:
+        return TransformChain(self.steps + ((name, args),))
+
+    def translate(self, x: float, y: float, z: float) -> TransformChain:
+        return self._then("translation", x, y, z)
+
+    def scale(self, x: float, y: float, z: float) -> TransformChain:
+        return self._then("scaling", x, y, z)
+
+    def rotate_x(self, angle: float) -> TransformChain:
+        return self._then("rotation_x", angle)
+
+    def rotate_y(self, angle: float) -> TransformChain:
+        return self._then("rotation_y", angle)
+
+    def rotate_z(self, angle: float) -> TransformChain:
+        return self._then("rotation_z", angle)
+
+    def shear(
+        self, xy: float, xz: float, yx: float, yz: float, zx: float, zy: float
+    ) -> TransformChain:
+        return self._then("shearing", xy, xz, yx, yz, zx, zy)
+
+    def then(self, other: TransformChain) -> TransformChain:
+        """This chain followed by all of the steps of another"""
+        return TransformChain(self.steps + other.steps)
+
+    def build(self) -> AffineMatrix:
+        return _build(self.steps)
+
+    def _compose(self) -> AffineMatrix:
+        m = cast(AffineMatrix, Matrix.Identity())
+        inverse: AffineMatrix | None = cast(AffineMatrix, Matrix.Identity())
+
+        for name, args in self.steps:
+            step = getattr(Transforms, name)(*args)
+            m = step * m
+
+            if inverse is not None:
+                undo = _undo(name, args, step)
+                inverse = None if undo is None else inverse * undo
+
+        if inverse is None:
+            # Singular, so there's no inverse to keep; m.inverse() will say so
+            return m.freeze()
+
+        m._link_inverse(inverse)
+        return m
+
+
+def _undo(
+    name: str, args: tuple[float, ...], step: AffineMatrix
+) -> AffineMatrix | None:
+    """The inverse of a single step, or None if it hasn't got one"""
+    match name:
+        case "translation":
+            x, y, z = args
+            return Transforms.translation(-x, -y, -z)
+        case "scaling":
+            if 0 in args:
+                return None
+
+            x, y, z = args
+            return Transforms.scaling(1 / x, 1 / y, 1 / z)
+        case "rotation_x" | "rotation_y" | "rotation_z":
+            return getattr(Transforms, name)(-args[0])
+        case _:
+            try:
+                return step.inverse()
+            except LinAlgError:
+                return None
+
+
+# The matrices of the chains built most recently, by their steps.  Only so many are
+# kept, so that a scene building a great many one off transforms (eg: an animation)
+# doesn't hold on to every one of them
+@lru_cache(maxsize=1024)
+def _build(steps: tuple[Step, ...]) -> AffineMatrix:
+    return TransformChain(steps)._compose()
@@ -1,14 +1,19 @@
 import inspect
 import math
-from typing import cast, overload
+from typing import Self, overload
 
 from ..constants import EPSILON
+from .abstract_tuple import AbstractTuple
 from .base_tuple import Tuple
 
+_new = object.__new__
+
 
 class Vector(Tuple):
     """Defines a 3D vector"""
 
+    __slots__ = ()
+
     # Overloads for static type checkers: external callers should see
     # only (x, y, z). Implementation accepts an optional `w`.
     @overload
@@ -21,14 +26,54 @@ class Vector(Tuple):
         # Accept an optional fourth parameter for compatibility with the
         # Tuple(...) factory. Ignore the provided `w` and always initialize
         # vectors with w == 0.0.
-        super().__init__(x, y, z, 0.0)
-
-    def __new__(cls, x: float, y: float, z: float) -> Vector:
-        return cast(cls, super().__new__(cls, x, y, z, 0))
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = 0.0
+
+    @staticmethod
+    def of(x: float, y: float, z: float) -> Vector:
+        """Builds a vector without going through the constructor, for hot paths"""
+        v = _new(Vector)
+        v.x = x
+        v.y = y
+        v.z = z
+        v.w = 0.0
+        return v
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(x={self.x}, y={self.y}, z={self.z})"
 
+    # As with Point, the common cases are handled here and anything else is left
+    # to Tuple (eg: vector + point, which gives a point)
+
+    def __add__(self, other: AbstractTuple) -> AbstractTuple:
+        if type(other) is Vector:
+            return Vector.of(self.x + other.x, self.y + other.y, self.z + other.z)
+
+        return super().__add__(other)
+
+    def __sub__(self, other: AbstractTuple) -> AbstractTuple:
+        if type(other) is Vector:
+            return Vector.of(self.x - other.x, self.y - other.y, self.z - other.z)
+
+        return super().__sub__(other)
+
+    def __neg__(self) -> Self:
+        return Vector.of(-self.x, -self.y, -self.z)
+
+    def __mul__(self, other: float | AbstractTuple) -> Self:
+        if not isinstance(other, (float, int)):
+            raise NotImplementedError
+
+        return Vector.of(self.x * other, self.y * other, self.z * other)
+
+    def __truediv__(self, other: float) -> Self:
+        if math.isclose(other, 0.0, rel_tol=EPSILON):
+            raise ZeroDivisionError
+
+        return Vector.of(self.x / other, self.y / other, self.z / other)
+
     def __abs__(self) -> float:
         """Returns the magnitude of the vector"""
         return math.sqrt(self.x**2 + self.y**2 + self.z**2 + self.w**2)
@@ -40,7 +85,7 @@ class Vector(Tuple):
         if math.isclose(magnitude, 0.0, rel_tol=EPSILON):
             raise ZeroDivisionError("vector has magnitude of zero")
 
-        return Vector(
+        return Vector.of(
             self.x / magnitude,
             self.y / magnitude,
             self.z / magnitude,
@@ -52,14 +97,17 @@ class Vector(Tuple):
 
     def cross(self, other: Vector) -> Vector:
         """Returns the cross product of two vectors"""
-        return Vector(
+        return Vector.of(
             self.y * other.z - self.z * other.y,
             self.z * other.x - self.x * other.z,
             self.x * other.y - self.y * other.x,
         )
 
     def reflect(self, normal: Vector) -> Vector:
-        return cast(Vector, self - (normal * 2 * self.dot(normal)))
+        d = 2 * self.dot(normal)
+        return Vector.of(
+            self.x - normal.x * d, self.y - normal.y * d, self.z - normal.z * d
+        )
 
     def __reduce__(self) -> tuple:
         """Support for pickling Vector objects for multiprocessing"""
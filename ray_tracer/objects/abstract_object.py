@@ -1,55 +1,297 @@
+import math
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, cast
+from functools import cache
+from operator import attrgetter
+from typing import TYPE_CHECKING, ClassVar, Iterator, cast
+
+import numpy as np
 
 from ray_tracer.classes.intersection import Intersection
-from ray_tracer.classes.material import Material
-from ray_tracer.classes.matrix import Matrix
+from ray_tracer.classes.material import DEFAULT_MATERIAL, Material
+from ray_tracer.classes.matrix import IDENTITY, Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.vector import Vector
+from ray_tracer.constants import EPSILON
+from ray_tracer.objects.bvh import transform_boxes
 
 if TYPE_CHECKING:
     from ray_tracer.objects.csg import CSG
     from ray_tracer.objects.group import Group
 
+_by_t = attrgetter("t")
+
 
 @dataclass
 class Bounds:
     low: Point
     high: Point
 
+    def is_empty(self) -> bool:
+        """An empty box is one where low exceeds high on any axis (for example the
+        overlap of two disjoint boxes)"""
+        return (
+            self.low.x > self.high.x
+            or self.low.y > self.high.y
+            or self.low.z > self.high.z
+        )
+
+    def is_finite(self) -> bool:
+        """True if none of the box's extents are infinite (or undefined)"""
+        return all(
+            math.isfinite(c)
+            for c in (
+                self.low.x,
+                self.low.y,
+                self.low.z,
+                self.high.x,
+                self.high.y,
+                self.high.z,
+            )
+        )
+
+    def transform(self, m: Matrix) -> Bounds:
+        """Returns the axis aligned box which encloses this box once it has been
+        transformed by m (see transform_boxes())"""
+        low, high = transform_boxes(
+            np.array([[self.low.x, self.low.y, self.low.z]]),
+            np.array([[self.high.x, self.high.y, self.high.z]]),
+            m.data[np.newaxis],
+        )
+
+        return Bounds(Point(*low[0]), Point(*high[0]))
+
+    def merge(self, other: Bounds) -> Bounds:
+        """Returns the smallest box containing both this box and other"""
+        return Bounds(
+            Point(
+                min(self.low.x, other.low.x),
+                min(self.low.y, other.low.y),
+                min(self.low.z, other.low.z),
+            ),
+            Point(
+                max(self.high.x, other.high.x),
+                max(self.high.y, other.high.y),
+                max(self.high.z, other.high.z),
+            ),
+        )
+
+    def overlap(self, other: Bounds) -> Bounds:
+        """Returns the box shared by this box and other.  If they don't overlap,
+        the result is empty (see is_empty())"""
+        return Bounds(
+            Point(
+                max(self.low.x, other.low.x),
+                max(self.low.y, other.low.y),
+                max(self.low.z, other.low.z),
+            ),
+            Point(
+                min(self.high.x, other.high.x),
+                min(self.high.y, other.high.y),
+                min(self.high.z, other.high.z),
+            ),
+        )
+
+    def ray_span(self, ray: Ray) -> tuple[float, float] | None:
+        """Returns the (tmin, tmax) interval over which the ray lies inside the box,
+        or None if the ray misses the box entirely"""
+        if self.is_empty():
+            return None
+
+        xtmin, xtmax = _check_axis(
+            ray.origin.x, ray.direction.x, self.low.x, self.high.x
+        )
+        ytmin, ytmax = _check_axis(
+            ray.origin.y, ray.direction.y, self.low.y, self.high.y
+        )
+        ztmin, ztmax = _check_axis(
+            ray.origin.z, ray.direction.z, self.low.z, self.high.z
+        )
+
+        tmin = max(xtmin, ytmin, ztmin)
+        tmax = min(xtmax, ytmax, ztmax)
+
+        return None if tmin > tmax else (tmin, tmax)
+
+
+def _check_axis(
+    origin: float, direction: float, low: float, high: float
+) -> tuple[float, float]:
+    """Helper function to get planar intersects for a specific axis"""
+    if abs(direction) < EPSILON:
+        # The ray runs parallel to this pair of planes, so it's either always
+        # between them or never is
+        return (-math.inf, math.inf) if low <= origin <= high else (math.inf, -math.inf)
+
+    tmin = (low - origin) / direction
+    tmax = (high - origin) / direction
+
+    return (tmax, tmin) if tmin > tmax else (tmin, tmax)
+
 
 class AbstractObject(ABC):
+    # Count of changes, across all objects, which may have moved something in world
+    # space (new transforms, new bounds).  Anything indexing objects by their world
+    # space bounds (eg: the World's top level hierarchy) can compare this with the
+    # value it was built at to tell whether it has gone stale
+    generation: ClassVar[int] = 0
+    # Likewise for changes of material, which change what's inherited but leave
+    # everything where it is
+    material_generation: ClassVar[int] = 0
+
+    # Objects are slotted, as a large mesh can be made of a great many of them.  Every
+    # subclass lists the attributes it adds in its own __slots__
+    __slots__ = (
+        "id",
+        "parent",
+        "_transform",
+        "_inverse_transform",
+        "_identity",
+        "_material",
+        "_inherited",
+        "_bounds",
+        "_world_inverse",
+        "_normal_matrix",
+    )
+
     def __init__(self) -> None:
         self.id = id(self)
-        # store values in __dict__ so __eq__ behavior stays consistent
-        self.__dict__["transform"] = Matrix.Identity()
-        self.__dict__["inverse_transform"] = self.__dict__["transform"].inverse()
-        self.material = Material()
+        # Every object starts out sharing the same frozen identity transform and
+        # default material, so making one costs next to nothing
+        self._transform: Matrix = IDENTITY
+        self._inverse_transform: Matrix | None = IDENTITY
+        self._identity = True
+        self._material = DEFAULT_MATERIAL
+        self._inherited: Material | None = None
+        self._world_inverse: tuple[int, Matrix] | None = None
+        self._normal_matrix: tuple[int, Matrix] | None = None
         self.parent: Group | CSG | None = None
 
     @property
     def bounds(self) -> Bounds:
-        return self.__dict__["bounds"]
+        return self._bounds
 
     @bounds.setter
     def bounds(self, bounds: Bounds) -> None:
-        self.__dict__["bounds"] = bounds
+        self._bounds = bounds
+        AbstractObject.generation += 1
+
+    """ Materials
+        ---------
+        Every object has a material of its own, which starts out as the (shared,
+        frozen) default.  Objects left with the default material take on the material
+        of the nearest group or CSG above them which has been given one, so that a
+        whole mesh can be coloured in one go.  Which material that is gets worked out
+        once, by resolve_materials(), when the World prepares the scene to be
+        rendered rather than for every hit.
+    """
+
+    @property
+    def material(self) -> Material:
+        """The object's own material, which can be changed in place (eg:
+        s.material.ambient = 0.5).  A shared, frozen material (such as the default
+        every object starts out with) is handed out as a copy, which takes its place
+        as the object's material once it's changed, so that only this object sees
+        the change"""
+        m = self._material
+        return m.copy_for(self) if m.frozen else m
+
+    @material.setter
+    def material(self, m: Material) -> None:
+        m.claim()
+        self._material = m
+        AbstractObject.material_generation += 1
 
-    def __eq__(self, other: object) -> bool:
-        ignore_keys = {"id", "parent", "children"}
+    @property
+    def effective_material(self) -> Material:
+        """The material the object is rendered with: its own or, if it's been left
+        with the default, the one inherited from above it.  Unlike .material this
+        never takes a copy, so it's what the renderer uses, and it mustn't be
+        changed"""
+        inherited = self._inherited
+        return self._material if inherited is None else inherited
+
+    def material_for(self, i: Intersection) -> Material:
+        """The material that the hit i, on this object, is rendered with"""
+        return self.effective_material
+
+    def surface_for(
+        self, i: Intersection, point: Point
+    ) -> tuple[AbstractObject, Point]:
+        """The object whose material's patterns the hit i, on this object, shows, and
+        where the hit (at point, in world space) is as far as that object's concerned"""
+        return self, point
+
+    def _own_material(self) -> Material | None:
+        """The object's material, or None if it's been left with the default.  A
+        material given to the object is its own even if it has the default settings"""
+        m = self._material
+        return None if m is DEFAULT_MATERIAL else m
+
+    def resolve_materials(self, inherited: Material | None = None) -> Material | None:
+        """Works out the material of this object and of everything beneath it, given
+        the material inherited from above (if any).  Returns what is passed on to
+        anything beneath.  Called by World.prepare()"""
+        own = self._own_material()
+
+        if own is None:
+            self._inherited = inherited
+            return inherited
+
+        self._inherited = None
+        return own
+
+    # Scene objects deliberately keep the default identity based __eq__/__hash__ so
+    # they can be used in sets/dicts and so that list membership, removal and the
+    # like stay cheap.  Use structurally_equal() when value semantics are needed.
+    _structural_ignore: frozenset[str] = frozenset(
+        {
+            "id",
+            "parent",
+            "_identity",
+            "_material",
+            "_inherited",
+            "_world_inverse",
+            "_normal_matrix",
+        }
+    )
+
+    def structurally_equal(self, other: object) -> bool:
+        """Compares two objects by value rather than identity.  Objects match when
+        they are of the same type and all of their attributes (transform, material,
+        geometry, children etc.) match.  The parent link is not considered"""
+        if self is other:
+            return True
+
+        if not isinstance(other, self.__class__):
+            return False
 
-        if self.__class__.__name__ == "Group":
-            ignore_keys.remove("id")
+        mine = self._structural_state()
+        theirs = other._structural_state()
 
-        if isinstance(other, self.__class__):
-            return {k: v for k, v in self.__dict__.items() if k not in ignore_keys} == {
-                k: v for k, v in other.__dict__.items() if k not in ignore_keys
-            }
-        else:
+        if mine.keys() != theirs.keys():
             return False
 
+        return all(_structurally_equal(mine[k], theirs[k]) for k in mine)
+
+    def _structural_state(self) -> dict[str, object]:
+        """The attributes compared by structurally_equal(), by name.  Materials are
+        compared by value whether or not they're shared"""
+        state = {
+            k: getattr(self, k)
+            for k in _slot_names(type(self))
+            if k not in self._structural_ignore and hasattr(self, k)
+        }
+
+        # Subclasses which don't declare __slots__ (eg: in tests) still have a dict
+        for k, v in getattr(self, "__dict__", {}).items():
+            if k not in self._structural_ignore:
+                state[k] = v
+
+        state["material"] = self._material
+        return state
+
     def __contains__(self, other: object) -> bool:
         if not isinstance(other, AbstractObject):
             return False
@@ -64,7 +306,32 @@ class AbstractObject(ABC):
         ):
             return other in self.left or other in self.right
         else:
-            return self == other
+            return self is other
+
+    def leaves(self) -> Iterator[AbstractObject]:
+        """Yields every primitive (non-container) object at or below this one"""
+        yield self
+
+    def _descendant_added(self, child: AbstractObject, via: AbstractObject) -> None:
+        """Notification passed up the parent chain whenever `child` is attached
+        somewhere underneath `via` (one of this object's direct children).  Objects
+        which index their subtree (eg: CSG) override this to keep the index current"""
+        if self.parent is not None:
+            self.parent._descendant_added(child, self)
+
+    def _descendant_changed(self, via: AbstractObject) -> None:
+        """Notification passed up the parent chain whenever something underneath
+        `via` (one of this object's direct children) has been moved, so that objects
+        caching their children's bounds (eg: CSG) can refresh them"""
+        if self.parent is not None:
+            self.parent._descendant_changed(self)
+
+    def bake(self, m: Matrix) -> None:
+        """Applies m on top of the object's own transform, as if the object had been
+        moved out of a group with that transform.  Shapes which can hold the result in
+        their geometry (eg: triangles) override this to do so, leaving themselves with
+        an identity transform"""
+        self.set_transform(cast(Matrix, m * self.transform))
 
     def set_transform(self, m: Matrix) -> None:
         # Use the property to set the transform and update the cached inverse
@@ -73,29 +340,34 @@ class AbstractObject(ABC):
 
     def set_parent(self, p: Group | CSG) -> None:
         self.parent = p
+        # Moving to a new parent changes where we are in world space
+        AbstractObject.generation += 1
 
     @property
     def transform(self) -> Matrix:
-        return self.__dict__["transform"]
+        return self._transform
 
     @transform.setter
     def transform(self, m: Matrix) -> None:
-        # store under the same key so external code inspecting __dict__ sees it
-        self.__dict__["transform"] = m
-        # clear cached inverse so it will be recomputed lazily
-        self.__dict__["inverse_transform"] = m.inverse()
+        self._transform = m
+        self._inverse_transform = m.inverse()
+        self._identity = m is IDENTITY or m.is_identity()
+        AbstractObject.generation += 1
+
+        if self.parent is not None:
+            self.parent._descendant_changed(self)
 
     @property
     def inverse_transform(self) -> Matrix:
-        v = self.__dict__.get("inverse_transform")
+        v = self._inverse_transform
         if v is None:
-            v = self.__dict__["transform"].inverse()
-            self.__dict__["inverse_transform"] = v
+            v = self._inverse_transform = self._transform.inverse()
         return v
 
     @inverse_transform.setter
     def inverse_transform(self, m: Matrix) -> None:
-        self.__dict__["inverse_transform"] = m
+        self._inverse_transform = m
+        AbstractObject.generation += 1
 
     """ Computation of Normals
         ----------------------
@@ -115,29 +387,106 @@ class AbstractObject(ABC):
     @abstractmethod
     def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector: ...
 
+    """ Intersections
+        -------------
+        Client code should call .intersect(ray), which returns the hits sorted by t.
+
+        Within a hierarchy, each ray collects its hits in a single list: containers
+        pass the list they were given on to .intersect_into(ray, xs) of each child
+        and primitives append to it, so it only needs sorting once, by whoever asked.
+        Specific objects override _local_intersect_into(self, ray, xs) to append their
+        hits in object space.  Objects may instead override _local_intersect(self,
+        ray) to return a list of hits, but one or the other must be overridden.
+    """
+
     def intersect(self, ray: Ray) -> list[Intersection]:
-        # Convert ray to object space
-        local_ray = ray.transform(self.inverse_transform)
-        return self._local_intersect(local_ray)
+        xs: list[Intersection] = []
+        self.intersect_into(ray, xs)
+        xs.sort(key=_by_t)
+        return xs
+
+    def intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
+        """Appends the hits of the ray on this object to xs, in no particular order"""
+        # Untransformed objects (the groups making up a hierarchy, baked triangles
+        # etc.) can use the ray as it is
+        if self._identity:
+            self._local_intersect_into(ray, xs)
+        else:
+            # Convert ray to object space
+            self._local_intersect_into(ray.transform(self.inverse_transform), xs)
 
-    @abstractmethod
-    def _local_intersect(self, ray: Ray) -> list[Intersection]: ...
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        super().__init_subclass__(**kwargs)
 
-    def world_to_object(self, point: Point) -> Point:
-        if self.parent:
-            point = self.parent.world_to_object(point)
+        # Each of the two defaults calls the other, so without an override of one of
+        # them the first ray would recurse forever
+        if (
+            cls._local_intersect is AbstractObject._local_intersect
+            and cls._local_intersect_into is AbstractObject._local_intersect_into
+        ):
+            raise TypeError(
+                f"{cls.__name__} must override _local_intersect() or "
+                "_local_intersect_into()"
+            )
+
+    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+        xs: list[Intersection] = []
+        self._local_intersect_into(ray, xs)
+        xs.sort(key=_by_t)
+        return xs
+
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
+        xs.extend(self._local_intersect(ray))
+
+    """ World Space Matrices
+        --------------------
+        Converting points and normals between world space and object space means
+        going through the transforms of every object from the root of the scene down.
+        Those products are cached here, stamped with the generation they were worked
+        out at.  Any change to a transform or parent anywhere bumps the generation, so
+        the caches are recomputed (lazily) after a scene is modified but never while
+        it's being rendered.
+    """
+
+    @property
+    def world_inverse(self) -> Matrix:
+        """Composite matrix taking a point in world space into this object's space"""
+        cached = self._world_inverse
 
-        return cast(Point, self.transform.inverse() * point)
+        if cached is not None and cached[0] == AbstractObject.generation:
+            return cached[1]
 
-    def normal_to_world(self, normal: Vector) -> Vector:
-        normal = cast(Vector, self.transform.inverse().transpose() * normal)
-        normal.w = 0
-        normal = normal.normalize()
+        m = self.inverse_transform
+
+        if self.parent is not None:
+            m = cast(Matrix, m * self.parent.world_inverse)
+
+        self._world_inverse = (AbstractObject.generation, m)
+        return m
+
+    @property
+    def normal_matrix(self) -> Matrix:
+        """Composite matrix taking a normal in this object's space into world space
+        (the result still needs normalising)"""
+        cached = self._normal_matrix
+
+        if cached is not None and cached[0] == AbstractObject.generation:
+            return cached[1]
+
+        m = self.inverse_transform.transpose()
+
+        if self.parent is not None:
+            m = cast(Matrix, self.parent.normal_matrix * m)
 
-        if self.parent:
-            normal = self.parent.normal_to_world(normal)
+        self._normal_matrix = (AbstractObject.generation, m)
+        return m
 
-        return normal
+    def world_to_object(self, point: Point) -> Point:
+        return cast(Point, self.world_inverse * point)
+
+    def normal_to_world(self, normal: Vector) -> Vector:
+        normal = cast(Vector, self.normal_matrix * normal)
+        return normal.normalize()
 
     def is_in(self, bounds: Bounds, full_containment: bool = False) -> bool:
         """Determines whether an object falls within a specific set of bounds
@@ -175,3 +524,50 @@ class AbstractObject(ABC):
             if full_containment is False
             else in_bounds.count(True) == 3
         )
+
+
+@cache
+def _slot_names(cls: type) -> tuple[str, ...]:
+    """Every slot declared by cls and its bases"""
+    names: list[str] = []
+
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+
+    return tuple(names)
+
+
+def _structurally_equal(a: object, b: object) -> bool:
+    """Helper for AbstractObject.structurally_equal that recurses into any child
+    objects (or lists of them) rather than falling back to identity comparison"""
+    if isinstance(a, AbstractObject):
+        return a.structurally_equal(b)
+
+    if isinstance(a, np.ndarray):
+        return isinstance(b, np.ndarray) and np.array_equal(a, b)
+
+    if isinstance(a, (list, tuple)):
+        return (
+            isinstance(b, (list, tuple))
+            and len(a) == len(b)
+            and all(_structurally_equal(x, y) for x, y in zip(a, b))
+        )
+
+    return a == b
+
+
+def bounds_arrays(objects: list[AbstractObject]) -> tuple[np.ndarray, np.ndarray]:
+    """The bounds of each object in its parent's space (ie: with the object's own
+    transform applied), as (N, 3) arrays of low and high corners.  Transforming the
+    boxes in bulk is much cheaper than calling bounds.transform() on each object"""
+    if not objects:
+        return np.empty((0, 3)), np.empty((0, 3))
+
+    lows = np.array([(o.bounds.low.x, o.bounds.low.y, o.bounds.low.z) for o in objects])
+    highs = np.array(
+        [(o.bounds.high.x, o.bounds.high.y, o.bounds.high.z) for o in objects]
+    )
+    matrices = np.stack([o.transform.data for o in objects])
+
+    return transform_boxes(lows, highs, matrices)
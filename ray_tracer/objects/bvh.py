@@ -0,0 +1,454 @@
+"""Bounding volume hierarchy construction using a binned Surface Area Heuristic (SAH)
+
+The builder works purely on arrays of primitive bounds so that it knows nothing about
+the objects themselves.  Callers (eg: Group.optimize) turn the resulting tree of
+BuildNodes back into objects, or lay it out as flat arrays with flatten_tree() and walk
+it with traverse() (eg: LinearBVH, TriangleMesh).
+"""
+
+import os
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Iterator
+
+import numpy as np
+
+from ray_tracer.constants import EPSILON
+
+# Leaves are never allowed to hold more than this many primitives
+LEAF_SIZE = 4
+
+# Number of buckets primitive centroids are sorted into when evaluating split planes
+SAH_BINS = 12
+
+# Relative costs of visiting a node versus intersecting a primitive, used by the SAH
+TRAVERSAL_COST = 1.0
+INTERSECTION_COST = 1.0
+
+# Maximum depth of the hierarchy.  Anything left over at this depth becomes a leaf
+MAX_DEPTH = 32
+
+# Refitting a hierarchy after its contents move keeps the tree's shape, which gets
+# steadily worse as things move further.  Once its SAH cost has grown by this factor
+# over the freshly built tree, refit() rebuilds it instead
+REBUILD_RATIO = 1.5
+
+# Parallel builds fall back to building serially below this many primitives, where
+# starting the worker processes would cost more than it saves
+PARALLEL_THRESHOLD = 20000
+
+# When building in parallel, the top of the tree is split serially until there are
+# roughly this many independent subtrees per worker to share out
+SUBTREES_PER_WORKER = 4
+
+
+@dataclass
+class BuildNode:
+    """A node of a hierarchy produced by build_sah().  Leaves hold the indexes of the
+    primitives they contain, interior nodes hold exactly two children"""
+
+    low: np.ndarray
+    high: np.ndarray
+    indices: np.ndarray | None = None
+    left: BuildNode | None = None
+    right: BuildNode | None = None
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.indices is not None
+
+
+def surface_area(low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Surface area of one (shape (3,)) or many (shape (N, 3)) boxes.  Empty boxes
+    (low > high) have an area of zero"""
+    d = np.maximum(high - low, 0.0)
+    return 2.0 * (d[..., 0] * d[..., 1] + d[..., 1] * d[..., 2] + d[..., 2] * d[..., 0])
+
+
+def transform_boxes(
+    lows: np.ndarray, highs: np.ndarray, matrices: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Transforms N boxes, given as (N, 3) arrays of low and high corners, by N
+    (N, 4, 4) matrices and returns the (N, 3) corners of the axis aligned boxes
+    enclosing the results.  Rather than transforming all eight corners, each output
+    axis takes the smallest/largest contribution of every input axis"""
+    a = matrices[:, :3, :3]
+
+    with np.errstate(invalid="ignore"):
+        lo = a * lows[:, np.newaxis, :]
+        hi = a * highs[:, np.newaxis, :]
+
+    # A zero coefficient means that input axis doesn't contribute at all, which
+    # also stops infinite bounds (planes etc.) turning into 0 * inf = nan
+    lo = np.where(a == 0, 0.0, lo)
+    hi = np.where(a == 0, 0.0, hi)
+
+    offset = matrices[:, :3, 3]
+
+    return (
+        offset + np.minimum(lo, hi).sum(axis=2),
+        offset + np.maximum(lo, hi).sum(axis=2),
+    )
+
+
+def build_sah(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    leaf_size: int = LEAF_SIZE,
+    bins: int = SAH_BINS,
+    max_depth: int = MAX_DEPTH,
+    workers: int | None = 1,
+) -> BuildNode:
+    """Builds a hierarchy over N primitives, given as (N, 3) arrays of the low and high
+    corners of their bounding boxes.  Every primitive ends up in exactly one leaf and
+    leaves hold at most leaf_size primitives (unless max_depth is reached).
+
+    With more than one worker (or None for one per CPU), large inputs have the top of
+    the tree split serially and the subtrees below built in a process pool.  The tree
+    produced is exactly the one a serial build gives"""
+    if leaf_size < 1:
+        raise ValueError("leaf_size must be at least 1")
+
+    if bins < 2:
+        raise ValueError("bins must be at least 2")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    lows = np.asarray(lows, dtype=np.float64)
+    highs = np.asarray(highs, dtype=np.float64)
+    centroids = (lows + highs) / 2
+    indices = np.arange(len(lows))
+
+    if workers > 1 and len(lows) >= PARALLEL_THRESHOLD:
+        return _build_parallel(
+            lows, highs, centroids, indices, leaf_size, bins, max_depth, workers
+        )
+
+    return _build(lows, highs, centroids, indices, leaf_size, bins, max_depth)
+
+
+def _build_parallel(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    centroids: np.ndarray,
+    indices: np.ndarray,
+    leaf_size: int,
+    bins: int,
+    depth: int,
+    workers: int,
+) -> BuildNode:
+    # Split the top levels here, leaving an empty node as a placeholder wherever a
+    # subtree is to be built by a worker
+    levels = int(np.ceil(np.log2(workers * SUBTREES_PER_WORKER)))
+    pending: list[tuple[BuildNode, np.ndarray, int]] = []
+
+    def split_top(indices: np.ndarray, depth: int, levels: int) -> BuildNode:
+        low = lows[indices].min(axis=0)
+        high = highs[indices].max(axis=0)
+
+        if len(indices) <= leaf_size or depth <= 0:
+            return BuildNode(low, high, indices=indices)
+
+        if levels == 0:
+            node = BuildNode(low, high)
+            pending.append((node, indices, depth))
+            return node
+
+        left, right = _split(lows, highs, centroids, indices, bins)
+
+        return BuildNode(
+            low,
+            high,
+            left=split_top(left, depth - 1, levels - 1),
+            right=split_top(right, depth - 1, levels - 1),
+        )
+
+    root = split_top(indices, depth, levels)
+
+    # Each worker only gets the bounds of its own primitives, so its tree refers
+    # to them by position in that subset and has to be mapped back afterwards
+    tasks = [
+        (lows[ids], highs[ids], leaf_size, bins, depth) for _, ids, depth in pending
+    ]
+
+    with Pool(workers) as pool:
+        subtrees = pool.map(_build_subtree, tasks)
+
+    for (node, ids, _), subtree in zip(pending, subtrees):
+        _remap(subtree, ids)
+        node.indices = subtree.indices
+        node.left = subtree.left
+        node.right = subtree.right
+
+    return root
+
+
+def _build_subtree(args: tuple) -> BuildNode:
+    """Worker process entry point for parallel builds"""
+    lows, highs, leaf_size, bins, depth = args
+
+    return _build(
+        lows, highs, (lows + highs) / 2, np.arange(len(lows)), leaf_size, bins, depth
+    )
+
+
+def _remap(node: BuildNode, ids: np.ndarray) -> None:
+    if node.is_leaf:
+        node.indices = ids[node.indices]
+    else:
+        _remap(node.left, ids)  # type: ignore[arg-type]
+        _remap(node.right, ids)  # type: ignore[arg-type]
+
+
+def _build(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    centroids: np.ndarray,
+    indices: np.ndarray,
+    leaf_size: int,
+    bins: int,
+    depth: int,
+) -> BuildNode:
+    low = lows[indices].min(axis=0)
+    high = highs[indices].max(axis=0)
+
+    if len(indices) <= leaf_size or depth <= 0:
+        return BuildNode(low, high, indices=indices)
+
+    left, right = _split(lows, highs, centroids, indices, bins)
+
+    return BuildNode(
+        low,
+        high,
+        left=_build(lows, highs, centroids, left, leaf_size, bins, depth - 1),
+        right=_build(lows, highs, centroids, right, leaf_size, bins, depth - 1),
+    )
+
+
+def _split(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    centroids: np.ndarray,
+    indices: np.ndarray,
+    bins: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Partitions indices into two non-empty sets using the cheapest SAH split plane
+    found across all three axes"""
+    c = centroids[indices]
+    cmin = c.min(axis=0)
+    extent = c.max(axis=0) - cmin
+
+    best_cost = np.inf
+    best_axis = -1
+    best_bin = 0
+    best_ids = np.empty(0, dtype=np.intp)
+
+    for axis in range(3):
+        if extent[axis] <= 0:
+            continue
+
+        # Sort centroids into equal width buckets along this axis
+        ids = ((c[:, axis] - cmin[axis]) / extent[axis] * bins).astype(np.intp)
+        ids = np.clip(ids, 0, bins - 1)
+
+        counts = np.bincount(ids, minlength=bins)
+        bin_low = np.full((bins, 3), np.inf)
+        bin_high = np.full((bins, 3), -np.inf)
+        np.minimum.at(bin_low, ids, lows[indices])
+        np.maximum.at(bin_high, ids, highs[indices])
+
+        # Sweep from each end to get the bounds/counts either side of each plane
+        left_count = np.cumsum(counts)[:-1]
+        left_area = surface_area(
+            np.minimum.accumulate(bin_low)[:-1], np.maximum.accumulate(bin_high)[:-1]
+        )
+        right_count = np.cumsum(counts[::-1])[::-1][1:]
+        right_area = surface_area(
+            np.minimum.accumulate(bin_low[::-1])[::-1][1:],
+            np.maximum.accumulate(bin_high[::-1])[::-1][1:],
+        )
+
+        cost = left_area * left_count + right_area * right_count
+        cost[(left_count == 0) | (right_count == 0)] = np.inf
+
+        split = int(np.argmin(cost))
+
+        if cost[split] < best_cost:
+            best_cost = cost[split]
+            best_axis = axis
+            best_bin = split
+            best_ids = ids
+
+    if best_axis < 0 or not np.isfinite(best_cost):
+        # Every centroid sits in the same place, so no plane separates them.  Just
+        # halve the list so that leaves still end up small
+        mid = len(indices) // 2
+        return indices[:mid], indices[mid:]
+
+    mask = best_ids <= best_bin
+    return indices[mask], indices[~mask]
+
+
+def sah_cost(node: BuildNode) -> float:
+    """The SAH cost of a whole hierarchy, relative to the surface area of its root.
+    Lower is better; useful for comparing trees built over the same primitives"""
+    root_area = float(surface_area(node.low, node.high))
+
+    if root_area <= 0:
+        return 0.0
+
+    def cost(n: BuildNode) -> float:
+        area = float(surface_area(n.low, n.high)) / root_area
+
+        if n.is_leaf:
+            return area * len(n.indices) * INTERSECTION_COST  # type: ignore[arg-type]
+
+        return (
+            area * TRAVERSAL_COST
+            + cost(n.left)  # type: ignore[arg-type]
+            + cost(n.right)  # type: ignore[arg-type]
+        )
+
+    return cost(node)
+
+
+def flatten_tree(
+    tree: BuildNode | None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Lays a hierarchy out as arrays in depth first order, returning:
+
+        node_bounds  (M, 6) float  low x/y/z and high x/y/z of every node
+        node_skip    (M,)   int    index of the node following this node's subtree
+        prim_offset  (M,)   int    first primitive of a leaf (0 for interior nodes)
+        prim_count   (M,)   int    number of primitives in a leaf (0 for interior nodes)
+        order        (N,)   int    the primitive indexes in leaf order
+
+    A leaf's primitives are order[offset:offset + count], so callers rearrange their
+    primitives by order to keep each leaf's contiguous.  An interior node's first child
+    always sits immediately after it"""
+    bounds: list[list[float]] = []
+    skip: list[int] = []
+    offset: list[int] = []
+    count: list[int] = []
+    order: list[int] = []
+
+    def visit(node: BuildNode) -> None:
+        index = len(bounds)
+        bounds.append([*node.low, *node.high])
+        skip.append(0)
+
+        if node.is_leaf:
+            offset.append(len(order))
+            count.append(len(node.indices))  # type: ignore[arg-type]
+            order.extend(node.indices.tolist())  # type: ignore[union-attr]
+        else:
+            offset.append(0)
+            count.append(0)
+            visit(node.left)  # type: ignore[arg-type]
+            visit(node.right)  # type: ignore[arg-type]
+
+        skip[index] = len(bounds)
+
+    if tree is not None:
+        visit(tree)
+
+    return (
+        np.array(bounds, dtype=np.float64).reshape(-1, 6),
+        np.array(skip, dtype=np.int32),
+        np.array(offset, dtype=np.int32),
+        np.array(count, dtype=np.int32),
+        np.array(order, dtype=np.int64),
+    )
+
+
+def traverse(
+    rows: list[tuple[float, ...]],
+    origin: tuple[float, float, float],
+    direction: tuple[float, float, float],
+) -> Iterator[tuple[int, int]]:
+    """Walks a flattened hierarchy without a stack, yielding (offset, count) for each
+    leaf whose box the ray passes through.  rows holds a tuple per node of its six
+    bounds followed by its skip, offset and count (see flatten_tree()): reading whole
+    rows from a list is far quicker from Python than indexing NumPy arrays one element
+    at a time.  On a hit we step to the next node, on a miss we jump to the skip"""
+    ox, oy, oz = origin
+    dx, dy, dz = direction
+
+    # Inverse direction for the slab tests; None marks an axis the ray runs
+    # parallel to, where we just check the origin lies between the planes
+    ix = 1.0 / dx if abs(dx) >= EPSILON else None
+    iy = 1.0 / dy if abs(dy) >= EPSILON else None
+    iz = 1.0 / dz if abs(dz) >= EPSILON else None
+
+    i = 0
+    end = len(rows)
+
+    while i < end:
+        x0, y0, z0, x1, y1, z1, skip, first, count = rows[i]
+
+        if ix is None:
+            if ox < x0 or ox > x1:
+                i = skip
+                continue
+            tmin, tmax = -np.inf, np.inf
+        else:
+            tmin = (x0 - ox) * ix
+            tmax = (x1 - ox) * ix
+            if tmin > tmax:
+                tmin, tmax = tmax, tmin
+
+        if iy is None:
+            if oy < y0 or oy > y1:
+                i = skip
+                continue
+        else:
+            t0 = (y0 - oy) * iy
+            t1 = (y1 - oy) * iy
+            if t0 > t1:
+                t0, t1 = t1, t0
+            if t0 > tmin:
+                tmin = t0
+            if t1 < tmax:
+                tmax = t1
+
+        if iz is None:
+            if oz < z0 or oz > z1:
+                i = skip
+                continue
+        else:
+            t0 = (z0 - oz) * iz
+            t1 = (z1 - oz) * iz
+            if t0 > t1:
+                t0, t1 = t1, t0
+            if t0 > tmin:
+                tmin = t0
+            if t1 < tmax:
+                tmax = t1
+
+        if tmin > tmax:
+            i = skip
+            continue
+
+        if count:
+            yield first, count  # type: ignore[misc]
+
+        i += 1
+
+
+def traversal_rows(
+    node_bounds: np.ndarray,
+    node_skip: np.ndarray,
+    prim_offset: np.ndarray,
+    prim_count: np.ndarray,
+) -> list[tuple[float, ...]]:
+    """The per-node rows used by traverse(), built from the arrays"""
+    return [
+        (*b, s, o, c)
+        for b, s, o, c in zip(
+            node_bounds.tolist(),
+            node_skip.tolist(),
+            prim_offset.tolist(),
+            prim_count.tolist(),
+        )
+    ]
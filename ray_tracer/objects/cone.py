@@ -10,6 +10,8 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 
 class Cone(AbstractObject):
+    __slots__ = ("_min", "_max", "closed")
+
     @override
     def __init__(
         self,
@@ -19,8 +21,8 @@ class Cone(AbstractObject):
     ) -> None:
         super().__init__()
 
-        self.__dict__["min"] = minimum
-        self.__dict__["max"] = maximum
+        self._min = minimum
+        self._max = maximum
         self.closed = closed
 
         self.bounds = Bounds(
@@ -30,19 +32,19 @@ class Cone(AbstractObject):
 
     @property
     def min(self) -> float:
-        return self.__dict__["min"]
+        return self._min
 
     @min.setter
     def min(self, m: float) -> None:
-        self.__dict__["min"] = m if m < self.max else self.max - EPSILON
+        self._min = m if m < self.max else self.max - EPSILON
 
     @property
     def max(self) -> float:
-        return self.__dict__["max"]
+        return self._max
 
     @max.setter
     def max(self, m: float) -> None:
-        self.__dict__["max"] = m if m > self.min else self.min + EPSILON
+        self._max = m if m > self.min else self.min + EPSILON
 
     @override
     def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
@@ -61,7 +63,7 @@ class Cone(AbstractObject):
             return Vector(op.x, y, op.z)
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
         a = ray.direction.x**2 - ray.direction.y**2 + ray.direction.z**2
         b = (
             2 * ray.origin.x * ray.direction.x
@@ -70,21 +72,18 @@ class Cone(AbstractObject):
         )
         c = ray.origin.x**2 - ray.origin.y**2 + ray.origin.z**2
 
-        xs = []
-
         # ray runs parallel to one edge of the cone
         if math.isclose(abs(a), 0.0, abs_tol=EPSILON):
-            return (
-                []
-                if math.isclose(abs(b), 0.0, abs_tol=EPSILON)
-                else [Intersection(-c / (2 * b), self)]
-            )
+            if not math.isclose(abs(b), 0.0, abs_tol=EPSILON):
+                xs.append(Intersection(-c / (2 * b), self))
+
+            return
         else:
             discriminant = b**2 - 4 * a * c
 
             # ray does not intersect the cylinder
             if discriminant < 0:
-                return []
+                return
 
             discriminant_root = math.sqrt(discriminant)
             two_a = 2 * a
@@ -107,9 +106,7 @@ class Cone(AbstractObject):
 
         # test for intersection with end caps
         if self.closed:
-            xs.extend(self.intersect_caps(ray))
-
-        return xs
+            self.intersect_caps(ray, xs)
 
     # helper function to reduce duplication
     # checks to see if the intersection at 't' is within a radius of
@@ -120,13 +117,11 @@ class Cone(AbstractObject):
 
         return (x**2 + z**2) <= abs(y)
 
-    def intersect_caps(self, ray: Ray) -> list[Intersection]:
+    def intersect_caps(self, ray: Ray, xs: list[Intersection]) -> None:
         # Caps only matter if the cylinder is closed and might possibly be intersected
         # by the ray
         if not self.closed or math.isclose(ray.direction.y, 0, abs_tol=EPSILON):
-            return []
-
-        xs = []
+            return
 
         # check for an intersection with the lower end cap
         t = (self.min - ray.origin.y) / ray.direction.y
@@ -137,5 +132,3 @@ class Cone(AbstractObject):
         t = (self.max - ray.origin.y) / ray.direction.y
         if self._check_cap(ray, t, self.max):
             xs.append(Intersection(t, self))
-
-        return xs
@@ -1,6 +1,8 @@
 from enum import Enum
+from typing import Iterator, override
 
 from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.material import Material
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.vector import Vector
@@ -14,23 +16,159 @@ class CSGOperation(Enum):
 
 
 class CSG(AbstractObject):
+    # The leaf index is derived data (and keyed by identity), so skip it when
+    # comparing two CSG objects by value
+    _structural_ignore = AbstractObject._structural_ignore | {"_sides"}
+
+    __slots__ = (
+        "operation",
+        "_sides",
+        "_left",
+        "_right",
+        "_left_bounds",
+        "_right_bounds",
+    )
+
     def __init__(
         self, op: CSGOperation, s1: AbstractObject, s2: AbstractObject
     ) -> None:
         super().__init__()
 
         self.operation = op
+
+        # Maps every leaf object beneath this CSG to the side it belongs to (True
+        # for left, False for right) so hit classification is a simple lookup
+        # rather than a walk of the left subtree.  Objects hash by identity, so this
+        # is effectively keyed on id()
+        self._sides: dict[AbstractObject, bool] = {}
+
         self.left = s1
         self.right = s2
 
-        s1.set_parent(self)  # type: ignore[arg-type]
-        s2.set_parent(self)  # type: ignore[arg-type]
+    @property
+    def left(self) -> AbstractObject:
+        return self._left
+
+    @left.setter
+    def left(self, s: AbstractObject) -> None:
+        self._attach(s, True)
+
+    @property
+    def right(self) -> AbstractObject:
+        return self._right
+
+    @right.setter
+    def right(self, s: AbstractObject) -> None:
+        self._attach(s, False)
+
+    def _attach(self, s: AbstractObject, is_left: bool) -> None:
+        """Sets one of the operands and rebuilds the leaf index for that side"""
+        key = "_left" if is_left else "_right"
+        previous = getattr(self, key, None)
+
+        if previous is not None:
+            for leaf in previous.leaves():
+                self._sides.pop(leaf, None)
+
+        setattr(self, key, s)
+        s.set_parent(self)  # type: ignore[arg-type]
+        self._index(s, is_left)
+        self._update_bounds()
 
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
-        xs = self.left.intersect(ray)
-        xs.extend(self.right.intersect(ray))
-        xs.sort(key=lambda x: x.t)
-        return self.filter_intersections(xs)
+        if self.parent is not None:
+            self.parent._descendant_added(s, self)
+
+    def _index(self, obj: AbstractObject, is_left: bool) -> None:
+        for leaf in obj.leaves():
+            self._sides[leaf] = is_left
+
+    def _update_bounds(self) -> None:
+        """Recomputes the bounds of each operand (in CSG space) and of the CSG itself,
+        which depend on the operation being performed"""
+        if not hasattr(self, "_left") or not hasattr(self, "_right"):
+            return
+
+        self._left_bounds = self.left.bounds.transform(self.left.transform)
+        self._right_bounds = self.right.bounds.transform(self.right.transform)
+
+        match self.operation:
+            case CSGOperation.union:
+                self.bounds = self._left_bounds.merge(self._right_bounds)
+
+            case CSGOperation.intersection:
+                self.bounds = self._left_bounds.overlap(self._right_bounds)
+
+            case CSGOperation.difference:
+                self.bounds = self._left_bounds
+
+    @override
+    def leaves(self) -> Iterator[AbstractObject]:
+        yield from self.left.leaves()
+        yield from self.right.leaves()
+
+    @override
+    def resolve_materials(self, inherited: Material | None = None) -> Material | None:
+        inherited = super().resolve_materials(inherited)
+        self.left.resolve_materials(inherited)
+        self.right.resolve_materials(inherited)
+        return inherited
+
+    @override
+    def _descendant_added(self, child: AbstractObject, via: AbstractObject) -> None:
+        self._index(child, via is self.left)
+        self._update_bounds()
+        super()._descendant_added(child, via)
+
+    @override
+    def _descendant_changed(self, via: AbstractObject) -> None:
+        self._update_bounds()
+        super()._descendant_changed(via)
+
+    @override
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
+        # Where an operand's bounds show it can't affect the result for this ray, we
+        # can skip intersecting it (and the filtering step) altogether
+        lspan = self._left_bounds.ray_span(ray)
+
+        if lspan is None and self.operation != CSGOperation.union:
+            # Both intersection and difference are confined to the left operand
+            return
+
+        rspan = self._right_bounds.ray_span(ray)
+
+        if lspan is None:
+            # Only possible for a union, so whatever the right operand gives us
+            if rspan is not None:
+                self.right.intersect_into(ray, xs)
+
+            return
+
+        if rspan is None:
+            match self.operation:
+                case CSGOperation.intersection:
+                    return
+
+                case _:
+                    self.left.intersect_into(ray, xs)
+                    return
+
+        # If the ray's spans through each operand don't overlap, then the operands
+        # can't interact along this ray either
+        if rspan[1] < lspan[0] or lspan[1] < rspan[0]:
+            match self.operation:
+                case CSGOperation.intersection:
+                    return
+
+                case CSGOperation.difference:
+                    self.left.intersect_into(ray, xs)
+                    return
+
+        # Filtering needs the hits on both operands, and only those, in order
+        operands: list[Intersection] = []
+        self.left.intersect_into(ray, operands)
+        self.right.intersect_into(ray, operands)
+        operands.sort(key=lambda x: x.t)
+        xs.extend(self.filter_intersections(operands))
 
     def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector: ...
 
@@ -43,7 +181,7 @@ class CSG(AbstractObject):
 
         for i in xs:
             # If i.obj is part of the 'left' child, then lhit is true
-            lhit = self.left in i.obj
+            lhit = self._sides.get(i.obj, False)
 
             if CSG.intersection_allowed(self.operation, lhit, inl, inr):
                 result.append(i)
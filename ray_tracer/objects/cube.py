@@ -10,6 +10,8 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 
 class Cube(AbstractObject):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__()
         self.bounds = Bounds(Point(-1, -1, -1), Point(1, 1, 1))
@@ -26,7 +28,7 @@ class Cube(AbstractObject):
             return Vector(0, 0, op.z)
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
         (xtmin, xtmax) = self.check_axis(ray.origin.x, ray.direction.x)
         (ytmin, ytmax) = self.check_axis(ray.origin.y, ray.direction.y)
         (ztmin, ztmax) = self.check_axis(ray.origin.z, ray.direction.z)
@@ -34,9 +36,11 @@ class Cube(AbstractObject):
         tmin = max(xtmin, ytmin, ztmin)
         tmax = min(xtmax, ytmax, ztmax)
 
-        return (
-            [] if tmin > tmax else [Intersection(tmin, self), Intersection(tmax, self)]
-        )
+        if tmin > tmax:
+            return
+
+        xs.append(Intersection(tmin, self))
+        xs.append(Intersection(tmax, self))
 
     def check_axis(self, origin: float, direction: float) -> tuple[float, float]:
         """Helper function to get planar intersects for a specific axis"""
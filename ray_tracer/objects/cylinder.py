@@ -10,6 +10,8 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 
 class Cylinder(AbstractObject):
+    __slots__ = ("_min", "_max", "closed")
+
     @override
     def __init__(
         self,
@@ -19,27 +21,27 @@ class Cylinder(AbstractObject):
     ) -> None:
         super().__init__()
 
-        self.__dict__["min"] = minimum
-        self.__dict__["max"] = maximum
+        self._min = minimum
+        self._max = maximum
         self.closed = closed
 
         self.bounds = Bounds(Point(-1, minimum, -1), Point(1, maximum, 1))
 
     @property
     def min(self) -> float:
-        return self.__dict__["min"]
+        return self._min
 
     @min.setter
     def min(self, m: float) -> None:
-        self.__dict__["min"] = m if m < self.max else self.max - EPSILON
+        self._min = m if m < self.max else self.max - EPSILON
 
     @property
     def max(self) -> float:
-        return self.__dict__["max"]
+        return self._max
 
     @max.setter
     def max(self, m: float) -> None:
-        self.__dict__["max"] = m if m > self.min else self.min + EPSILON
+        self._max = m if m > self.min else self.min + EPSILON
 
     @override
     def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
@@ -54,11 +56,9 @@ class Cylinder(AbstractObject):
             return Vector(op.x, 0, op.z)
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
         a = ray.direction.x**2 + ray.direction.z**2
 
-        xs = []
-
         # ray is parallel to y axis, so skip the sidewall intersection logic
         if not math.isclose(a, 0.0, abs_tol=EPSILON):
             b = 2 * ray.origin.x * ray.direction.x + 2 * ray.origin.z * ray.direction.z
@@ -67,7 +67,7 @@ class Cylinder(AbstractObject):
 
             # ray does not intersect the cylinder
             if discriminant < 0:
-                return []
+                return
 
             discriminant_root = math.sqrt(discriminant)
             two_a = 2 * a
@@ -90,9 +90,7 @@ class Cylinder(AbstractObject):
 
         # test for intersection with end caps
         if self.closed:
-            xs.extend(self.intersect_caps(ray))
-
-        return xs
+            self.intersect_caps(ray, xs)
 
     # helper function to reduce duplication
     # checks to see if the intersection at 't' is within a radius of
@@ -103,13 +101,11 @@ class Cylinder(AbstractObject):
 
         return (x**2 + z**2) <= 1
 
-    def intersect_caps(self, ray: Ray) -> list[Intersection]:
+    def intersect_caps(self, ray: Ray, xs: list[Intersection]) -> None:
         # Caps only matter if the cylinder is closed and might possibly be intersected
         # by the ray
         if not self.closed or math.isclose(ray.direction.y, 0, abs_tol=EPSILON):
-            return []
-
-        xs = []
+            return
 
         # check for an intersection with the lower end cap
         t = (self.min - ray.origin.y) / ray.direction.y
@@ -120,5 +116,3 @@ class Cylinder(AbstractObject):
         t = (self.max - ray.origin.y) / ray.direction.y
         if self._check_cap(ray, t):
             xs.append(Intersection(t, self))
-
-        return xs
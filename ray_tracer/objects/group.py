@@ -1,21 +1,38 @@
-import math
-from typing import cast, override
+from typing import Iterable, Iterator, Literal, cast, overload, override
+
+import numpy as np
 
 from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.material import Material
+from ray_tracer.classes.matrix import IDENTITY, Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.vector import Vector
-from ray_tracer.constants import EPSILON
-from ray_tracer.objects.abstract_object import AbstractObject, Bounds
+from ray_tracer.objects.abstract_object import AbstractObject, Bounds, bounds_arrays
+from ray_tracer.objects.bvh import (
+    INTERSECTION_COST,
+    LEAF_SIZE,
+    MAX_DEPTH,
+    REBUILD_RATIO,
+    SAH_BINS,
+    TRAVERSAL_COST,
+    BuildNode,
+    build_sah,
+    surface_area,
+)
+from ray_tracer.objects.linear_bvh import LinearBVH
 
-# The most number of objects we can have directly in a group.
-MAX_CHILDREN = 100
 
-# Maximum recursion depth we'll drop to for the purposes of optimization
-MAX_DEPTH = 20
+class Group(AbstractObject):
+    # Bookkeeping for optimize()/refit() which doesn't affect what the group is
+    _structural_ignore = AbstractObject._structural_ignore | {
+        "_needs_refit",
+        "_bvh_node",
+        "_built",
+    }
 
+    __slots__ = ("children", "_needs_refit", "_bvh_node", "_built")
 
-class Group(AbstractObject):
     @override
     def __init__(self) -> None:
         super().__init__()
@@ -23,167 +40,322 @@ class Group(AbstractObject):
         self.children: list[AbstractObject] = []
         self.bounds = Bounds(Point(0, 0, 0), Point(0, 0, 0))
 
+        # Set when something beneath the group has moved since its bounds were
+        # worked out (see refit())
+        self._needs_refit = False
+        # True for the intermediate groups created by optimize()
+        self._bvh_node = False
+        # The settings passed to the last optimize() and the SAH cost of the result
+        self._built: tuple[tuple[int, int, int | None], float] | None = None
+
     @override
     def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
         raise NotImplementedError
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
-        if self._bb_hit(ray):
-            xs = []
+    def leaves(self) -> Iterator[AbstractObject]:
+        for c in self.children:
+            yield from c.leaves()
 
-            for c in self.children:
-                xs.extend(c.intersect(ray))
+    @override
+    def resolve_materials(self, inherited: Material | None = None) -> Material | None:
+        inherited = super().resolve_materials(inherited)
 
-            return sorted(xs, key=lambda i: i.t)
-        else:
-            return []
+        for c in self.children:
+            c.resolve_materials(inherited)
+
+        return inherited
+
+    @override
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
+        if self._bb_hit(ray):
+            for c in self.children:
+                c.intersect_into(ray, xs)
 
     def _bb_hit(self, ray: Ray) -> bool:
         """Private function to test if an incoming ray hits the group bounding box"""
-        (xtmin, xtmax) = self._check_axis(
-            ray.origin.x, ray.direction.x, (self.bounds.low.x, self.bounds.high.x)
-        )
-        (ytmin, ytmax) = self._check_axis(
-            ray.origin.y, ray.direction.y, (self.bounds.low.y, self.bounds.high.y)
-        )
-        (ztmin, ztmax) = self._check_axis(
-            ray.origin.z, ray.direction.z, (self.bounds.low.z, self.bounds.high.z)
-        )
+        return self.bounds.ray_span(ray) is not None
 
-        tmin = max(xtmin, ytmin, ztmin)
-        tmax = min(xtmax, ytmax, ztmax)
+    def add_child(self, child: AbstractObject) -> None:
+        self.extend([child])
 
-        return False if tmin > tmax else True
+    def extend(self, children: Iterable[AbstractObject]) -> None:
+        """Adds several children at once.  All of their bounds are transformed and
+        merged into the group's bounds in a single pass, which is much quicker than
+        adding a large number of children one at a time"""
+        children = list(children)
 
-    def _check_axis(
-        self, origin: float, direction: float, limits: tuple[float, float]
-    ) -> tuple[float, float]:
-        """Helper function to get planar intersects for a specific axis"""
-        tmin_numerator = limits[0] - origin
-        tmax_numerator = limits[1] - origin
+        if not children:
+            return
 
-        if abs(direction) >= EPSILON:
-            tmin = tmin_numerator / direction
-            tmax = tmax_numerator / direction
-        else:
-            tmin = tmin_numerator * math.inf
-            tmax = tmax_numerator * math.inf
+        if any(child is self for child in children):
+            raise ValueError("A group cannot contain itself")
 
-        return (tmax, tmin) if tmin > tmax else (tmin, tmax)
+        for child in children:
+            child.set_parent(self)  # type: ignore[arg-type]
 
-    def add_child(self, child: AbstractObject) -> None:
-        if child == self:
-            raise ValueError("A group cannot contain itself")
+        # Figure out the transformed bounding boxes for the new children and
+        # integrate them into the current group bounds
+        lows, highs = bounds_arrays(children)
+        low = lows.min(axis=0)
+        high = highs.max(axis=0)
 
-        child.set_parent(self)  # type: ignore[arg-type]
-        self.children.append(child)
-
-        # Now, figure out the transformed bounding box for the new child
-        cb = child.bounds
-
-        # 1. get the bounds and convert to the eight cube corners
-        corners = [
-            Point(cb.low.x, cb.high.y, cb.high.z),
-            Point(cb.high.x, cb.high.y, cb.high.z),
-            Point(cb.high.x, cb.high.y, cb.low.z),
-            Point(cb.low.x, cb.high.y, cb.low.z),
-            Point(cb.low.x, cb.low.y, cb.high.z),
-            Point(cb.high.x, cb.low.y, cb.high.z),
-            Point(cb.high.x, cb.low.y, cb.low.z),
-            Point(cb.low.x, cb.low.y, cb.low.z),
-        ]
-        # 2. transform each of the corners by the object's transformation matrix
-        corners = [cast(Point, child.transform * c) for c in corners]
+        if self.children:
+            b = self.bounds
+            low = np.minimum(low, [b.low.x, b.low.y, b.low.z])
+            high = np.maximum(high, [b.high.x, b.high.y, b.high.z])
 
-        # 3. generate the new AABB coords for the transformed shape
-        min_x, min_y, min_z = map(min, zip(*[(c.x, c.y, c.z) for c in corners]))
-        max_x, max_y, max_z = map(max, zip(*[(c.x, c.y, c.z) for c in corners]))
+        self.children.extend(children)
+        self.bounds = Bounds(Point(*low), Point(*high))
 
-        # 4. integrate this into the current group bounds
-        if len(self.children) == 1:
-            # This is the first child, so just set the bb for this object
-            self.bounds = Bounds(Point(min_x, min_y, min_z), Point(max_x, max_y, max_z))
-        else:
-            self.bounds = Bounds(
-                Point(
-                    min(min_x, self.bounds.low.x),
-                    min(min_y, self.bounds.low.y),
-                    min(min_z, self.bounds.low.z),
-                ),
-                Point(
-                    max(max_x, self.bounds.high.x),
-                    max(max_y, self.bounds.high.y),
-                    max(max_z, self.bounds.high.z),
-                ),
-            )
+        if self.parent is not None:
+            for child in children:
+                self.parent._descendant_added(child, self)
 
-    def optimize(self, _depth: int = MAX_DEPTH) -> Group:
-        """Optimizes the current group to ensure that we can render objects in a
-        reasonable length of time.  We do this by limiting the number of objects
-        within a group to MAX_CHILDREN and if this is overstepped, then we separate
-        the group into two sub-groups along the longest axis"""
+    @override
+    def _descendant_changed(self, via: AbstractObject) -> None:
+        self._needs_refit = True
+        super()._descendant_changed(via)
+
+    def flatten(self) -> Group:
+        """Bakes the transforms of everything beneath the group into the objects
+        themselves (see AbstractObject.bake()), making them all direct children of
+        the group, so rays needn't be transformed on the way down.  Returns the group"""
+        objects: list[AbstractObject] = []
+        self._flatten_into(self.transform, objects, None)
+
+        self.set_transform(IDENTITY)
+        self._replace_children(objects)
+
+        return self
+
+    def _flatten_into(
+        self, m: Matrix, objects: list[AbstractObject], material: Material | None
+    ) -> None:
+        """material is the one set on the nearest group being flattened away above
+        the children, which they'd otherwise inherit from it"""
+        for c in self.children:
+            if isinstance(c, Group):
+                inner = c._own_material() or material
+                c._flatten_into(cast(Matrix, m * c.transform), objects, inner)
+            else:
+                if material is not None and c._own_material() is None:
+                    c.material = material
+
+                c.bake(m)
+                objects.append(c)
+
+    @overload
+    def optimize(
+        self,
+        leaf_size: int = ...,
+        bins: int = ...,
+        linear: Literal[False] = ...,
+        workers: int | None = ...,
+        _depth: int = ...,
+    ) -> Group: ...
+
+    @overload
+    def optimize(
+        self,
+        leaf_size: int = ...,
+        bins: int = ...,
+        *,
+        linear: Literal[True],
+        workers: int | None = ...,
+        _depth: int = ...,
+    ) -> LinearBVH: ...
+
+    def optimize(
+        self,
+        leaf_size: int = LEAF_SIZE,
+        bins: int = SAH_BINS,
+        linear: bool = False,
+        workers: int | None = 1,
+        _depth: int = MAX_DEPTH,
+    ) -> Group | LinearBVH:
+        """Arranges the children into a bounding volume hierarchy of nested groups
+        (see bvh.build_sah(), which takes leaf_size, bins and workers).  With linear
+        set, returns a LinearBVH to take the group's place instead"""
+
+        if linear:
+            return self._linearize(leaf_size, bins, _depth, workers)
 
         # Bail if we've gone too far down the rabbit hole...
         if _depth <= 0:
             return self
 
-        # If we don't have too many children, just optimize any child groups
-        if len(self.children) <= MAX_CHILDREN:
-            for i, child in enumerate(self.children):
-                if isinstance(child, Group):
-                    self.children[i] = child.optimize(_depth - 1)
-            return self
+        # Child groups have their own transforms (and may have been named in an obj
+        # file), so optimize each of them as a unit before arranging them here
+        for child in self.children:
+            if isinstance(child, Group):
+                child.optimize(leaf_size, bins, workers=workers, _depth=_depth - 1)
+
+        # Objects without finite bounds (planes, infinite cylinders etc.) can't be
+        # placed in the hierarchy, so they stay as direct children of this group
+        bounded = [c for c in self.children if c.bounds.is_finite()]
+        unbounded = [c for c in self.children if not c.bounds.is_finite()]
+
+        if len(bounded) > leaf_size:
+            lows, highs = bounds_arrays(bounded)
+            tree = build_sah(lows, highs, leaf_size, bins, _depth, workers)
+
+            self._replace_children(
+                [
+                    self._build_group(tree.left, bounded),  # type: ignore[arg-type]
+                    self._build_group(tree.right, bounded),  # type: ignore[arg-type]
+                    *unbounded,
+                ]
+            )
 
-        # First, get the largest dimension
-        xlen = self.bounds.high.x - self.bounds.low.x
-        ylen = self.bounds.high.y - self.bounds.low.y
-        zlen = self.bounds.high.z - self.bounds.low.z
+        self._built = ((leaf_size, bins, workers), self.sah_cost())
 
-        max_len = max(xlen, ylen, zlen)
-        split_axis = "x" if xlen == max_len else "y" if ylen == max_len else "z"
+        return self
 
-        # Initialise test bounds so that the linter is satisfied...
-        test_bounds = Bounds(Point(0, 0, 0), Point(0, 0, 0))
+    def sah_cost(self) -> float:
+        """The SAH cost of the hierarchy beneath this group relative to the surface
+        area of the group (see bvh.sah_cost()).  Each group counts as a node and every
+        other child as a primitive.  Children without finite bounds are left out, as
+        they cost the same however the rest is arranged"""
+        root_area = _finite_area(self)
 
-        match split_axis:
-            case "x":
-                mid = (self.bounds.low.x + self.bounds.high.x) / 2
-                test_bounds = Bounds(
-                    self.bounds.low, Point(mid, self.bounds.high.y, self.bounds.high.z)
-                )
+        if root_area <= 0:
+            return 0.0
 
-            case "y":
-                mid = (self.bounds.low.y + self.bounds.high.y) / 2
-                test_bounds = Bounds(
-                    self.bounds.low, Point(self.bounds.high.x, mid, self.bounds.high.z)
-                )
+        def cost(g: Group) -> float:
+            area = _finite_area(g) / root_area
+            total = area * TRAVERSAL_COST
 
-            case "z":
-                mid = (self.bounds.low.z + self.bounds.high.z) / 2
-                test_bounds = Bounds(
-                    self.bounds.low, Point(self.bounds.high.x, self.bounds.high.y, mid)
-                )
+            for c in g.children:
+                if isinstance(c, Group):
+                    total += cost(c)
+                elif c.bounds.is_finite():
+                    total += area * INTERSECTION_COST
 
-        low_group = Group()
-        high_group = Group()
+            return total
 
-        # Split all children into correct sub-groups
-        for child in self.children:
-            if child.is_in(test_bounds, full_containment=False):
-                low_group.add_child(child)
+        return cost(self)
+
+    def refit(self, rebuild_ratio: float | None = REBUILD_RATIO) -> float:
+        """Brings the bounds of an optimized group up to date after objects within it
+        have moved, keeping the shape of the hierarchy.  Only the groups along the
+        path to something that moved are recomputed, working from the bottom up.
+
+        Returns how far the hierarchy has degraded: its SAH cost now relative to when
+        it was last optimized (so 1.0 is no worse).  If that exceeds rebuild_ratio the
+        group is re-optimized from scratch as well; pass None to never rebuild and
+        decide from the returned value instead"""
+        if self._built is None:
+            # Never optimized, so measure against the hierarchy as it stands
+            self._built = ((LEAF_SIZE, SAH_BINS, 1), self.sah_cost())
+
+        self._refit()
+
+        settings, built_cost = self._built
+        ratio = self.sah_cost() / built_cost if built_cost > 0 else 1.0
+
+        if rebuild_ratio is not None and ratio > rebuild_ratio:
+            self._replace_children(self._unbuilt_children())
+            self.optimize(*settings[:2], workers=settings[2])
+
+        return ratio
+
+    def _refit(self) -> None:
+        if not self._needs_refit:
+            return
+
+        for c in self.children:
+            if isinstance(c, Group):
+                c._refit()
+            elif isinstance(c, LinearBVH):
+                c.refit(None)
+
+        self._needs_refit = False
+
+        lows, highs = bounds_arrays(self.children)
+
+        if len(lows) > 0:
+            self.bounds = Bounds(Point(*lows.min(axis=0)), Point(*highs.max(axis=0)))
+
+    def _unbuilt_children(self) -> list[AbstractObject]:
+        """The children this group would have without the intermediate groups added
+        by optimize()"""
+        children: list[AbstractObject] = []
+
+        for c in self.children:
+            if isinstance(c, Group) and c._bvh_node:
+                children.extend(c._unbuilt_children())
             else:
-                high_group.add_child(child)
+                children.append(c)
+
+        return children
+
+    def _linearize(
+        self, leaf_size: int, bins: int, max_depth: int, workers: int | None
+    ) -> LinearBVH:
+        children = [
+            c._linearize(leaf_size, bins, max_depth, workers)
+            if isinstance(c, Group)
+            else c
+            for c in self.children
+        ]
+        self._replace_children([])
+
+        bvh = LinearBVH(children, leaf_size, bins, max_depth, workers=workers)
+        bvh.transform = self.transform
+        bvh.material = self._material
+
+        return bvh
 
-        low_group = low_group.optimize(_depth - 1)
-        high_group = high_group.optimize(_depth - 1)
+    @staticmethod
+    def _build_group(node: BuildNode, objects: list[AbstractObject]) -> AbstractObject:
+        """Turns a node of a built hierarchy into a (possibly nested) group of the
+        objects it refers to.  Single object leaves are used as-is"""
+        if node.is_leaf:
+            if len(node.indices) == 1:  # type: ignore[arg-type]
+                return objects[node.indices[0]]  # type: ignore[index]
 
+            members = [objects[i] for i in node.indices]  # type: ignore[union-attr]
+        else:
+            members = [
+                Group._build_group(node.left, objects),  # type: ignore[arg-type]
+                Group._build_group(node.right, objects),  # type: ignore[arg-type]
+            ]
+
+        # The node already holds the bounds of everything beneath it, so there's no
+        # need to go through add_child() and transform each member's bounds again
         g = Group()
+        g._bvh_node = True
 
-        if len(low_group.children) > 0:
-            g.add_child(low_group)
+        for m in members:
+            m.set_parent(g)
 
-        if len(high_group.children) > 0:
-            g.add_child(high_group)
+        g.children = members
+        g.bounds = Bounds(Point(*node.low), Point(*node.high))
 
         return g
+
+    def _replace_children(self, children: list[AbstractObject]) -> None:
+        """Swaps out the whole list of children, recomputing the bounds"""
+        self.children = []
+        self.bounds = Bounds(Point(0, 0, 0), Point(0, 0, 0))
+        self.extend(children)
+
+
+def _finite_area(g: Group) -> float:
+    """Surface area of a group's bounds, ignoring any children with infinite bounds"""
+    if g.bounds.is_finite():
+        low, high = g.bounds.low, g.bounds.high
+    else:
+        lows, highs = bounds_arrays([c for c in g.children if c.bounds.is_finite()])
+
+        if len(lows) == 0:
+            return 0.0
+
+        low, high = Point(*lows.min(axis=0)), Point(*highs.max(axis=0))
+
+    return float(
+        surface_area(
+            np.array([low.x, low.y, low.z]), np.array([high.x, high.y, high.z])
+        )
+    )
@@ -0,0 +1,91 @@
+from typing import override
+
+from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.material import DEFAULT_MATERIAL, Material
+from ray_tracer.classes.point import Point
+from ray_tracer.classes.ray import Ray
+from ray_tracer.classes.vector import Vector
+from ray_tracer.objects.abstract_object import AbstractObject
+
+
+class Instance(AbstractObject):
+    """A transformed reference to a shape which is shared with other instances.
+
+    Putting the same mesh in a scene several times as ordinary objects means loading
+    (and optimizing) it once per copy, since each group owns its children.  An
+    instance instead points at the shape without adopting it, so any number of
+    instances can share a single set of triangles and a single hierarchy over them,
+    each with its own transform and material.
+
+    The shared shape must not belong to anything else (it stays without a parent, so
+    its own space is the instance's space) and should be finished, ie: loaded and
+    optimized, before it is instanced, as each instance takes its bounds from the
+    shape when it is created"""
+
+    __slots__ = ("shape",)
+
+    def __init__(self, shape: AbstractObject, material: Material | None = None) -> None:
+        """material, if given, overrides the materials of the shape's surfaces for
+        this instance.  Otherwise each surface is rendered with its own material"""
+        super().__init__()
+
+        if shape.parent is not None:
+            raise ValueError("An instanced shape cannot have a parent")
+
+        self.shape = shape
+        self.bounds = shape.bounds.transform(shape.transform)
+
+        if material is not None:
+            self.material = material
+
+    @override
+    def resolve_materials(self, inherited: Material | None = None) -> Material | None:
+        inherited = super().resolve_materials(inherited)
+
+        # The shape is shared, so it can't take on what any one instance inherits
+        self.shape.resolve_materials()
+        return inherited
+
+    @override
+    def material_for(self, i: Intersection) -> Material:
+        m = self._shape_material(i)
+        return self.effective_material if m is None else m
+
+    @override
+    def surface_for(
+        self, i: Intersection, point: Point
+    ) -> tuple[AbstractObject, Point]:
+        if i.inner is None or self._shape_material(i) is None:
+            return self, point
+
+        # The shape's world space is our own object space
+        return i.inner.obj.surface_for(i.inner, self.world_to_object(point))
+
+    def _shape_material(self, i: Intersection) -> Material | None:
+        """The material of the surface the hit i is on inside the shape, or None if
+        the hit is rendered with the instance's own (or inherited) material"""
+        if i.inner is None or self._own_material() is not None:
+            return None
+
+        # Surfaces of the shape left with the default take on the instance's
+        # material, if it has inherited one
+        m = i.inner.obj.material_for(i.inner)
+        return None if m is DEFAULT_MATERIAL else m
+
+    @override
+    def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
+        if i is None or i.inner is None:
+            raise ValueError("Instance normals need the intersection with the shape")
+
+        # The hit object's normal comes back in the space of the shared shape's
+        # root, which is our own object space
+        return i.inner.obj.normal_at(op, i.inner)
+
+    @override
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
+        inner: list[Intersection] = []
+        self.shape.intersect_into(ray, inner)
+
+        # The ray direction isn't normalised when it's transformed, so the hits on
+        # the shape are at the same t as they are along the original ray
+        xs.extend(Intersection(i.t, self, i.u, i.v, inner=i) for i in inner)
@@ -0,0 +1,310 @@
+"""A bounding volume hierarchy compiled into flat arrays"""
+
+from typing import Iterator, override
+
+import numpy as np
+
+from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.material import Material
+from ray_tracer.classes.point import Point
+from ray_tracer.classes.ray import Ray
+from ray_tracer.classes.vector import Vector
+from ray_tracer.objects.abstract_object import AbstractObject, Bounds, bounds_arrays
+from ray_tracer.objects.bvh import (
+    INTERSECTION_COST,
+    LEAF_SIZE,
+    MAX_DEPTH,
+    REBUILD_RATIO,
+    SAH_BINS,
+    TRAVERSAL_COST,
+    build_sah,
+    flatten_tree,
+    surface_area,
+    traversal_rows,
+    traverse,
+)
+from ray_tracer.objects.smooth_triangle import SmoothTriangle
+from ray_tracer.objects.triangle import Triangle
+from ray_tracer.objects.triangle_batch import intersect_triangles
+
+# How each primitive is intersected (see LinearBVH._update_traversal())
+_SINGLE = 0
+_FLAT = 1
+_SMOOTH = 2
+
+
+class LinearBVH(AbstractObject):
+    """A flattened, array backed bounding volume hierarchy over a list of objects"""
+
+    # The traversal snapshot is derived from the arrays, the rest is build bookkeeping
+    _structural_ignore = AbstractObject._structural_ignore | {
+        "_rows",
+        "_batch",
+        "_p1",
+        "_e1",
+        "_e2",
+        "_packed_stale",
+        "_settings",
+        "_built_cost",
+    }
+
+    # The nodes are in depth first order, each interior node followed by its first
+    # child, so traversal needs no stack: node_bounds (M, 6) holds each node's low
+    # and high corners, node_skip (M,) the node after its subtree, and prim_offset and
+    # prim_count (M,) a leaf's primitives (both 0 for interior nodes).  _p1, _e1 and
+    # _e2 pack the untransformed triangles for triangle_batch
+    __slots__ = (
+        "_settings",
+        "unbounded",
+        "node_bounds",
+        "node_skip",
+        "prim_offset",
+        "prim_count",
+        "primitives",
+        "_built_cost",
+        "_rows",
+        "_batch",
+        "_p1",
+        "_e1",
+        "_e2",
+        "_packed_stale",
+    )
+
+    def __init__(
+        self,
+        objects: list[AbstractObject],
+        leaf_size: int = LEAF_SIZE,
+        bins: int = SAH_BINS,
+        max_depth: int = MAX_DEPTH,
+        adopt: bool = True,
+        workers: int | None = 1,
+    ) -> None:
+        """Builds the hierarchy over objects.  Normally the objects become children of
+        the new LinearBVH, but with adopt set to False they keep their existing parents
+        and the hierarchy is purely an index over them (as used by the World).  workers
+        is passed on to build_sah()"""
+        super().__init__()
+
+        if adopt:
+            for o in objects:
+                o.set_parent(self)  # type: ignore[arg-type]
+
+        self._settings = (leaf_size, bins, max_depth, workers)
+        self._build(objects)
+
+    def _build(self, objects: list[AbstractObject]) -> None:
+        leaf_size, bins, max_depth, workers = self._settings
+
+        # Objects without finite bounds can't go in the hierarchy, so they are kept
+        # to one side and tested against every ray
+        bounded = [o for o in objects if o.bounds.is_finite()]
+        self.unbounded: list[AbstractObject] = [
+            o for o in objects if not o.bounds.is_finite()
+        ]
+
+        if bounded:
+            lows, highs = bounds_arrays(bounded)
+            tree = build_sah(lows, highs, leaf_size, bins, max_depth, workers)
+        else:
+            tree = None
+
+        (
+            self.node_bounds,
+            self.node_skip,
+            self.prim_offset,
+            self.prim_count,
+            order,
+        ) = flatten_tree(tree)
+        self.primitives: list[AbstractObject] = [bounded[i] for i in order.tolist()]
+
+        self._update_traversal()
+        self._update_bounds()
+        self._built_cost = self.sah_cost()
+
+    def _update_bounds(self) -> None:
+        parts = [o.bounds.transform(o.transform) for o in self.unbounded]
+
+        if len(self.node_bounds) > 0:
+            root = self.node_bounds[0]
+            parts.append(Bounds(Point(*root[:3]), Point(*root[3:])))
+
+        self.bounds = Bounds(Point(0, 0, 0), Point(0, 0, 0))
+
+        if parts:
+            self.bounds = parts[0]
+
+            for b in parts[1:]:
+                self.bounds = self.bounds.merge(b)
+
+    def sah_cost(self) -> float:
+        """The SAH cost of the hierarchy relative to the surface area of its root (see
+        bvh.sah_cost()).  Lower is better"""
+        if len(self.node_bounds) == 0:
+            return 0.0
+
+        areas = surface_area(self.node_bounds[:, :3], self.node_bounds[:, 3:])
+
+        if areas[0] <= 0:
+            return 0.0
+
+        costs = np.where(
+            self.prim_count > 0, self.prim_count * INTERSECTION_COST, TRAVERSAL_COST
+        )
+
+        return float((areas * costs).sum() / areas[0])
+
+    def refit(self, rebuild_ratio: float | None = REBUILD_RATIO) -> float:
+        """Recomputes the bounds of every node from the current bounds of the
+        primitives (eg: after some of them have moved), keeping the tree's topology.
+
+        Returns how far the tree has degraded: its SAH cost now relative to when it was
+        built (so 1.0 is no worse).  If that exceeds rebuild_ratio the hierarchy is
+        rebuilt from scratch as well; pass None to never rebuild and decide from the
+        returned value instead"""
+        if len(self.node_bounds) > 0:
+            lows, highs = bounds_arrays(self.primitives)
+
+            # Each leaf's primitives form a contiguous run and the runs are in order,
+            # so every leaf can be reduced over its run in one go
+            leaves = np.flatnonzero(self.prim_count)
+            starts = self.prim_offset[leaves]
+            self.node_bounds[leaves, :3] = np.minimum.reduceat(lows, starts)
+            self.node_bounds[leaves, 3:] = np.maximum.reduceat(highs, starts)
+
+            # Children always come after their parent, so sweeping backwards visits
+            # both children of a node before the node itself
+            rows = self.node_bounds.tolist()
+            skip = self.node_skip.tolist()
+            count = self.prim_count.tolist()
+
+            for i in range(len(rows) - 1, -1, -1):
+                if count[i] == 0:
+                    a = rows[i + 1]
+                    b = rows[skip[i + 1]]
+                    rows[i] = [min(a[k], b[k]) for k in range(3)] + [
+                        max(a[k], b[k]) for k in range(3, 6)
+                    ]
+
+            self.node_bounds[:] = rows
+
+        self._update_traversal()
+        self._update_bounds()
+
+        ratio = self.sah_cost() / self._built_cost if self._built_cost > 0 else 1.0
+
+        if rebuild_ratio is not None and ratio > rebuild_ratio:
+            self._build([*self.primitives, *self.unbounded])
+
+        return ratio
+
+    def _update_traversal(self) -> None:
+        """Rebuilds the per-node rows used during traversal (see bvh.traverse()) from
+        the arrays, and packs up the primitives' triangles.  The arrays and the
+        primitives themselves stay the canonical copy and this is just a snapshot of
+        them"""
+        self._rows = traversal_rows(
+            self.node_bounds, self.node_skip, self.prim_offset, self.prim_count
+        )
+        self._pack()
+
+    def _pack(self) -> None:
+        """Packs up the untransformed triangles among the primitives, to be
+        intersected together"""
+
+        # For each primitive, whether it's intersected as part of a batch (and if so
+        # whether it needs u/v recording) or on its own
+        self._batch = [
+            (_SMOOTH if isinstance(p, SmoothTriangle) else _FLAT)
+            if isinstance(p, (Triangle, SmoothTriangle)) and p._identity
+            else _SINGLE
+            for p in self.primitives
+        ]
+        packed = [k for k, b in enumerate(self._batch) if b != _SINGLE]
+
+        # First vertex and both edges of each packed triangle, indexed by primitive
+        rows = np.zeros((len(self.primitives), 9))
+
+        if packed:
+            rows[packed] = [
+                [
+                    *(p.verts[0].x, p.verts[0].y, p.verts[0].z),
+                    *(p.edges[0].x, p.edges[0].y, p.edges[0].z),
+                    *(p.edges[1].x, p.edges[1].y, p.edges[1].z),
+                ]
+                for p in (self.primitives[k] for k in packed)
+            ]
+
+        self._p1, self._e1, self._e2 = rows[:, :3], rows[:, 3:6], rows[:, 6:]
+        self._packed_stale = False
+
+    @override
+    def _descendant_changed(self, via: AbstractObject) -> None:
+        # A triangle may have been moved, so it's packed again before the next ray.
+        # The node bounds are left until refit() is called
+        self._packed_stale = True
+        super()._descendant_changed(via)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_bounds)
+
+    @override
+    def leaves(self) -> Iterator[AbstractObject]:
+        for p in self.primitives:
+            yield from p.leaves()
+
+        for p in self.unbounded:
+            yield from p.leaves()
+
+    @override
+    def resolve_materials(self, inherited: Material | None = None) -> Material | None:
+        inherited = super().resolve_materials(inherited)
+
+        for p in self.primitives:
+            p.resolve_materials(inherited)
+
+        for p in self.unbounded:
+            p.resolve_materials(inherited)
+
+        return inherited
+
+    @override
+    def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
+        raise NotImplementedError
+
+    @override
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
+        if self._packed_stale:
+            self._pack()
+
+        for p in self.unbounded:
+            p.intersect_into(ray, xs)
+
+        primitives = self.primitives
+        batch = self._batch
+        origin = (ray.origin.x, ray.origin.y, ray.origin.z)
+        direction = (ray.direction.x, ray.direction.y, ray.direction.z)
+        packed: list[int] = []
+
+        for first, count in traverse(self._rows, origin, direction):
+            for k in range(first, first + count):
+                if batch[k] == _SINGLE:
+                    primitives[k].intersect_into(ray, xs)
+                else:
+                    packed.append(k)
+
+        if packed:
+            index, t, u, v = intersect_triangles(
+                origin, direction, self._p1[packed], self._e1[packed], self._e2[packed]
+            )
+
+            for j, tj, uj, vj in zip(
+                index.tolist(), t.tolist(), u.tolist(), v.tolist()
+            ):
+                k = packed[j]
+
+                # Flat triangles don't record u/v on their intersections
+                if batch[k] == _SMOOTH:
+                    xs.append(Intersection(tj, primitives[k], uj, vj))
+                else:
+                    xs.append(Intersection(tj, primitives[k]))
@@ -5,11 +5,14 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TypeGuard
 
+import numpy as np
+
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.vector import Vector
 from ray_tracer.objects.group import Group
 from ray_tracer.objects.smooth_triangle import SmoothTriangle
 from ray_tracer.objects.triangle import Triangle
+from ray_tracer.objects.triangle_mesh import TriangleMesh
 
 
 # If we read a malformed vertex definition, then we raise this error
@@ -35,9 +38,10 @@ class Loader:
     default_group: Group = field(default_factory=lambda: Group())
     groups: dict[str, Group] = field(default_factory=dict)
 
-    def obj_to_group(self) -> Group:
+    def obj_to_group(self, workers: int | None = 1) -> Group:
         """Return a single group object which contains all the face data from
-        the loaded object file"""
+        the loaded object file.  workers sets how many processes are used to build
+        the bounding volume hierarchy (None for one per CPU)"""
         # Make a copy of the default group so we don't mutate it (note, we don't need
         # to use deep copy since we'll only be mutating the group itself)
         g = copy(self.default_group)
@@ -45,18 +49,28 @@ class Loader:
         for key in self.groups.keys():
             g.add_child(self.groups[key])
 
-        g = g.optimize()
+        g = g.optimize(workers=workers)
 
         return g
 
 
-def parse_obj_file(filepath: Path) -> Loader:
+def parse_obj_file(filepath: Path, mesh: bool = False) -> Loader:
     """Loads and parses the file.  If the path is invalid then raises
-    a FileNotFoundError exception"""
+    a FileNotFoundError exception.
+
+    Normally every face becomes a Triangle (or SmoothTriangle) of its group.  With mesh
+    set, each group instead gets a single TriangleMesh holding all of its faces, with
+    the vertex and normal data shared between the groups' meshes"""
 
     loader = Loader()
     latest_group = ""
 
+    # Faces are collected per group (with "" being the default group) and added in
+    # bulk once the whole file has been read.  For meshes just the vertex and normal
+    # indexes of each triangle are kept (-1 where a face has no normals)
+    faces: dict[str, list[Triangle | SmoothTriangle]] = {"": []}
+    mesh_faces: dict[str, list[tuple[int, int, int, int, int, int]]] = {"": []}
+
     with filepath.open("r", encoding="utf-8") as f:
         objdata = [line.strip() for line in f.readlines()]
 
@@ -106,16 +120,18 @@ def parse_obj_file(filepath: Path) -> Loader:
 
                 if latest_group != "" and latest_group not in loader.groups:
                     loader.groups[latest_group] = Group()
+                    faces[latest_group] = []
+                    mesh_faces[latest_group] = []
 
                 if is_all_ints(norms):
                     if min(norms) < 1 or max(norms) > len(loader.normals):
                         raise IndexError("Vertex normal index out of range")
 
-                for t in fan_triangulation(verts, loader.verts, norms, loader.normals):
-                    loader.default_group.add_child(
-                        t
-                    ) if latest_group == "" else loader.groups[latest_group].add_child(
-                        t
+                if mesh:
+                    mesh_faces[latest_group].extend(fan_indices(verts, norms))
+                else:
+                    faces[latest_group].extend(
+                        fan_triangulation(verts, loader.verts, norms, loader.normals)
                     )
 
             case "g":
@@ -132,13 +148,68 @@ def parse_obj_file(filepath: Path) -> Loader:
             case _:
                 loader.ignored += 1
 
+    if mesh:
+        _add_meshes(loader, mesh_faces)
+        return loader
+
+    loader.default_group.extend(faces.pop(""))
+
+    for name, group_faces in faces.items():
+        loader.groups[name].extend(group_faces)
+
     return loader
 
 
+def _add_meshes(
+    loader: Loader, mesh_faces: dict[str, list[tuple[int, int, int, int, int, int]]]
+) -> None:
+    """Gives each group with faces a TriangleMesh of them"""
+    vertices = np.array([(p.x, p.y, p.z) for p in loader.verts]).reshape(-1, 3)
+    normals = np.array([(n.x, n.y, n.z) for n in loader.normals]).reshape(-1, 3)
+
+    for name, indexes in mesh_faces.items():
+        if not indexes:
+            continue
+
+        data = np.array(indexes, dtype=np.int64)
+        smooth = bool((data[:, 3] >= 0).any())
+
+        m = TriangleMesh(
+            vertices,
+            data[:, :3],
+            normals if smooth else None,
+            data[:, 3:] if smooth else None,
+        )
+
+        (loader.groups[name] if name else loader.default_group).add_child(m)
+
+
 def is_all_ints(lst: list[int | None]) -> TypeGuard[list[int]]:
     return None not in lst
 
 
+def fan_indices(
+    indexes: list[int], normal_idx: list[int | None]
+) -> list[tuple[int, int, int, int, int, int]]:
+    """As fan_triangulation(), but giving the (0 based) vertex indexes of each
+    triangle followed by its vertex normal indexes, which are -1 if the face has no
+    normals"""
+    tris = []
+    norms = [n - 1 for n in normal_idx] if is_all_ints(normal_idx) else None
+
+    for idx in range(1, len(indexes) - 1):
+        tris.append(
+            (
+                indexes[0] - 1,
+                indexes[idx] - 1,
+                indexes[idx + 1] - 1,
+                *((norms[0], norms[idx], norms[idx + 1]) if norms else (-1, -1, -1)),
+            )
+        )
+
+    return tris
+
+
 def fan_triangulation(
     indexes: list[int],
     verts: list[Point],
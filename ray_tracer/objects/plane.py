@@ -10,6 +10,8 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 
 class Plane(AbstractObject):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__()
         self.bounds = Bounds(
@@ -21,10 +23,10 @@ class Plane(AbstractObject):
         return Vector(0, 1, 0)
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
         if abs(ray.direction.y) < EPSILON:
-            return []
+            return
 
         t = -ray.origin.y / ray.direction.y
 
-        return [Intersection(t, self)]
+        xs.append(Intersection(t, self))
@@ -2,6 +2,7 @@ import math
 from typing import cast, override
 
 from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.matrix import IDENTITY, Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.vector import Vector
@@ -10,14 +11,19 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 
 class SmoothTriangle(AbstractObject):
+    __slots__ = ("verts", "edges", "normals")
+
     def __init__(
         self, p1: Point, p2: Point, p3: Point, n1: Vector, n2: Vector, n3: Vector
     ) -> None:
         super().__init__()
 
+        self._set_verts(p1, p2, p3)
+        self.normals = [n1, n2, n3]
+
+    def _set_verts(self, p1: Point, p2: Point, p3: Point) -> None:
         self.verts = [p1, p2, p3]
         self.edges: list[Vector] = [cast(Vector, p2 - p1), cast(Vector, p3 - p1)]
-        self.normals = [n1, n2, n3]
 
         self.bounds = Bounds(
             Point(
@@ -33,14 +39,35 @@ class SmoothTriangle(AbstractObject):
         )
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+    def bake(self, m: Matrix) -> None:
+        if not self._identity:
+            m = cast(Matrix, m * self.transform)
+
+        if m.is_identity():
+            # Transforms which cancel out leave the vertices where they are
+            self.set_transform(IDENTITY)
+            return
+
+        n = m.inverse().transpose()
+
+        # The vertex normals aren't normalised here: they're interpolated and only
+        # normalised afterwards, which only gives the same result if they are
+        # transformed exactly as the interpolated normal used to be
+        normals = [cast(Vector, n * normal) for normal in self.normals]
+
+        self._set_verts(*(cast(Point, m * p) for p in self.verts))
+        self.normals = normals
+        self.set_transform(IDENTITY)
+
+    @override
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
         """Uses the Moller-Trumbore ray/triangle intersection algorithm
         see: https://www.tandfonline.com/doi/abs/10.1080/10867651.1997.10487468"""
         dir_cross_e2 = ray.direction.cross(self.edges[1])
         determinant = dir_cross_e2.dot(self.edges[0])
 
         if math.isclose(determinant, 0, abs_tol=EPSILON):
-            return []
+            return
 
         f = 1.0 / determinant
 
@@ -48,17 +75,17 @@ class SmoothTriangle(AbstractObject):
         u = f * p1_to_origin.dot(dir_cross_e2)
 
         if u < 0 or u > 1:
-            return []
+            return
 
         origin_cross_e1 = p1_to_origin.cross(self.edges[0])
         v = f * ray.direction.dot(origin_cross_e1)
 
         if v < 0 or (u + v) > 1:
-            return []
+            return
 
         t = f * self.edges[1].dot(origin_cross_e1)
 
-        return [Intersection(t, self, u, v)]
+        xs.append(Intersection(t, self, u, v))
 
     def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
         if i is None:
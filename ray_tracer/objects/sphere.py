@@ -9,6 +9,8 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 
 class Sphere(AbstractObject):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__()
         self.bounds = Bounds(Point(-1, -1, -1), Point(1, 1, 1))
@@ -19,7 +21,7 @@ class Sphere(AbstractObject):
         return cast(Vector, op - Point(0, 0, 0))
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
         # the vector from the object's centre to the ray origin (the object
         # is always centered on the world origin)
         object_to_ray = cast(Vector, ray.origin - Point(0, 0, 0))
@@ -31,13 +33,11 @@ class Sphere(AbstractObject):
         discriminant = b**2 - 4 * a * c
 
         if discriminant < 0:
-            return []
+            return
 
         discriminant_root = math.sqrt(discriminant)
-        return [
-            Intersection((-b - discriminant_root) / (2 * a), self),
-            Intersection((-b + discriminant_root) / (2 * a), self),
-        ]
+        xs.append(Intersection((-b - discriminant_root) / (2 * a), self))
+        xs.append(Intersection((-b + discriminant_root) / (2 * a), self))
 
     @staticmethod
     def glass() -> Sphere:
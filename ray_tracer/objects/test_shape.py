@@ -9,6 +9,7 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 class TestShape(AbstractObject):
     __test__ = False
+    __slots__ = ()
 
     def __init__(self) -> None:
         super().__init__()
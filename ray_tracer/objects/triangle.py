@@ -2,6 +2,7 @@ import math
 from typing import cast, override
 
 from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.matrix import IDENTITY, Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.vector import Vector
@@ -10,13 +11,18 @@ from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 
 
 class Triangle(AbstractObject):
+    __slots__ = ("verts", "edges", "normal")
+
     @override
     def __init__(self, p1: Point, p2: Point, p3: Point) -> None:
         super().__init__()
 
+        self._set_verts(p1, p2, p3)
+        self.normal: Vector = self.edges[1].cross(self.edges[0]).normalize()
+
+    def _set_verts(self, p1: Point, p2: Point, p3: Point) -> None:
         self.verts: list[Point] = [p1, p2, p3]
         self.edges: list[Vector] = [cast(Vector, p2 - p1), cast(Vector, p3 - p1)]
-        self.normal: Vector = self.edges[1].cross(self.edges[0]).normalize()
 
         self.bounds = Bounds(
             Point(
@@ -27,19 +33,37 @@ class Triangle(AbstractObject):
             Point(max(p1.x, p2.x, p3.x), max(p1.y, p2.y, p3.y), max(p1.z, p2.z, p3.z)),
         )
 
+    @override
+    def bake(self, m: Matrix) -> None:
+        if not self._identity:
+            m = cast(Matrix, m * self.transform)
+
+        if m.is_identity():
+            # Transforms which cancel out leave the vertices where they are
+            self.set_transform(IDENTITY)
+            return
+
+        # The normal is carried across rather than recalculated from the new edges,
+        # as a mirroring transform would otherwise flip it
+        normal = cast(Vector, m.inverse().transpose() * self.normal)
+
+        self._set_verts(*(cast(Point, m * p) for p in self.verts))
+        self.normal = normal.normalize()
+        self.set_transform(IDENTITY)
+
     @override
     def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
         return self.normal
 
     @override
-    def _local_intersect(self, ray: Ray) -> list[Intersection]:
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
         """Uses the Moller-Trumbore ray/triangle intersection algorithm
         see: https://www.tandfonline.com/doi/abs/10.1080/10867651.1997.10487468"""
         dir_cross_e2 = ray.direction.cross(self.edges[1])
         determinant = dir_cross_e2.dot(self.edges[0])
 
         if math.isclose(determinant, 0, abs_tol=EPSILON):
-            return []
+            return
 
         f = 1.0 / determinant
 
@@ -47,14 +71,14 @@ class Triangle(AbstractObject):
         u = f * p1_to_origin.dot(dir_cross_e2)
 
         if u < 0 or u > 1:
-            return []
+            return
 
         origin_cross_e1 = p1_to_origin.cross(self.edges[0])
         v = f * ray.direction.dot(origin_cross_e1)
 
         if v < 0 or (u + v) > 1:
-            return []
+            return
 
         t = f * self.edges[1].dot(origin_cross_e1)
 
-        return [Intersection(t, self)]
+        xs.append(Intersection(t, self))
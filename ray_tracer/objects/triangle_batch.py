@@ -0,0 +1,62 @@
+"""Möller-Trumbore ray/triangle intersection over many triangles at once
+
+Triangles are given as (K, 3) arrays of their first vertex and their two edges from it
+(p2 - p1 and p3 - p1), as held by Triangle and SmoothTriangle.  A ray is tested against
+all K of them in a handful of NumPy operations, which is far cheaper than testing each
+triangle in turn once more than a few are involved.  The arithmetic is the same as
+Triangle._local_intersect_into(), so the hits found are the same too.
+"""
+
+import numpy as np
+
+from ray_tracer.constants import EPSILON
+
+
+def intersect_triangles(
+    origin: tuple[float, float, float],
+    direction: tuple[float, float, float],
+    p1: np.ndarray,
+    e1: np.ndarray,
+    e2: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Intersects a ray with K triangles, returning the indexes of the triangles hit
+    along with the t, u and v of each hit (u and v being the barycentric coordinates
+    used by SmoothTriangle)"""
+    ox, oy, oz = origin
+    dx, dy, dz = direction
+    e1x, e1y, e1z = e1[:, 0], e1[:, 1], e1[:, 2]
+    e2x, e2y, e2z = e2[:, 0], e2[:, 1], e2[:, 2]
+
+    # direction x e2
+    cx = dy * e2z - dz * e2y
+    cy = dz * e2x - dx * e2z
+    cz = dx * e2y - dy * e2x
+    determinant = cx * e1x + cy * e1y + cz * e1z
+
+    # Rays parallel to a triangle give a zero determinant; those lanes are thrown
+    # away by the mask below, so there's no need to hear about them
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = 1.0 / determinant
+
+        px = ox - p1[:, 0]
+        py = oy - p1[:, 1]
+        pz = oz - p1[:, 2]
+        u = f * (px * cx + py * cy + pz * cz)
+
+        # (origin - p1) x e1
+        qx = py * e1z - pz * e1y
+        qy = pz * e1x - px * e1z
+        qz = px * e1y - py * e1x
+        v = f * (dx * qx + dy * qy + dz * qz)
+        t = f * (e2x * qx + e2y * qy + e2z * qz)
+
+    hit = (
+        (np.abs(determinant) > EPSILON)
+        & (u >= 0)
+        & (u <= 1)
+        & (v >= 0)
+        & ((u + v) <= 1)
+    )
+    index = np.flatnonzero(hit)
+
+    return index, t[index], u[index], v[index]
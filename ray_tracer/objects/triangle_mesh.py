@@ -0,0 +1,206 @@
+"""A whole triangle mesh as a single object, kept in shared NumPy buffers"""
+
+from typing import override
+
+import numpy as np
+
+from ray_tracer.classes.intersection import Intersection
+from ray_tracer.classes.matrix import IDENTITY, Matrix
+from ray_tracer.classes.point import Point
+from ray_tracer.classes.ray import Ray
+from ray_tracer.classes.vector import Vector
+from ray_tracer.objects.abstract_object import AbstractObject, Bounds
+from ray_tracer.objects.bvh import (
+    MAX_DEPTH,
+    SAH_BINS,
+    build_sah,
+    flatten_tree,
+    traversal_rows,
+    traverse,
+)
+from ray_tracer.objects.triangle_batch import intersect_triangles
+
+# Intersecting a leaf's faces together costs little more for sixteen faces than for
+# four, so mesh leaves are larger than the default (see bvh.LEAF_SIZE)
+MESH_LEAF_SIZE = 16
+
+
+class TriangleMesh(AbstractObject):
+    # The traversal snapshots are derived from the arrays
+    _structural_ignore = AbstractObject._structural_ignore | {
+        "_rows",
+        "_p1",
+        "_e1",
+        "_e2",
+    }
+
+    # vertices (V, 3) are the vertex positions and triangles (F, 3) each face's
+    # vertex indexes.  normals (N, 3) and normal_indices (F, 3), if given, are the
+    # vertex normals and each face's indexes into them (-1 for faces without any).
+    # The hierarchy over the faces is laid out as in LinearBVH
+    __slots__ = (
+        "vertices",
+        "triangles",
+        "normals",
+        "normal_indices",
+        "face_normals",
+        "_settings",
+        "node_bounds",
+        "node_skip",
+        "prim_offset",
+        "prim_count",
+        "order",
+        "_rows",
+        "_p1",
+        "_e1",
+        "_e2",
+    )
+
+    def __init__(
+        self,
+        vertices: np.ndarray,
+        triangles: np.ndarray,
+        normals: np.ndarray | None = None,
+        normal_indices: np.ndarray | None = None,
+        leaf_size: int = MESH_LEAF_SIZE,
+        bins: int = SAH_BINS,
+        max_depth: int = MAX_DEPTH,
+    ) -> None:
+        """vertices and triangles describe the faces (see __slots__).  Faces are smooth
+        shaded where normals and normal_indices are given, and flat shaded otherwise.
+        The arrays aren't copied, so several meshes (eg: the groups of one obj file)
+        can share a single vertex buffer"""
+        super().__init__()
+
+        if (normals is None) != (normal_indices is None):
+            raise ValueError("normals and normal_indices must be given together")
+
+        self.vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        self.normals = (
+            None if normals is None else np.asarray(normals, dtype=np.float64)
+        )
+        self.normal_indices = (
+            None
+            if normal_indices is None
+            else np.asarray(normal_indices, dtype=np.int64).reshape(-1, 3)
+        )
+
+        # Flat shading uses the same normal as a Triangle with these vertices
+        corners = self.vertices[self.triangles]
+        self.face_normals = _normalize(
+            np.cross(corners[:, 2] - corners[:, 0], corners[:, 1] - corners[:, 0])
+        )
+
+        self._settings = (leaf_size, bins, max_depth)
+        self._build()
+
+    def _build(self) -> None:
+        corners = self.vertices[self.triangles]
+        p1 = corners[:, 0]
+        e1 = corners[:, 1] - p1
+        e2 = corners[:, 2] - p1
+
+        if len(corners) > 0:
+            lows = corners.min(axis=1)
+            highs = corners.max(axis=1)
+            self.bounds = Bounds(Point(*lows.min(axis=0)), Point(*highs.max(axis=0)))
+            tree = build_sah(lows, highs, *self._settings)
+        else:
+            self.bounds = Bounds(Point(0, 0, 0), Point(0, 0, 0))
+            tree = None
+
+        (
+            self.node_bounds,
+            self.node_skip,
+            self.prim_offset,
+            self.prim_count,
+            self.order,
+        ) = flatten_tree(tree)
+
+        self._rows = traversal_rows(
+            self.node_bounds, self.node_skip, self.prim_offset, self.prim_count
+        )
+
+        # The first vertex and both edges of every face, in leaf order
+        self._p1 = p1[self.order]
+        self._e1 = e1[self.order]
+        self._e2 = e2[self.order]
+
+    @property
+    def face_count(self) -> int:
+        return len(self.triangles)
+
+    @override
+    def bake(self, m: Matrix) -> None:
+        if not self._identity:
+            m = m * self.transform  # type: ignore[assignment]
+
+        if m.is_identity():
+            # Transforms which cancel out leave the vertices where they are
+            self.set_transform(IDENTITY)
+            return
+
+        # New arrays are made rather than writing into the old ones, which may be
+        # shared with other meshes
+        self.vertices = m.apply_points(self.vertices)
+
+        # Normals are carried across as in Triangle and SmoothTriangle (the vertex
+        # normals again without being normalised)
+        self.face_normals = _normalize(m.apply_normals(self.face_normals))
+
+        if self.normals is not None:
+            self.normals = m.apply_normals(self.normals)
+
+        self._build()
+        self.set_transform(IDENTITY)
+
+    @override
+    def _normal_func(self, op: Point, i: Intersection | None = None) -> Vector:
+        if i is None or i.face is None:
+            raise ValueError("Mesh normals need the intersection with the mesh")
+
+        if self.normal_indices is not None and self.normal_indices[i.face, 0] >= 0:
+            if i.u is None or i.v is None:
+                raise ValueError("Invalid intersection passed to a TriangleMesh")
+
+            n1, n2, n3 = self.normals[self.normal_indices[i.face]]  # type: ignore[index]
+            n = n2 * i.u + n3 * i.v + n1 * (1 - i.u - i.v)
+        else:
+            n = self.face_normals[i.face]
+
+        return Vector(*n.tolist())
+
+    @override
+    def _local_intersect_into(self, ray: Ray, xs: list[Intersection]) -> None:
+        origin = (ray.origin.x, ray.origin.y, ray.origin.z)
+        direction = (ray.direction.x, ray.direction.y, ray.direction.z)
+        selected: list[int] = []
+
+        for first, count in traverse(self._rows, origin, direction):
+            selected.extend(range(first, first + count))
+
+        if not selected:
+            return
+
+        index, t, u, v = intersect_triangles(
+            origin,
+            direction,
+            self._p1[selected],
+            self._e1[selected],
+            self._e2[selected],
+        )
+        faces = self.order[selected][index]
+
+        xs.extend(
+            Intersection(tk, self, uk, vk, face=fk)
+            for tk, uk, vk, fk in zip(
+                t.tolist(), u.tolist(), v.tolist(), faces.tolist()
+            )
+        )
+
+
+def _normalize(v: np.ndarray) -> np.ndarray:
+    """Normalises each row of v, leaving any zero length rows as they are"""
+    lengths = np.linalg.norm(v, axis=1, keepdims=True)
+    return v / np.where(lengths > 0, lengths, 1.0)
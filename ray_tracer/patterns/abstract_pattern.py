@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, ClassVar, cast
 
 from ray_tracer.classes.colour import Colour
-from ray_tracer.classes.matrix import Matrix
+from ray_tracer.classes.matrix import IDENTITY, Matrix
 from ray_tracer.classes.point import Point
 
 if TYPE_CHECKING:
@@ -10,9 +10,14 @@ if TYPE_CHECKING:
 
 
 class AbstractPattern(ABC):
+    # Count of changes to any pattern, so that compiled patterns (see compiled.py)
+    # can tell when they've gone stale
+    generation: ClassVar[int] = 0
+
     def __init__(self) -> None:
-        self.__dict__["transform"] = Matrix.Identity()
-        self.__dict__["inverse_transform"] = self.transform.inverse()
+        # Patterns share the frozen identity transform until given one of their own
+        self.__dict__["transform"] = IDENTITY
+        self.__dict__["inverse_transform"] = IDENTITY
 
     @abstractmethod
     def colour_at(self, p: Point) -> Colour | AbstractPattern: ...
@@ -31,6 +36,16 @@ class AbstractPattern(ABC):
 
         return computed_colour
 
+    def __setattr__(self, name: str, value: object) -> None:
+        AbstractPattern.generation += 1
+        super().__setattr__(name, value)
+
+    def __getstate__(self) -> dict[str, object]:
+        # Compiled patterns are left behind, to be compiled again where needed
+        state = dict(self.__dict__)
+        state.pop("_compiled", None)
+        return state
+
     def set_transform(self, m: Matrix) -> None:
         self.transform = m
         self.inverse_transform = m.inverse()
@@ -0,0 +1,236 @@
+"""Pattern trees flattened into lists of nodes, each with the one matrix taking world
+space straight into its pattern space, for quick evaluation"""
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, cast
+
+import numpy as np
+
+from ray_tracer.classes.colour import Colour
+from ray_tracer.classes.point import Point
+from ray_tracer.constants import EPSILON
+from ray_tracer.patterns.abstract_pattern import AbstractPattern
+from ray_tracer.patterns.blend import Blend
+from ray_tracer.patterns.checkerboard import Checkerboard
+from ray_tracer.patterns.gradient import Gradient
+from ray_tracer.patterns.noise import Noise
+from ray_tracer.patterns.rings import Rings
+from ray_tracer.patterns.stripes import Stripes
+
+if TYPE_CHECKING:
+    from ray_tracer.objects.abstract_object import AbstractObject
+
+
+@dataclass(slots=True)
+class _Node:
+    pattern: AbstractPattern | Colour
+    # Taking world space into the node's pattern space, as an array and as the first
+    # three rows
+    matrix: np.ndarray | None = None
+    rows: tuple[float, ...] = ()
+    # Indexes of the nodes for the pattern's a and b
+    a: int = -1
+    b: int = -1
+
+
+class CompiledPattern:
+    def __init__(
+        self, pattern: AbstractPattern, world: np.ndarray, local: np.ndarray
+    ) -> None:
+        """world and local are the inverses of the object's world transform and of
+        its own transform, which are all the patterns need of it"""
+        self.nodes: list[_Node] = []
+
+        self._world = world
+        self._local = local
+        self._add(pattern, np.identity(4))
+
+    def _add(self, pattern: AbstractPattern | Colour, incoming: np.ndarray) -> int:
+        """Adds the node for pattern, whose points arrive through incoming, along
+        with the nodes beneath it, and returns its index"""
+        k = len(self.nodes)
+        node = _Node(pattern)
+        self.nodes.append(node)
+
+        if isinstance(pattern, Colour):
+            return k
+
+        # As in the patterns themselves, Blend and Noise take points into object
+        # space with the object's own transform, the rest with its world transform
+        into_object = self._local if type(pattern) in (Blend, Noise) else self._world
+        m = _as_array(pattern.inverse_transform) @ into_object @ incoming
+        node.matrix = m
+        node.rows = tuple(m[:3].ravel().tolist())
+
+        if type(pattern) in _SELECTORS or type(pattern) in (Blend, Noise):
+            node.a = self._add(pattern.a, m)  # type: ignore[attr-defined]
+            node.b = self._add(pattern.b, m)  # type: ignore[attr-defined]
+
+        return k
+
+    def colour_at(self, p: Point) -> Colour:
+        """The colour of the pattern at p (in world space)"""
+        return self._colour_at(0, p.x, p.y, p.z)
+
+    def _colour_at(self, k: int, x: float, y: float, z: float) -> Colour:
+        node = self.nodes[k]
+        pattern = node.pattern
+
+        if isinstance(pattern, Colour):
+            return pattern
+
+        a, b, c, tx, d, e, f, ty, g, h, i, tz = node.rows
+        px = a * x + b * y + c * z + tx
+        py = d * x + e * y + f * z + ty
+        pz = g * x + h * y + i * z + tz
+        kind = type(pattern)
+
+        if kind in _SELECTORS:
+            first = _SELECTORS[kind](px, py, pz)
+            return self._colour_at(node.a if first else node.b, x, y, z)
+
+        if kind is Gradient:
+            return pattern.colour_at(Point.of(px, py, pz))
+
+        if kind is Blend:
+            bias = pattern.bias  # type: ignore[attr-defined]
+            colour_a = self._colour_at(node.a, x, y, z) * (1.0 - bias)
+            colour_b = self._colour_at(node.b, x, y, z) * bias
+            return colour_a + colour_b
+
+        if kind is Noise:
+            noise_value = (pattern.noise(px, py, pz) + 1) / 2  # type: ignore[attr-defined]
+            colour_a = self._colour_at(node.a, x, y, z) * (1.0 - noise_value)
+            colour_b = self._colour_at(node.b, x, y, z) * noise_value
+            return colour_a + colour_b
+
+        return self._generic(pattern, Point.of(px, py, pz))
+
+    def _generic(self, pattern: AbstractPattern, p: Point) -> Colour:
+        """The colour of a pattern the compiler doesn't know about, at p in its
+        pattern space"""
+        computed_colour = pattern.colour_at(p)
+
+        if isinstance(computed_colour, AbstractPattern):
+            # As in colour_at_object(), the point goes on to the pattern given as if
+            # it were in world space
+            nested = _compiled(computed_colour, self._world, self._local)
+            return nested.colour_at(p)
+
+        return computed_colour
+
+    def colours(self, points: np.ndarray) -> np.ndarray:
+        """The colours of the pattern at each of an (N, 3) array of points (in world
+        space), as an (N, 3) array"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        return self._colours(0, points)
+
+    def _colours(self, k: int, points: np.ndarray) -> np.ndarray:
+        node = self.nodes[k]
+        pattern = node.pattern
+
+        if isinstance(pattern, Colour):
+            return np.broadcast_to(_rgb(pattern), points.shape).copy()
+
+        m = cast(np.ndarray, node.matrix)
+        local = points @ m[:3, :3].T + m[:3, 3]
+        kind = type(pattern)
+
+        if kind in _SELECTORS:
+            first = _SELECTOR_ARRAYS[kind](local[:, 0], local[:, 1], local[:, 2])
+            result = np.empty_like(points)
+            result[first] = self._colours(node.a, points[first])
+            result[~first] = self._colours(node.b, points[~first])
+            return result
+
+        if kind is Gradient:
+            a, b = _rgb(pattern.a), _rgb(pattern.b)  # type: ignore[attr-defined]
+            return a + (b - a) * ((local[:, :1] + 1) / 2)
+
+        if kind is Blend:
+            bias = pattern.bias  # type: ignore[attr-defined]
+            colour_a = self._colours(node.a, points) * (1.0 - bias)
+            colour_b = self._colours(node.b, points) * bias
+            return colour_a + colour_b
+
+        if kind is Noise:
+            noise_value = pattern.noise_array(local)  # type: ignore[attr-defined]
+            noise_value = ((noise_value + 1) / 2)[:, np.newaxis]
+            colour_a = self._colours(node.a, points) * (1.0 - noise_value)
+            colour_b = self._colours(node.b, points) * noise_value
+            return colour_a + colour_b
+
+        result = np.empty_like(points)
+
+        for j, p in enumerate(local.tolist()):
+            c = self._generic(pattern, Point.of(*p))
+            result[j] = (c.red, c.green, c.blue)
+
+        return result
+
+
+def compiled(pattern: AbstractPattern, obj: AbstractObject) -> CompiledPattern:
+    """The pattern compiled for obj.  It's kept with the pattern for anything else
+    placed the same way (eg: the baked triangles of a mesh), and compiled again once
+    anything about the patterns has changed"""
+    return _compiled(
+        pattern, _as_array(obj.world_inverse), _as_array(obj.inverse_transform)
+    )
+
+
+def _compiled(
+    pattern: AbstractPattern, world: np.ndarray, local: np.ndarray
+) -> CompiledPattern:
+    cache: tuple[int, dict[tuple[bytes, bytes], CompiledPattern]] | None
+    cache = pattern.__dict__.get("_compiled")
+
+    if cache is None or cache[0] != AbstractPattern.generation:
+        cache = pattern.__dict__["_compiled"] = (AbstractPattern.generation, {})
+
+    placements = cache[1]
+    key = (world.tobytes(), local.tobytes())
+    c = placements.get(key)
+
+    if c is None:
+        if len(placements) >= _PLACEMENTS:
+            del placements[next(iter(placements))]
+
+        c = placements[key] = CompiledPattern(pattern, world, local)
+
+    return c
+
+
+def _rgb(c: Colour) -> np.ndarray:
+    return np.array([c.red, c.green, c.blue])
+
+
+def _as_array(m: object) -> np.ndarray:
+    return np.asarray(m.data, dtype=np.float64)  # type: ignore[attr-defined]
+
+
+# The most placements a pattern is kept compiled for, the oldest being dropped to make
+# room for more
+_PLACEMENTS = 1024
+
+# Patterns choosing between their a and b, by whether a point (in pattern space)
+# picks a, as in each pattern's colour_at()
+_SELECTORS: dict[type, Callable[[float, float, float], bool]] = {
+    Stripes: lambda x, y, z: math.floor(x + EPSILON) % 2 == 0,
+    Checkerboard: lambda x, y, z: (
+        (math.floor(x + EPSILON) + math.floor(y + EPSILON) + math.floor(z + EPSILON))
+        % 2
+        == 0
+    ),
+    Rings: lambda x, y, z: math.floor(math.sqrt(x**2 + z**2)) % 2 == 0,
+}
+
+_SELECTOR_ARRAYS: dict[
+    type, Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+] = {
+    Stripes: lambda x, y, z: np.floor(x + EPSILON) % 2 == 0,
+    Checkerboard: lambda x, y, z: (
+        (np.floor(x + EPSILON) + np.floor(y + EPSILON) + np.floor(z + EPSILON)) % 2 == 0
+    ),
+    Rings: lambda x, y, z: np.floor(np.sqrt(x**2 + z**2)) % 2 == 0,
+}
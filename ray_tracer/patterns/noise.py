@@ -1,6 +1,11 @@
-from typing import TYPE_CHECKING, cast, override
+import math
+import time
+import warnings
+from typing import TYPE_CHECKING, Sequence, TypeVar, cast, override
+from weakref import WeakValueDictionary
 
-from opensimplex import noise3, random_seed, seed
+import numpy as np
+from opensimplex import OpenSimplex
 
 from ray_tracer.classes.colour import Colour, Colours
 from ray_tracer.classes.point import Point
@@ -9,6 +14,9 @@ from ray_tracer.patterns.abstract_pattern import AbstractPattern
 if TYPE_CHECKING:
     from ray_tracer.objects.abstract_object import AbstractObject
 
+# The seed of noise patterns which aren't given one
+DEFAULT_SEED = 3
+
 
 class Noise(AbstractPattern):
     """Blends two patterns or colours together based on the output of the
@@ -18,15 +26,18 @@ class Noise(AbstractPattern):
         self,
         a: AbstractPattern | Colour,
         b: AbstractPattern | Colour,
-        seed_: int | None = None,
+        seed_: int | None = DEFAULT_SEED,
     ) -> None:
+        """Each Noise has noise of its own, from seed_, so the same seed gives the
+        same noise from one render to the next.  Passing None picks a seed at random
+        (from the clock), which is kept, so that a pattern copied to other processes
+        for a parallel render gives the same noise in all of them"""
         super().__init__()
         self.a = a
         self.b = b
-        if seed_ is None:
-            random_seed()
-        else:
-            seed(seed_)
+        self.seed = time.time_ns() if seed_ is None else seed_
+        self._simplex = OpenSimplex(self.seed)
+        self._lattice: _Lattice | None = None
 
     def colour_at(self, p: Point) -> Colour:
         """Like blend, this isn't used, but is required by base class"""
@@ -42,7 +53,7 @@ class Noise(AbstractPattern):
 
         # Determine the value of the noise function at pattern_point and map it to the
         # range [0.0 - 1.0]
-        noise_value = noise3(pattern_point.x, pattern_point.y, pattern_point.z)
+        noise_value = self.noise(pattern_point.x, pattern_point.y, pattern_point.z)
         noise_value = (noise_value + 1) / 2
 
         colour_a = (
@@ -60,3 +71,171 @@ class Noise(AbstractPattern):
         computed_colour = colour_a + colour_b
 
         return computed_colour
+
+    def noise(self, x: float, y: float, z: float) -> float:
+        """The noise, in [-1, 1], at a point in pattern space"""
+        if self._lattice is not None:
+            n = self._lattice.lookup(x, y, z)
+
+            if n is not None:
+                return n
+
+            self._lattice.left()
+
+        return self._simplex.noise3(x, y, z)
+
+    def noise_array(self, points: np.ndarray) -> np.ndarray:
+        """The noise at each of an (N, 3) array of points in pattern space, as an
+        (N,) array"""
+        result = np.empty(len(points))
+        outside = np.ones(len(points), dtype=bool)
+
+        if self._lattice is not None:
+            outside = self._lattice.lookup_array(points, result)
+
+            if outside.any():
+                self._lattice.left()
+
+        noise3 = self._simplex.noise3
+        result[outside] = [noise3(x, y, z) for x, y, z in points[outside].tolist()]
+
+        return result
+
+    def bake(self, resolution: int = 8, extent: float = 2.0) -> Noise:
+        """Samples the noise resolution times per unit across the cube from -extent
+        to +extent (in pattern space), and from then on interpolates between the
+        samples for points within the cube rather than working the noise out.  This
+        is much quicker, at the cost of smoothing away detail finer than the spacing
+        of the samples.  Returns the pattern.
+
+        The cube needs to cover everywhere the pattern is seen.  Points outside it
+        get the exact noise, which doesn't quite meet the smoothed noise inside, so
+        shows as a seam along the cube's faces.  A warning is given the first time
+        that happens"""
+        self._lattice = _Lattice.baked(self.seed, self._simplex, resolution, extent)
+        return self
+
+    def __getstate__(self) -> dict[str, object]:
+        # The noise and any baked samples are made again from the seed
+        state = super().__getstate__()
+        del state["_simplex"]
+        del state["_lattice"]
+
+        if self._lattice is not None:
+            state["_baked"] = (self._lattice.resolution, self._lattice.extent)
+
+        return state
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        baked = state.pop("_baked", None)
+        self.__dict__.update(state)
+        self.__dict__["_simplex"] = OpenSimplex(self.seed)
+        self.__dict__["_lattice"] = None
+
+        if baked is not None:
+            self.bake(*cast(tuple[int, float], baked))
+
+
+class _Lattice:
+    """Noise sampled at regular intervals across a cube centred on the origin,
+    looked up by trilinear interpolation"""
+
+    # Baked samples, shared by every Noise baked with the same seed and settings for
+    # as long as any of them is using them
+    _baked: WeakValueDictionary[tuple[int, int, float], _Lattice] = (
+        WeakValueDictionary()
+    )
+
+    def __init__(self, samples: np.ndarray, resolution: int, extent: float) -> None:
+        self.samples = samples
+        self.resolution = resolution
+        self.extent = extent
+        # The highest index at which a cell of eight samples starts
+        self.last = len(samples) - 2
+        self.warned = False
+
+    @classmethod
+    def baked(
+        cls, seed: int, simplex: OpenSimplex, resolution: int, extent: float
+    ) -> _Lattice:
+        key = (seed, resolution, extent)
+        lattice = cls._baked.get(key)
+
+        if lattice is None:
+            coords = np.linspace(-extent, extent, round(2 * extent * resolution) + 1)
+
+            # noise3array() samples the grid with the z coordinate first
+            samples = simplex.noise3array(coords, coords, coords).transpose(2, 1, 0)
+            samples = np.ascontiguousarray(samples)
+            samples.flags.writeable = False
+
+            lattice = cls._baked[key] = cls(samples, resolution, extent)
+
+        return lattice
+
+    def left(self) -> None:
+        """Warns, once, that the noise has been looked up outside the cube"""
+        if not self.warned:
+            self.warned = True
+            warnings.warn(
+                f"Baked noise used outside the cube from -{self.extent} to "
+                f"{self.extent}, which will show as a seam.  Bake it with a larger "
+                "extent",
+                stacklevel=3,
+            )
+
+    def lookup(self, x: float, y: float, z: float) -> float | None:
+        """The noise at a point, or None if it's outside the cube"""
+        u = (x + self.extent) * self.resolution
+        v = (y + self.extent) * self.resolution
+        w = (z + self.extent) * self.resolution
+        top = self.last + 1
+
+        if not (0 <= u <= top and 0 <= v <= top and 0 <= w <= top):
+            return None
+
+        i = min(math.floor(u), self.last)
+        j = min(math.floor(v), self.last)
+        k = min(math.floor(w), self.last)
+        cell = self.samples[i : i + 2, j : j + 2, k : k + 2].tolist()
+
+        return _trilinear(cell, u - i, v - j, w - k)
+
+    def lookup_array(self, points: np.ndarray, result: np.ndarray) -> np.ndarray:
+        """Puts the noise at each of an (N, 3) array of points into result, and
+        returns a mask of the points outside the cube (which are left alone)"""
+        uvw = (points + self.extent) * self.resolution
+        inside = np.all((uvw >= 0) & (uvw <= self.last + 1), axis=1)
+        uvw = uvw[inside]
+
+        ijk = np.minimum(np.floor(uvw).astype(np.int64), self.last)
+        f = uvw - ijk
+        i, j, k = ijk[:, 0], ijk[:, 1], ijk[:, 2]
+        s = self.samples
+
+        cell = [
+            [[s[i + di, j + dj, k + dk] for dk in (0, 1)] for dj in (0, 1)]
+            for di in (0, 1)
+        ]
+        result[inside] = _trilinear(cell, f[:, 0], f[:, 1], f[:, 2])
+
+        return ~inside
+
+
+# The interpolation works on single values and on arrays of them alike
+N = TypeVar("N", float, np.ndarray)
+
+
+def _lerp(a: N, b: N, t: N) -> N:
+    return a + (b - a) * t
+
+
+def _trilinear(cell: Sequence[Sequence[Sequence[N]]], fx: N, fy: N, fz: N) -> N:
+    """Interpolates across a 2x2x2 cell of samples (indexed [x][y][z]), for either
+    single values or arrays of them"""
+    c00 = _lerp(cell[0][0][0], cell[1][0][0], fx)
+    c10 = _lerp(cell[0][1][0], cell[1][1][0], fx)
+    c01 = _lerp(cell[0][0][1], cell[1][0][1], fx)
+    c11 = _lerp(cell[0][1][1], cell[1][1][1], fx)
+
+    return _lerp(_lerp(c00, c10, fy), _lerp(c01, c11, fy), fz)
@@ -1,6 +1,5 @@
 import math
-from itertools import chain
-from typing import cast
+from typing import Iterable, SupportsIndex, cast
 
 from ray_tracer.classes.colour import Colour, Colours
 from ray_tracer.classes.computation import Computation
@@ -11,9 +10,65 @@ from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.transforms import Transforms
 from ray_tracer.classes.vector import Vector
 from ray_tracer.lights.point_light import PointLight
+from ray_tracer.objects.abstract_object import AbstractObject
+from ray_tracer.objects.linear_bvh import LinearBVH
 from ray_tracer.objects.sphere import Sphere
 
 
+class ObjectList(list[AbstractObject]):
+    """The list of objects in a World.  Behaves exactly like a normal list, but counts
+    every modification so the World can tell when its index of the objects is stale"""
+
+    version: int = 0
+
+    def _modified(self) -> None:
+        self.version += 1
+
+    def append(self, o: AbstractObject) -> None:
+        self._modified()
+        super().append(o)
+
+    def extend(self, objects: Iterable[AbstractObject]) -> None:
+        self._modified()
+        super().extend(objects)
+
+    def insert(self, index: SupportsIndex, o: AbstractObject) -> None:
+        self._modified()
+        super().insert(index, o)
+
+    def remove(self, o: AbstractObject) -> None:
+        self._modified()
+        super().remove(o)
+
+    def pop(self, index: SupportsIndex = -1) -> AbstractObject:
+        self._modified()
+        return super().pop(index)
+
+    def clear(self) -> None:
+        self._modified()
+        super().clear()
+
+    def __setitem__(  # type: ignore[override]
+        self,
+        index: SupportsIndex | slice,
+        value: AbstractObject | Iterable[AbstractObject],
+    ) -> None:
+        self._modified()
+        super().__setitem__(index, value)  # type: ignore[index, assignment]
+
+    def __delitem__(self, index: SupportsIndex | slice) -> None:
+        self._modified()
+        super().__delitem__(index)
+
+    def __iadd__(self, objects: Iterable[AbstractObject]) -> ObjectList:  # type: ignore[override, misc]
+        self._modified()
+        return super().__iadd__(objects)
+
+    def __imul__(self, n: SupportsIndex) -> ObjectList:  # type: ignore[override, misc]
+        self._modified()
+        return super().__imul__(n)
+
+
 class World:
     """Defines the default scene for populating"""
 
@@ -22,6 +77,11 @@ class World:
         self.objects = []
         self.max_recursion = max_recursion
 
+        # Top level bounding volume hierarchy over the objects, along with the
+        # object list version and object and material generations it was built at
+        self._index: LinearBVH | None = None
+        self._index_key = (0, 0, 0)
+
         if default is True:
             self.lights = [PointLight(Point(-10, 10, -10), Colours.WHITE)]
 
@@ -31,37 +91,82 @@ class World:
             )
             self.objects[1].transform = Transforms.scaling(0.5, 0.5, 0.5)
 
-    def intersect(self, ray: Ray) -> list[Intersection]:
-        return sorted(
-            chain.from_iterable(o.intersect(ray) for o in self.objects),
-            key=lambda hit: hit.t,
+    @property
+    def objects(self) -> ObjectList:
+        return self.__dict__["objects"]
+
+    @objects.setter
+    def objects(self, objects: Iterable[AbstractObject]) -> None:
+        self.__dict__["objects"] = ObjectList(objects)
+        self._index = None
+
+    def prepare(self) -> LinearBVH:
+        """Builds the top level bounding volume hierarchy over the scene objects, so
+        that rays are only tested against objects whose bounds they pass through.
+        Objects without finite bounds (planes etc.) are tested against every ray.
+
+        This happens automatically whenever the world is intersected after objects
+        have been added, removed or moved, but the camera calls it up front so the
+        cost isn't counted against the first pixel (or paid in every worker).  When
+        objects have only moved, the existing hierarchy is refit rather than rebuilt
+        (see LinearBVH.refit()).  Note that the bounds of groups are not updated when
+        something inside them moves until their own refit() is called.
+
+        The materials inherited from groups and CSG objects are worked out here too
+        (see AbstractObject.resolve_materials())"""
+        key = self._current_key()
+
+        if self._index is not None and self._index_key == key:
+            return self._index
+
+        if self._index is None or self._index_key[0] != key[0]:
+            self._index = LinearBVH(list(self.objects), adopt=False)
+        elif self._index_key[1] != key[1]:
+            self._index.refit()
+
+        for o in self.objects:
+            o.resolve_materials()
+
+        # Building or refitting the index touches bounds itself, so take the key
+        # afterwards
+        self._index_key = self._current_key()
+
+        return self._index
+
+    def _current_key(self) -> tuple[int, int, int]:
+        return (
+            self.objects.version,
+            AbstractObject.generation,
+            AbstractObject.material_generation,
         )
 
+    def intersect(self, ray: Ray) -> list[Intersection]:
+        # The index holds the objects without owning them, so it has an identity
+        # transform and the ray can go straight to its traversal.  Every object the
+        # ray reaches adds its hits to the one list, which is sorted once at the end
+        return self.prepare()._local_intersect(ray)
+
     def shade_hit(self, comps: Computation, remaining: int | None = None) -> Colour:
         if remaining is None:
             remaining = self.max_recursion
 
         shadowed = self.is_shadowed(comps.over_point)
 
-        # For surface colour, start from black, then build up based on all scene lights
-        surface = Colours.BLACK
-
-        for light in self.lights:
-            surface += comps.obj.material.lighting(
-                comps.obj,
-                light,
-                comps.point,
-                comps.eyev,
-                comps.normalv,
-                shadowed,
-            )
+        # The surface colour, built up from all of the scene's lights
+        surface = comps.material.shade(
+            comps.surface,
+            self.lights,
+            comps.point,
+            comps.eyev,
+            comps.normalv,
+            shadowed,
+            comps.surface_point,
+        )
 
         reflected = self.reflected_colour(comps, remaining)
         refracted = self.refracted_colour(comps, remaining)
 
-        material = comps.obj.material
-
-        if material.reflective > 0.0 and material.transparency > 0.0:
+        if comps.material.reflective > 0.0 and comps.material.transparency > 0.0:
             reflectance = comps.schlick()
             return surface + (reflected * reflectance) + (refracted * (1 - reflectance))
         else:
@@ -85,13 +190,13 @@ class World:
         if remaining is None:
             remaining = self.max_recursion
 
-        if comps.obj.material.reflective == 0.0 or remaining <= 0:
+        if comps.material.reflective == 0.0 or remaining <= 0:
             return Colours.BLACK
 
         reflect_ray = Ray(comps.over_point, comps.reflectv)
         colour = self.colour_at(reflect_ray, remaining - 1)
 
-        return colour * comps.obj.material.reflective
+        return colour * comps.material.reflective
 
     def refracted_colour(
         self, comps: Computation, remaining: int | None = None
@@ -99,7 +204,7 @@ class World:
         if remaining is None:
             remaining = self.max_recursion
 
-        if comps.obj.material.transparency == 0 or remaining == 0:
+        if comps.material.transparency == 0 or remaining == 0:
             return Colours.BLACK
 
         # Snell's law for computation of total internal reflection.  If ray is
@@ -126,7 +231,7 @@ class World:
         # Find the colour of the refracted ray, making sure to multiply by the
         # transparency value to account for any opacity and return it
         return self.colour_at(refract_ray, remaining - 1) * (
-            comps.obj.material.transparency
+            comps.material.transparency
         )
 
     def is_shadowed(self, p: Point) -> bool:
@@ -140,7 +245,7 @@ class World:
 
             h = Intersection.hit(xs)
 
-            while h is not None and h.obj.material.cast_shadows is False:
+            while h is not None and h.obj.material_for(h).cast_shadows is False:
                 xs.remove(h)
                 h = Intersection.hit(xs)
 
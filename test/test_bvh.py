@@ -0,0 +1,395 @@
+import numpy as np
+import pytest
+
+from ray_tracer.classes.point import Point
+from ray_tracer.classes.ray import Ray
+from ray_tracer.classes.transforms import Transforms
+from ray_tracer.classes.vector import Vector
+from ray_tracer.objects import bvh as bvh_module
+from ray_tracer.objects.abstract_object import Bounds
+from ray_tracer.objects.bvh import (
+    BuildNode,
+    build_sah,
+    sah_cost,
+    surface_area,
+    transform_boxes,
+)
+from ray_tracer.objects.group import Group
+from ray_tracer.objects.linear_bvh import LinearBVH
+from ray_tracer.objects.plane import Plane
+from ray_tracer.objects.smooth_triangle import SmoothTriangle
+from ray_tracer.objects.sphere import Sphere
+from ray_tracer.objects.triangle import Triangle
+
+
+def collect_leaves(node: BuildNode) -> list[np.ndarray]:
+    if node.is_leaf:
+        return [node.indices]  # type: ignore[list-item]
+
+    return collect_leaves(node.left) + collect_leaves(node.right)  # type: ignore[arg-type]
+
+
+def same_tree(a: BuildNode, b: BuildNode) -> bool:
+    if not (np.array_equal(a.low, b.low) and np.array_equal(a.high, b.high)):
+        return False
+
+    if a.is_leaf or b.is_leaf:
+        return a.is_leaf and b.is_leaf and np.array_equal(a.indices, b.indices)  # type: ignore[arg-type]
+
+    return same_tree(a.left, b.left) and same_tree(a.right, b.right)  # type: ignore[arg-type]
+
+
+def unit_boxes(centres: list[tuple[float, float, float]]) -> tuple[np.ndarray, ...]:
+    c = np.array(centres, dtype=np.float64)
+    return c - 0.5, c + 0.5
+
+
+class TestSAHBuilder:
+    def test_surface_area_of_a_box(self) -> None:
+        assert surface_area(np.array([0, 0, 0]), np.array([1, 2, 3])) == 22
+        assert surface_area(np.array([1, 1, 1]), np.array([0, 0, 0])) == 0
+
+    def test_a_small_set_of_primitives_is_a_single_leaf(self) -> None:
+        lows, highs = unit_boxes([(0, 0, 0), (5, 0, 0)])
+
+        tree = build_sah(lows, highs, leaf_size=4)
+
+        assert tree.is_leaf
+        assert list(tree.indices) == [0, 1]  # type: ignore[arg-type]
+        assert list(tree.low) == [-0.5, -0.5, -0.5]
+        assert list(tree.high) == [5.5, 0.5, 0.5]
+
+    def test_every_primitive_ends_up_in_exactly_one_small_leaf(self) -> None:
+        rng = np.random.default_rng(1)
+        lows = rng.uniform(-10, 10, (500, 3))
+        highs = lows + rng.uniform(0, 1, (500, 3))
+
+        tree = build_sah(lows, highs, leaf_size=3, bins=8)
+        leaves = collect_leaves(tree)
+
+        assert all(len(leaf) <= 3 for leaf in leaves)
+        assert sorted(np.concatenate(leaves)) == list(range(500))
+
+    def test_separate_clusters_are_split_apart_first(self) -> None:
+        lows, highs = unit_boxes(
+            [(0, 0, 0), (1, 0, 0), (0, 1, 0), (20, 0, 0), (21, 0, 0), (20, 1, 0)]
+        )
+
+        tree = build_sah(lows, highs, leaf_size=3)
+
+        assert sorted(tree.left.indices) == [0, 1, 2]  # type: ignore[union-attr]
+        assert sorted(tree.right.indices) == [3, 4, 5]  # type: ignore[union-attr]
+
+    def test_coincident_primitives_are_still_split_into_small_leaves(self) -> None:
+        lows, highs = unit_boxes([(1, 1, 1)] * 10)
+
+        leaves = collect_leaves(build_sah(lows, highs, leaf_size=2))
+
+        assert all(len(leaf) <= 2 for leaf in leaves)
+        assert sorted(np.concatenate(leaves)) == list(range(10))
+
+    def test_sah_produces_a_cheaper_tree_than_a_single_leaf(self) -> None:
+        rng = np.random.default_rng(2)
+        lows = rng.uniform(-10, 10, (200, 3))
+        highs = lows + 0.5
+
+        leaf = build_sah(lows, highs, leaf_size=200)
+        tree = build_sah(lows, highs, leaf_size=4)
+
+        assert sah_cost(tree) < sah_cost(leaf) / 4
+
+    def test_a_parallel_build_gives_the_same_tree_as_a_serial_one(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(bvh_module, "PARALLEL_THRESHOLD", 100)
+        rng = np.random.default_rng(4)
+        lows = rng.uniform(-10, 10, (2000, 3))
+        highs = lows + rng.uniform(0, 1, (2000, 3))
+
+        serial = build_sah(lows, highs, leaf_size=2)
+        parallel = build_sah(lows, highs, leaf_size=2, workers=2)
+
+        assert same_tree(serial, parallel)
+
+    def test_boxes_are_transformed_in_bulk_like_bounds(self) -> None:
+        boxes = [
+            Bounds(Point(-1, -1, -1), Point(1, 1, 1)),
+            Bounds(Point(0, -2, 1), Point(3, 0, 4)),
+            Bounds(Point(-np.inf, 0, -np.inf), Point(np.inf, 0, np.inf)),
+        ]
+        matrices = [
+            Transforms.translation(1, 2, 3),
+            Transforms.rotation_y(0.5) * Transforms.scaling(1, 2, 3),
+            Transforms.translation(0, -1, 0),
+        ]
+
+        lows, highs = transform_boxes(
+            np.array([[b.low.x, b.low.y, b.low.z] for b in boxes]),
+            np.array([[b.high.x, b.high.y, b.high.z] for b in boxes]),
+            np.stack([m.data for m in matrices]),
+        )
+
+        for b, m, low, high in zip(boxes, matrices, lows, highs):
+            t = b.transform(m)
+            assert list(low) == [t.low.x, t.low.y, t.low.z]
+            assert list(high) == [t.high.x, t.high.y, t.high.z]
+
+    @pytest.mark.parametrize("leaf_size,bins", [(0, 12), (4, 1)])
+    def test_invalid_parameters_are_rejected(self, leaf_size: int, bins: int) -> None:
+        lows, highs = unit_boxes([(0, 0, 0)])
+
+        with pytest.raises(ValueError):
+            build_sah(lows, highs, leaf_size=leaf_size, bins=bins)
+
+
+def scattered_spheres(count: int, seed: int = 3) -> list[Sphere]:
+    rng = np.random.default_rng(seed)
+    spheres = []
+
+    for x, y, z in rng.uniform(-10, 10, (count, 3)):
+        s = Sphere()
+        s.set_transform(
+            Transforms.translation(x, y, z) * Transforms.scaling(0.5, 0.5, 0.5)
+        )
+        spheres.append(s)
+
+    return spheres
+
+
+def scattered_triangles(count: int, seed: int = 3) -> list[Triangle | SmoothTriangle]:
+    """Small triangles facing roughly along z, with every other one smooth"""
+    rng = np.random.default_rng(seed)
+    triangles: list[Triangle | SmoothTriangle] = []
+
+    for k, (x, y, z) in enumerate(rng.uniform(-10, 10, (count, 3))):
+        p1 = Point(x, y, z)
+        p2 = Point(x + 1.5, y + 0.2, z + 0.3)
+        p3 = Point(x + 0.1, y + 1.5, z - 0.3)
+
+        if k % 2:
+            n = Vector(0, 0, -1)
+            triangles.append(
+                SmoothTriangle(p1, p2, p3, n, Vector(0.3, 0, -1), Vector(0, 0.3, -1))
+            )
+        else:
+            triangles.append(Triangle(p1, p2, p3))
+
+    return triangles
+
+
+def assert_nodes_bound_their_contents(bvh: LinearBVH) -> None:
+    for i in range(bvh.node_count):
+        low, high = bvh.node_bounds[i, :3], bvh.node_bounds[i, 3:]
+
+        if bvh.prim_count[i] == 0:
+            for child in (i + 1, bvh.node_skip[i + 1]):
+                assert np.all(low <= bvh.node_bounds[child, :3])
+                assert np.all(high >= bvh.node_bounds[child, 3:])
+        else:
+            first = bvh.prim_offset[i]
+
+            for p in bvh.primitives[first : first + bvh.prim_count[i]]:
+                b = p.bounds.transform(p.transform)
+                assert np.all(low <= [b.low.x, b.low.y, b.low.z])
+                assert np.all(high >= [b.high.x, b.high.y, b.high.z])
+
+
+def hits(xs: list) -> list[tuple[float, object]]:
+    return [(round(i.t, 9), i.obj) for i in xs]
+
+
+class TestLinearBVH:
+    def test_nodes_are_stored_depth_first_with_skip_indexes(self) -> None:
+        spheres = scattered_spheres(50)
+
+        bvh = LinearBVH(spheres, leaf_size=2)
+        skip = bvh.node_skip
+        count = bvh.prim_count
+
+        assert bvh.node_bounds.shape == (bvh.node_count, 6)
+        assert skip[0] == bvh.node_count
+
+        for i in range(bvh.node_count):
+            if count[i] == 0:
+                # Interior: first child follows directly, second starts where the
+                # first one's subtree ends, and the two subtrees fill this one
+                assert skip[i + 1] < skip[i]
+                assert skip[skip[i + 1]] == skip[i]
+            else:
+                assert skip[i] == i + 1
+                assert count[i] <= 2
+
+    def test_each_leaf_owns_a_contiguous_run_of_primitives(self) -> None:
+        spheres = scattered_spheres(50)
+
+        bvh = LinearBVH(spheres, leaf_size=3)
+        leaves = bvh.prim_count > 0
+
+        assert sorted(bvh.prim_offset[leaves]) == list(bvh.prim_offset[leaves])
+        assert bvh.prim_count.sum() == 50
+        assert set(bvh.primitives) == set(spheres)
+        assert set(bvh.leaves()) == set(spheres)
+        assert all(s.parent is bvh for s in spheres)
+
+    def test_nodes_bound_the_primitives_beneath_them(self) -> None:
+        bvh = LinearBVH(scattered_spheres(30), leaf_size=2)
+
+        assert_nodes_bound_their_contents(bvh)
+
+    def test_intersections_match_an_unoptimized_group(self) -> None:
+        spheres = scattered_spheres(60)
+        g = Group()
+
+        for s in spheres:
+            g.add_child(s)
+
+        rays = [
+            Ray(Point(-20, y, z), Vector(1, 0.1 * y, 0).normalize())
+            for y in range(-10, 11, 2)
+            for z in range(-10, 11, 2)
+        ] + [Ray(Point(x, 20, x), Vector(0, -1, 0)) for x in range(-10, 11)]
+        expected = [hits(g.intersect(r)) for r in rays]
+
+        bvh = LinearBVH(spheres, leaf_size=2)
+
+        assert [hits(bvh.intersect(r)) for r in rays] == expected
+        assert any(expected)
+
+    def test_triangles_are_intersected_in_batches_like_objects(self) -> None:
+        triangles = scattered_triangles(80)
+        triangles[0].set_transform(Transforms.rotation_z(0.5))
+        g = Group()
+        g.extend(triangles)
+
+        rays = [
+            Ray(Point(x * 0.5, y * 0.5, -20), Vector(0.05, 0.02, 1))
+            for x in range(-20, 21)
+            for y in range(-20, 21)
+        ]
+        expected = [[(i.t, i.obj, i.u, i.v) for i in g.intersect(r)] for r in rays]
+
+        bvh = LinearBVH(triangles, leaf_size=4)
+        batch = dict(zip(bvh.primitives, bvh._batch))
+
+        # The transformed triangle can't be packed, so it's still tested on its own
+        assert batch[triangles[0]] == 0
+        assert all(batch[t] for t in triangles[1:])
+
+        for r, e in zip(rays, expected):
+            xs = [(i.t, i.obj, i.u, i.v) for i in bvh.intersect(r)]
+
+            assert [x[1:] for x in xs] == pytest.approx([x[1:] for x in e])
+            assert [x[0] for x in xs] == pytest.approx([x[0] for x in e])
+
+        assert sum(map(len, expected)) > 40
+
+    def test_refitting_repacks_changed_triangles(self) -> None:
+        t = Triangle(Point(0, 1, 0), Point(-1, 0, 0), Point(1, 0, 0))
+        bvh = LinearBVH([t])
+        r = Ray(Point(5, 0.5, -2), Vector(0, 0, 1))
+
+        t.bake(Transforms.translation(5, 0, 0))
+        bvh.refit()
+
+        assert [(i.t, i.obj) for i in bvh.intersect(r)] == [(2, t)]
+
+    def test_a_triangle_given_a_transform_is_no_longer_packed(self) -> None:
+        t = Triangle(Point(0, 1, 0), Point(-1, 0, 0), Point(1, 0, 0))
+        bvh = LinearBVH([t])
+        r = Ray(Point(0, 0.5, -2), Vector(0, 0, 1))
+
+        assert [(i.t, i.obj) for i in bvh.intersect(r)] == [(2, t)]
+
+        # The ray still crosses the node's bounds (which aren't refitted) at z = 0
+        t.set_transform(Transforms.translation(0, 0, 3))
+
+        assert [(i.t, i.obj) for i in bvh.intersect(r)] == [(5, t)]
+
+    def test_the_ray_is_transformed_into_bvh_space(self) -> None:
+        s = Sphere()
+        bvh = LinearBVH([s])
+        bvh.set_transform(Transforms.translation(5, 0, 0))
+        r = Ray(Point(5, 0, -5), Vector(0, 0, 1))
+
+        xs = bvh.intersect(r)
+
+        assert [i.t for i in xs] == [4, 6]
+        assert bvh.bounds.low == Point(-1, -1, -1)
+
+    def test_unbounded_objects_are_kept_out_of_the_hierarchy(self) -> None:
+        spheres = scattered_spheres(10)
+        p = Plane()
+
+        bvh = LinearBVH([*spheres, p], leaf_size=2)
+        xs = bvh.intersect(Ray(Point(0, 50, 0), Vector(0, -1, 0)))
+
+        assert bvh.unbounded == [p]
+        assert p not in bvh.primitives
+        assert p in [i.obj for i in xs]
+        assert not bvh.bounds.is_finite()
+
+    def test_an_empty_bvh_is_never_hit(self) -> None:
+        bvh = LinearBVH([])
+
+        assert bvh.node_count == 0
+        assert bvh.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1))) == []
+
+    def test_moving_a_primitive_is_seen_by_the_traversal(self) -> None:
+        s = Sphere()
+        bvh = LinearBVH([s])
+        s.set_transform(Transforms.scaling(0.5, 0.5, 0.5))
+
+        xs = bvh.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+
+        assert [i.t for i in xs] == [4.5, 5.5]
+
+    def test_refitting_follows_moved_primitives(self) -> None:
+        spheres = scattered_spheres(30)
+        bvh = LinearBVH(spheres, leaf_size=2)
+        skip = bvh.node_skip.copy()
+        r = Ray(Point(100, 0, -5), Vector(0, 0, 1))
+
+        spheres[0].set_transform(Transforms.translation(100, 0, 0))
+        bvh.refit(rebuild_ratio=None)
+
+        assert np.array_equal(bvh.node_skip, skip)
+        assert bvh.bounds.high.x == 101
+        assert [i.obj for i in bvh.intersect(r)] == [spheres[0], spheres[0]]
+        assert_nodes_bound_their_contents(bvh)
+
+    def test_refitting_rebuilds_a_badly_degraded_bvh(self) -> None:
+        spheres = scattered_spheres(30)
+        bvh = LinearBVH(spheres, leaf_size=2)
+        moved = scattered_spheres(30, seed=5)
+
+        # Scatter everything somewhere new, so no node's contents stay together
+        for s, m in zip(spheres, moved):
+            s.set_transform(m.transform)
+
+        assert bvh.refit() > 1.5
+        assert bvh.sah_cost() == bvh._built_cost
+        assert set(bvh.primitives) == set(spheres)
+
+    def test_a_group_can_be_optimized_into_a_linear_bvh(self) -> None:
+        spheres = scattered_spheres(40)
+        inner = Group()
+        inner.set_transform(Transforms.translation(0, 1, 0))
+        for s in spheres[20:]:
+            inner.add_child(s)
+
+        g = Group()
+        g.set_transform(Transforms.scaling(2, 2, 2))
+        for s in spheres[:20]:
+            g.add_child(s)
+        g.add_child(inner)
+
+        rays = [Ray(Point(-50, y, 0), Vector(1, 0, 0)) for y in range(-20, 21)]
+        expected = [hits(g.intersect(r)) for r in rays]
+
+        bvh = g.optimize(leaf_size=2, linear=True)
+
+        assert isinstance(bvh, LinearBVH)
+        assert bvh.transform == Transforms.scaling(2, 2, 2)
+        assert set(bvh.leaves()) == set(spheres)
+        assert g.children == []
+        assert [hits(bvh.intersect(r)) for r in rays] == expected
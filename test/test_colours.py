@@ -40,3 +40,11 @@ class TestColours:
         c2 = Colour(0.9, 1, 0.1)
 
         assert c1 * c2 == Colour(0.9, 0.2, 0.04)
+
+    def test_colours_have_no_instance_dict(self) -> None:
+        c = Colour(0.1, 0.2, 0.3)
+
+        assert not hasattr(c, "__dict__")
+        assert Colour.of(0.1, 0.2, 0.3) == c
+        assert type(c * c) is Colour
+        assert type(c * 0.5) is Colour
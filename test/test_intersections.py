@@ -23,6 +23,11 @@ class TestIntersections:
         assert i.t == 3.5
         assert i.obj == s
 
+    def test_intersections_are_slotted(self) -> None:
+        i = Intersection(3.5, Sphere())
+
+        assert not hasattr(i, "__dict__")
+
     def test_aggregating_intersections(self) -> None:
         s = Sphere()
         i1 = Intersection(1, s)
@@ -1,7 +1,20 @@
+import gc
+import math
+import pickle
+import weakref
+
+import numpy as np
+import pytest
+
 import ray_tracer.patterns as Patterns
 from ray_tracer.classes.colour import Colour, Colours
-from ray_tracer.classes.material import Material
+from ray_tracer.classes.material import DEFAULT_MATERIAL, Material
 from ray_tracer.classes.point import Point
+from ray_tracer.classes.shading_batch import (
+    lighting_batch,
+    material_arrays,
+    shade_batch,
+)
 from ray_tracer.classes.vector import Vector
 from ray_tracer.constants import ROOT2
 from ray_tracer.lights.point_light import PointLight
@@ -24,6 +37,45 @@ class TestMaterials:
 
 
 class TestLighting:
+    def test_a_frozen_material_cannot_be_changed(self) -> None:
+        m = Material(ambient=0.3).freeze()
+
+        with pytest.raises(AttributeError, match="frozen"):
+            m.ambient = 1
+
+        copy = m.copy()
+        copy.ambient = 1
+
+        assert not copy.frozen
+        assert m.ambient == 0.3
+        assert m == Material(ambient=0.3)
+
+    def test_the_default_material_is_unpickled_as_itself(self) -> None:
+        m = Material(ambient=0.3).freeze()
+
+        assert pickle.loads(pickle.dumps(DEFAULT_MATERIAL)) is DEFAULT_MATERIAL
+        assert pickle.loads(pickle.dumps(m)) is not m
+        assert pickle.loads(pickle.dumps(m)) == m
+
+    def test_equal_materials_are_interned_as_one(self) -> None:
+        m1 = Material(Colour(1, 0.5, 0), ambient=0.3)
+        m2 = Material(Colour(1, 0.5, 0), ambient=0.3)
+        interned = m1.interned()
+
+        assert interned is m2.interned()
+        assert interned == m1
+        assert interned.frozen
+        assert not m1.frozen
+        assert Material(Colour(1, 0.5, 0)).interned() is not interned
+
+    def test_interned_materials_are_let_go_once_unused(self) -> None:
+        m = Material(Colour(0.25, 0.5, 0.75), ambient=0.3)
+        interned = weakref.ref(m.interned())
+
+        gc.collect()
+
+        assert interned() is None
+
     def test_with_the_eye_between_the_light_and_the_surface(self) -> None:
         m = Material()
         position = Point(0, 0, 0)
@@ -111,3 +163,110 @@ class TestLighting:
         assert m.lighting(
             Sphere(), light, Point(1.1, 0, 0), eyev, normalv, False
         ) == Colour(0, 0, 0)
+
+    def test_shading_with_several_lights_finds_the_surface_colour_once(self) -> None:
+        class CountingPattern(Patterns.TestPattern):
+            calls = 0
+
+            def colour_at(self, p: Point) -> Colour:
+                CountingPattern.calls += 1
+                return super().colour_at(p)
+
+        m = Material(CountingPattern())
+        s = Sphere()
+        point = Point(0.2, 0.3, -0.9)
+        eyev = Vector(0, 0, -1)
+        normalv = Vector(0, 0, -1)
+        lights = [
+            PointLight(Point(0, 0, -10), Colour(1, 1, 1)),
+            PointLight(Point(-10, 10, -10), Colour(0.5, 0.2, 0.2)),
+            PointLight(Point(10, 0, 10), Colour(1, 1, 1)),
+        ]
+
+        expected = Colours.BLACK
+        for light in lights:
+            expected += m.lighting(s, light, point, eyev, normalv)
+
+        CountingPattern.calls = 0
+        assert m.shade(s, lights, point, eyev, normalv) == expected
+        assert CountingPattern.calls == 1
+
+
+class TestLightingBatch:
+    @staticmethod
+    def hits() -> list[tuple[Point, Vector, Vector, bool, Material]]:
+        """A spread of hits on the unit sphere: facing towards and away from the
+        light, with and without highlights, in and out of shadow"""
+        hits = []
+
+        for k in range(24):
+            a = k * math.tau / 24
+            normal = Vector(math.cos(a), 0.3 * math.sin(2 * a), math.sin(a)).normalize()
+            eye = Vector(0.2, math.sin(a), -1).normalize()
+            material = Material(
+                Colour(0.2 + k / 40, 0.5, 1 - k / 30),
+                ambient=0.05 * (k % 4),
+                diffuse=0.5 + 0.1 * (k % 5),
+                specular=0.3 * (k % 3),
+                shininess=10.0 + 40 * (k % 6),
+            )
+            hits.append(
+                (Point(normal.x, normal.y, normal.z), eye, normal, k % 7 == 0, material)
+            )
+
+        return hits
+
+    @staticmethod
+    def arrays(
+        hits: list[tuple[Point, Vector, Vector, bool, Material]],
+    ) -> tuple[np.ndarray, ...]:
+        def rows(vs: list) -> np.ndarray:
+            return np.array([[v.x, v.y, v.z] for v in vs])
+
+        return (
+            rows([m.colour for _, _, _, _, m in hits]),
+            rows([p for p, _, _, _, _ in hits]),
+            rows([e for _, e, _, _, _ in hits]),
+            rows([n for _, _, n, _, _ in hits]),
+            np.array([s for _, _, _, s, _ in hits]),
+        )
+
+    def test_a_batch_of_hits_is_lit_like_each_hit(self) -> None:
+        hits = self.hits()
+        colours, points, eyes, normals, shadows = self.arrays(hits)
+        light = PointLight(Point(-10, 10, -10), Colour(1, 0.9, 0.8))
+
+        result = lighting_batch(
+            colours,
+            light,
+            points,
+            eyes,
+            normals,
+            shadows,
+            *material_arrays([m for *_, m in hits]),
+        )
+
+        assert result.shape == (len(hits), 3)
+        assert result.tolist() == [
+            [c.red, c.green, c.blue]
+            for c in (m.lighting(Sphere(), light, p, e, n, s) for p, e, n, s, m in hits)
+        ]
+
+    def test_shading_a_batch_with_several_lights(self) -> None:
+        hits = self.hits()
+        colours, points, eyes, normals, shadows = self.arrays(hits)
+        lights = [
+            PointLight(Point(-10, 10, -10), Colour(1, 1, 1)),
+            PointLight(Point(10, 0, -10), Colour(0.6, 0.6, 0.6)),
+        ]
+        m = Material(ambient=0.3, specular=1.0)
+
+        result = shade_batch(
+            colours, lights, points, eyes, normals, shadows, 0.3, 0.9, 1.0, 200.0
+        )
+
+        for row, (p, e, n, s, hit_material) in zip(result, hits):
+            m.colour = hit_material.colour
+            c = m.shade(Sphere(), lights, p, e, n, s)
+
+            assert row.tolist() == pytest.approx([c.red, c.green, c.blue])
@@ -1,9 +1,15 @@
 import math
+import pickle
 
+import numpy as np
 import pytest
+from numpy.linalg import LinAlgError
 
 from ray_tracer.classes.base_tuple import Tuple
-from ray_tracer.classes.matrix import Matrix
+from ray_tracer.classes.matrix import IDENTITY, AffineMatrix, Matrix
+from ray_tracer.classes.point import Point
+from ray_tracer.classes.transforms import Transforms
+from ray_tracer.classes.vector import Vector
 from ray_tracer.constants import EPSILON
 
 
@@ -223,3 +229,92 @@ class TestMatrix:
         c: Matrix = a * b
 
         assert c * b.inverse() == a
+
+
+class TestAffineMatrix:
+    # A mix of every kind of transform, checked against the general 4x4 code
+    affine = (
+        Transforms.translation(1, -2, 3)
+        * Transforms.rotation_y(0.7)
+        * Transforms.shearing(0.5, 0, 0, 1, -1, 0)
+        * Transforms.scaling(2, 3, -0.5)
+    )
+    general = Matrix(affine.data.tolist())  # type: ignore[attr-defined]
+
+    def test_transforms_are_affine(self) -> None:
+        assert type(Matrix.Identity()) is AffineMatrix
+        assert type(Matrix.Identity(3)) is Matrix
+        assert type(self.affine) is AffineMatrix
+        assert type(self.affine.inverse()) is AffineMatrix  # type: ignore[attr-defined]
+        assert type(self.affine.transpose()) is Matrix  # type: ignore[attr-defined]
+
+    def test_affine_matrices_must_have_an_affine_bottom_row(self) -> None:
+        with pytest.raises(ValueError, match="Matrix is not affine"):
+            AffineMatrix([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 1, 0, 1]])
+
+        m = Matrix.Identity()
+        m[3, 3] = 1
+
+        with pytest.raises(ValueError, match="can't be changed"):
+            m[3, 0] = 2
+
+    def test_setting_an_element_updates_the_affine_matrix(self) -> None:
+        m = Matrix.Identity()
+        assert m * Point(1, 2, 3) == Point(1, 2, 3)
+
+        m[0, 3] = 5
+
+        assert m * Point(1, 2, 3) == Point(6, 2, 3)
+
+    def test_affine_inverse_matches_the_general_inverse(self) -> None:
+        assert self.affine.inverse() == self.general.inverse()  # type: ignore[attr-defined]
+        assert math.isclose(
+            self.affine.det(),  # type: ignore[attr-defined]
+            self.general.det(),
+            rel_tol=EPSILON,
+        )
+
+    def test_affine_inverse_is_kept_until_the_matrix_changes(self) -> None:
+        m = Transforms.translation(1, 2, 3)
+        inverse = m.inverse()  # type: ignore[attr-defined]
+
+        assert m.inverse() is inverse  # type: ignore[attr-defined]
+        assert inverse.frozen
+
+        m[0, 3] = 5
+
+        assert m.inverse() == Transforms.translation(-5, -2, -3)
+
+    def test_the_identity_transform_is_unpickled_as_itself(self) -> None:
+        m = Transforms.translation(1, 2, 3)
+
+        assert pickle.loads(pickle.dumps(IDENTITY)) is IDENTITY
+        assert pickle.loads(pickle.dumps(m)) == m
+
+    def test_singular_affine_matrix_cannot_be_inverted(self) -> None:
+        with pytest.raises(LinAlgError, match="not invertible"):
+            Transforms.scaling(1, 0, 1).inverse()
+
+    def test_affine_matrix_applies_like_the_general_matrix(self) -> None:
+        p = Point(0.3, -1.2, 4)
+        v = Vector(-2, 0.5, 1.5)
+
+        assert self.affine * p == self.general * p
+        assert type(self.affine * p) is Point
+        assert self.affine * v == self.general * v
+        assert type(self.affine * v) is Vector
+
+    @pytest.mark.parametrize("kind", ["affine", "general"])
+    def test_applying_to_arrays_matches_applying_to_each(self, kind: str) -> None:
+        m: Matrix = getattr(self, kind)
+        rows = np.array([[0.3, -1.2, 4], [1, 0, 0], [-2, 0.5, 1.5]])
+
+        points = m.apply_points(rows)
+        vectors = m.apply_vectors(rows)
+        normals = m.apply_normals(rows)
+        normal_matrix = m.inverse().transpose()
+
+        for k, (x, y, z) in enumerate(rows.tolist()):
+            assert Point(*points[k]) == m * Point(x, y, z)
+            assert Vector(*vectors[k]) == m * Vector(x, y, z)
+            assert Vector(*normals[k]) == normal_matrix * Vector(x, y, z)
@@ -1,11 +1,13 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 import ray_tracer.objects.loader as Loader
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.vector import Vector
 from ray_tracer.objects.group import Group
+from ray_tracer.objects.triangle_mesh import TriangleMesh
 
 
 class TestObjectLoader:
@@ -103,4 +105,31 @@ class TestObjectLoader:
         assert t1.normals[0] == loader.normals[2]
         assert t1.normals[1] == loader.normals[0]
         assert t2.normals[2] == loader.normals[1]
-        assert t1 == t2
+        assert t1.structurally_equal(t2)
+
+    def test_loader_builds_a_mesh_for_each_group(self) -> None:
+        loader = Loader.parse_obj_file(
+            Path("test/inputs/named_groups_test.obj"), mesh=True
+        )
+
+        m1 = loader.groups["FirstGroup"].children[0]
+        m2 = loader.groups["SecondGroup"].children[0]
+
+        assert loader.default_group.children == []
+        assert isinstance(m1, TriangleMesh) and isinstance(m2, TriangleMesh)
+        assert np.shares_memory(m1.vertices, m2.vertices)
+        assert m1.triangles.tolist() == [[0, 1, 2]]
+        assert m2.triangles.tolist() == [[0, 2, 3]]
+        assert m1.normals is None
+
+    def test_loader_builds_meshes_with_vertex_normals(self) -> None:
+        loader = Loader.parse_obj_file(
+            Path("test/inputs/faces_with_vertex_normals_test.obj"), mesh=True
+        )
+
+        m = loader.default_group.children[0]
+
+        assert isinstance(m, TriangleMesh)
+        assert m.face_count == 2
+        assert m.normal_indices is not None
+        assert m.normal_indices.tolist() == [[2, 0, 1], [2, 0, 1]]
@@ -1,28 +1,35 @@
 import math
 
+import numpy as np
 import pytest
 
+import ray_tracer.patterns as Patterns
+from ray_tracer.camera import Camera
 from ray_tracer.classes.colour import Colours
 from ray_tracer.classes.computation import Computation
 from ray_tracer.classes.intersection import Intersection
-from ray_tracer.classes.material import Material
+from ray_tracer.classes.material import DEFAULT_MATERIAL, Material
 from ray_tracer.classes.matrix import Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.ray import Ray
 from ray_tracer.classes.transforms import Transforms
 from ray_tracer.classes.vector import Vector
 from ray_tracer.constants import EPSILON, ROOT2, ROOT3
-from ray_tracer.objects.abstract_object import Bounds
+from ray_tracer.objects.abstract_object import AbstractObject, Bounds
 from ray_tracer.objects.cone import Cone
 from ray_tracer.objects.csg import CSG, CSGOperation
 from ray_tracer.objects.cube import Cube
 from ray_tracer.objects.cylinder import Cylinder
 from ray_tracer.objects.group import Group
+from ray_tracer.objects.instance import Instance
 from ray_tracer.objects.plane import Plane
 from ray_tracer.objects.smooth_triangle import SmoothTriangle
 from ray_tracer.objects.sphere import Sphere
 from ray_tracer.objects.test_shape import TestShape
 from ray_tracer.objects.triangle import Triangle
+from ray_tracer.objects.triangle_batch import intersect_triangles
+from ray_tracer.objects.triangle_mesh import TriangleMesh
+from ray_tracer.world import World
 
 
 class TestShapes:
@@ -51,6 +58,15 @@ class TestShapes:
         assert s.material.colour == Colours.BLUE
         assert s.material.ambient == 1
 
+    def test_a_shape_must_say_how_rays_intersect_it(self) -> None:
+        with pytest.raises(TypeError, match="_local_intersect"):
+
+            class Shapeless(AbstractObject):
+                def _normal_func(
+                    self, op: Point, i: Intersection | None = None
+                ) -> Vector:
+                    return Vector(0, 1, 0)
+
     def test_a_shape_has_a_parent_attribute(self) -> None:
         s = TestShape()
 
@@ -61,6 +77,92 @@ class TestShapes:
 
         assert s.bounds == Bounds(Point(-1, -1, -1), Point(1, 1, 1))
 
+    def test_shapes_compare_and_hash_by_identity(self) -> None:
+        s1 = TestShape()
+        s2 = TestShape()
+
+        assert s1 == s1
+        assert s1 != s2
+        assert len({s1, s2, s1}) == 2
+        assert {s1: "a", s2: "b"}[s2] == "b"
+
+    def test_identical_shapes_are_structurally_equal(self) -> None:
+        s1 = Sphere()
+        s1.set_transform(Transforms.translation(1, 2, 3))
+        s2 = Sphere()
+        s2.set_transform(Transforms.translation(1, 2, 3))
+
+        assert s1 != s2
+        assert s1.structurally_equal(s2)
+
+    def test_shapes_share_the_default_transform_and_material(self) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+
+        assert s1.transform is s2.transform
+        assert s1.inverse_transform is s2.transform
+        assert s1.effective_material is s2.effective_material
+        assert s1.effective_material.frozen
+        assert not hasattr(s1, "__dict__")
+
+    def test_changing_a_default_material_only_changes_that_shape(self) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+        s1.material.ambient = 0.5
+
+        assert s1.effective_material.ambient == 0.5
+        assert s2.material.ambient == 0.1
+        assert s2.effective_material is not s1.effective_material
+
+    def test_reading_a_default_material_changes_nothing(self) -> None:
+        s = Sphere()
+        generations = (AbstractObject.generation, AbstractObject.material_generation)
+
+        assert s.material.ambient == 0.1
+        assert s.effective_material is DEFAULT_MATERIAL
+        assert generations == (
+            AbstractObject.generation,
+            AbstractObject.material_generation,
+        )
+
+    def test_a_copy_of_a_default_material_is_dropped_once_replaced(self) -> None:
+        s = Sphere()
+        copy = s.material
+        s.material = Material(Colours.RED)
+        copy.ambient = 0.5
+
+        assert s.material.colour == Colours.RED
+        assert s.material.ambient == 0.1
+
+    def test_a_copied_default_material_is_structurally_equal(self) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+        s2.material.ambient = 0.1
+
+        assert not s2.effective_material.frozen
+        assert s1.structurally_equal(s2)
+
+    def test_differing_shapes_are_not_structurally_equal(self) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+        s2.material.ambient = 0.5
+
+        assert not s1.structurally_equal(s2)
+        assert not s1.structurally_equal(Cube())
+
+    def test_structural_equality_compares_children_and_ignores_parents(self) -> None:
+        g1 = Group()
+        g1.add_child(Sphere())
+        g2 = Group()
+        g2.add_child(Sphere())
+
+        assert g1.structurally_equal(g2)
+        assert g1.children[0].structurally_equal(g2.children[0])
+
+        g2.children[0].set_transform(Transforms.scaling(2, 2, 2))
+
+        assert not g1.structurally_equal(g2)
+
 
 class TestSphere:
     def test_intersecting_a_scaled_sphere_with_a_ray(self) -> None:
@@ -478,6 +580,38 @@ class TestGroup:
         assert s in g.children
         assert s.parent == g
 
+    def test_adding_several_children_to_a_group_at_once(self) -> None:
+        g = Group()
+        s1 = Sphere()
+        s1.set_transform(Transforms.translation(2, 2, 2))
+        c1 = Cube()
+        c1.set_transform(Transforms.rotation_x(math.pi / 4))
+        p = Plane()
+
+        g.add_child(s1)
+        g.extend([c1, p])
+
+        assert g.children == [s1, c1, p]
+        assert all(c.parent is g for c in g.children)
+        assert g.bounds.low == Point(-math.inf, -1.41421, -math.inf)
+        assert g.bounds.high == Point(math.inf, 3, math.inf)
+
+    def test_extending_a_group_matches_adding_children_one_at_a_time(self) -> None:
+        one_by_one, spheres = TestGroup.row_of_spheres(10)
+        g = Group()
+
+        g.extend(spheres)
+
+        assert g.bounds == one_by_one.bounds
+
+    def test_a_group_cannot_be_extended_with_itself(self) -> None:
+        g = Group()
+
+        with pytest.raises(ValueError):
+            g.extend([Sphere(), g])
+
+        assert g.children == []
+
     def test_intersecting_a_ray_with_an_empty_group(self) -> None:
         g = Group()
         r = Ray(Point(0, 0, 0), Vector(0, 0, 1))
@@ -520,6 +654,26 @@ class TestGroup:
 
         assert len(xs) == 2
 
+    def test_nested_groups_add_their_hits_to_the_callers_list(self) -> None:
+        inner = Group()
+        s1 = Sphere()
+        inner.add_child(s1)
+
+        g = Group()
+        s2 = Sphere()
+        s2.set_transform(Transforms.translation(0, 0, -3))
+        g.add_child(inner)
+        g.add_child(s2)
+
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        earlier = Intersection(-1, Sphere())
+        xs = [earlier]
+        g.intersect_into(r, xs)
+
+        assert xs[0] is earlier
+        assert [i.obj for i in xs[1:]] == [s1, s1, s2, s2]
+        assert [i.obj for i in g.intersect(r)] == [s2, s2, s1, s1]
+
     def test_convert_a_point_from_world_to_object_space(self) -> None:
         g1 = Group()
         g1.set_transform(Transforms.rotation_y(math.pi / 2))
@@ -556,6 +710,43 @@ class TestGroup:
         assert math.isclose(n.y, 0.42857, abs_tol=EPSILON)
         assert math.isclose(n.z, -0.85714, abs_tol=EPSILON)
 
+    def test_world_space_matrices_are_cached(self) -> None:
+        g = Group()
+        g.set_transform(Transforms.rotation_y(math.pi / 2))
+        s = Sphere()
+        s.set_transform(Transforms.translation(5, 0, 0))
+        g.add_child(s)
+
+        assert s.world_inverse is s.world_inverse
+        assert s.normal_matrix is s.normal_matrix
+        assert s.world_inverse == (g.transform * s.transform).inverse()
+
+    def test_moving_an_ancestor_updates_the_world_space_matrices(self) -> None:
+        g1 = Group()
+        g2 = Group()
+        g1.add_child(g2)
+        s = Sphere()
+        s.set_transform(Transforms.translation(5, 0, 0))
+        g2.add_child(s)
+
+        assert s.world_to_object(Point(5, 0, 0)) == Point(0, 0, 0)
+
+        g1.set_transform(Transforms.scaling(2, 2, 2))
+
+        assert s.world_to_object(Point(10, 0, 0)) == Point(0, 0, 0)
+        assert s.normal_to_world(Vector(1, 1, 0)) == Vector(ROOT2 / 2, ROOT2 / 2, 0)
+
+    def test_reparenting_updates_the_world_space_matrices(self) -> None:
+        s = Sphere()
+
+        assert s.world_to_object(Point(5, 0, 0)) == Point(5, 0, 0)
+
+        g = Group()
+        g.set_transform(Transforms.translation(5, 0, 0))
+        g.add_child(s)
+
+        assert s.world_to_object(Point(5, 0, 0)) == Point(0, 0, 0)
+
     def test_finding_the_normal_on_a_child_object(self) -> None:
         g1 = Group()
         g1.set_transform(Transforms.rotation_y(math.pi / 2))
@@ -620,6 +811,192 @@ class TestGroup:
         assert len(s1.intersect(r)) == 0
         assert g._bb_hit(r) is True
 
+    def test_flattening_bakes_transforms_and_removes_inner_groups(self) -> None:
+        t = Triangle(Point(0, 1, 0), Point(-1, 0, 0), Point(1, 0, 0))
+        s = Sphere()
+        s.set_transform(Transforms.translation(3, 0, 0))
+
+        inner = Group()
+        inner.set_transform(Transforms.scaling(2, 2, 2))
+        inner.extend([t, s])
+
+        outer = Group()
+        outer.set_transform(Transforms.translation(0, 0, 5))
+        outer.add_child(inner)
+
+        rays = [
+            Ray(Point(0, 0.5, -5), Vector(0, 0, 1)),
+            Ray(Point(6, 0, -5), Vector(0, 0, 1)),
+        ]
+        before = [outer.intersect(r) for r in rays]
+        assert all(before)
+        normals = [
+            i.obj.normal_at(r.position(i.t)) for r, xs in zip(rays, before) for i in xs
+        ]
+
+        assert outer.flatten() is outer
+
+        after = [outer.intersect(r) for r in rays]
+
+        assert outer.children == [t, s]
+        assert outer.transform == Matrix.Identity()
+        assert t.transform == Matrix.Identity()
+        assert t.verts[0] == Point(0, 2, 5)
+        assert s.transform == Transforms.translation(0, 0, 5) * Transforms.scaling(
+            2, 2, 2
+        ) * Transforms.translation(3, 0, 0)
+        assert [[(i.t, i.obj) for i in xs] for xs in after] == [
+            [(pytest.approx(i.t), i.obj) for i in xs] for xs in before
+        ]
+        assert [
+            i.obj.normal_at(r.position(i.t)) for r, xs in zip(rays, after) for i in xs
+        ] == normals
+
+    @pytest.mark.parametrize("smooth", [False, True])
+    def test_flattening_cancelling_transforms_leaves_triangles_in_place(
+        self, smooth: bool
+    ) -> None:
+        p1, p2, p3 = Point(0, 1, 0), Point(-1, 0, 0), Point(1, 0, 0)
+        n = Vector(0, 0, -1)
+        t = SmoothTriangle(p1, p2, p3, n, n, n) if smooth else Triangle(p1, p2, p3)
+        t.set_transform(Transforms.translation(5, 0, 0))
+        g = Group()
+        g.set_transform(Transforms.translation(-5, 0, 0))
+        g.add_child(t)
+        r = Ray(Point(0, 0.5, -2), Vector(0, 0, 1))
+
+        assert [i.t for i in g.intersect(r)] == [pytest.approx(2.0)]
+
+        g.flatten()
+
+        assert t.transform == Matrix.Identity()
+        assert [i.t for i in g.intersect(r)] == [pytest.approx(2.0)]
+
+    def test_untransformed_objects_use_the_incoming_ray(self) -> None:
+        class RecordingShape(TestShape):
+            def _local_intersect(self, ray: Ray) -> list[Intersection]:
+                self.saved_ray = ray
+                return []
+
+        s = RecordingShape()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+
+        s.intersect(r)
+
+        assert s.saved_ray is r
+
+    @staticmethod
+    def row_of_spheres(count: int) -> tuple[Group, list[Sphere]]:
+        g = Group()
+        spheres = []
+
+        for n in range(count):
+            s = Sphere()
+            s.set_transform(Transforms.translation(n * 3, (n % 3) * 3, 0))
+            spheres.append(s)
+            g.add_child(s)
+
+        return g, spheres
+
+    @staticmethod
+    def leaf_sizes(g: Group) -> list[int]:
+        sizes = []
+        primitives = [c for c in g.children if not isinstance(c, Group)]
+
+        if primitives:
+            sizes.append(len(primitives))
+
+        for c in g.children:
+            if isinstance(c, Group):
+                sizes.extend(TestGroup.leaf_sizes(c))
+
+        return sizes
+
+    def test_optimizing_a_small_group_leaves_it_unchanged(self) -> None:
+        g, spheres = self.row_of_spheres(3)
+
+        assert g.optimize() is g
+        assert g.children == spheres
+
+    def test_optimizing_a_group_builds_a_hierarchy_of_small_leaves(self) -> None:
+        g, spheres = self.row_of_spheres(40)
+        g.set_transform(Transforms.scaling(2, 2, 2))
+        bounds = g.bounds
+
+        o = g.optimize(leaf_size=2)
+
+        assert o is g
+        assert o.transform == Transforms.scaling(2, 2, 2)
+        assert o.bounds == bounds
+        assert len(o.children) == 2
+        assert max(self.leaf_sizes(o)) <= 2
+        assert set(o.leaves()) == set(spheres)
+
+    def test_an_optimized_group_gives_the_same_intersections(self) -> None:
+        g, _ = self.row_of_spheres(30)
+        r = Ray(Point(-5, 0, 0), Vector(1, 0, 0))
+        expected = [(i.t, i.obj) for i in g.intersect(r)]
+
+        g.optimize()
+
+        assert [(i.t, i.obj) for i in g.intersect(r)] == expected
+
+    def test_refitting_updates_bounds_after_a_child_moves(self) -> None:
+        g, spheres = self.row_of_spheres(40)
+        g.optimize(leaf_size=2)
+        untouched = g.children[0].bounds
+        r = Ray(Point(500, 0, -5), Vector(0, 0, 1))
+
+        spheres[-1].set_transform(Transforms.translation(500, 0, 0))
+        g.refit(rebuild_ratio=None)
+
+        assert g.bounds.high.x == 501
+        assert g.children[0].bounds is untouched
+        assert [i.obj for i in g.intersect(r)] == [spheres[-1], spheres[-1]]
+
+    def test_refitting_an_unchanged_group_costs_nothing(self) -> None:
+        g, _ = self.row_of_spheres(20)
+        g.optimize(leaf_size=2)
+        children = list(g.children)
+
+        assert g.refit() == 1.0
+        assert g.children == children
+
+    def test_refitting_rebuilds_a_badly_degraded_group(self) -> None:
+        g, spheres = self.row_of_spheres(40)
+        g.optimize(leaf_size=2)
+        r = Ray(Point(-5, 0, 0), Vector(1, 0, 0))
+
+        # Shuffle the spheres along the row, so the contents of every node end up
+        # spread right along it
+        for n, s in enumerate(spheres):
+            m = (n * 17) % 40
+            s.set_transform(Transforms.translation(m * 3, (m % 3) * 3, 0))
+
+        expected = sorted(
+            (t, s) for s in spheres for t in [i.t for i in s.intersect(r)]
+        )
+        children = list(g.children)
+
+        ratio = g.refit()
+
+        assert ratio > 1.5
+        assert g.children != children
+        assert set(g.leaves()) == set(spheres)
+        assert max(self.leaf_sizes(g)) <= 2
+        assert g.refit() == pytest.approx(1.0)
+        assert [(i.t, i.obj) for i in g.intersect(r)] == expected
+
+    def test_unbounded_children_stay_at_the_top_of_an_optimized_group(self) -> None:
+        g, _ = self.row_of_spheres(10)
+        p = Plane()
+        g.add_child(p)
+
+        g.optimize(leaf_size=2)
+
+        assert p in g.children
+        assert len(g.children) == 3
+
 
 class TestTriangle:
     @staticmethod
@@ -681,6 +1058,19 @@ class TestTriangle:
         assert len(xs) == 1
         assert xs[0].t == 2
 
+    def test_baking_a_transform_into_a_triangle(self) -> None:
+        t = self.create_standard_triangle()
+        t.set_transform(Transforms.scaling(-1, 2, 1))
+        m = Transforms.translation(0, 0, 5)
+        normal = t.normal_at(Point(0, 0, 0))
+
+        t.bake(m)
+
+        assert t.transform == Matrix.Identity()
+        assert t.verts == [Point(0, 2, 5), Point(1, 0, 5), Point(-1, 0, 5)]
+        assert t.bounds == Bounds(Point(-1, 0, 5), Point(1, 2, 5))
+        assert t.normal_at(Point(0, 0, 0)) == normal
+
 
 class TestSmoothTriangle:
     def create_standard_triangle(self) -> None:
@@ -727,6 +1117,270 @@ class TestSmoothTriangle:
 
         assert comps.normalv == Vector(-0.5547, 0.83205, 0)
 
+    def test_baking_a_transform_into_a_smooth_triangle(self) -> None:
+        t = self.create_standard_triangle()
+        t.set_transform(Transforms.scaling(1, 2, 3) * Transforms.rotation_z(0.5))
+        r = Ray(Point(0, 0.4, -5), Vector(0, 0, 1))
+        before = t.intersect(r)[0]
+        normal = t.normal_at(r.position(before.t), before)
+
+        t.bake(Transforms.translation(0, 0, 0))
+        after = t.intersect(r)[0]
+
+        assert t.transform == Matrix.Identity()
+        assert math.isclose(after.t, before.t)
+        assert math.isclose(after.u, before.u)  # type: ignore[arg-type]
+        assert math.isclose(after.v, before.v)  # type: ignore[arg-type]
+        assert t.normal_at(r.position(after.t), after) == normal
+
+
+class TestTriangleBatch:
+    @staticmethod
+    def arrays(
+        triangles: list[Triangle],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            np.array([[t.verts[0].x, t.verts[0].y, t.verts[0].z] for t in triangles]),
+            np.array([[t.edges[0].x, t.edges[0].y, t.edges[0].z] for t in triangles]),
+            np.array([[t.edges[1].x, t.edges[1].y, t.edges[1].z] for t in triangles]),
+        )
+
+    def test_a_batch_of_triangles_is_hit_like_each_triangle(self) -> None:
+        triangles = [
+            Triangle(Point(0, 1, z), Point(-1, 0, z), Point(1, 0, z)) for z in range(5)
+        ]
+        triangles.append(Triangle(Point(0, 0, 2), Point(1, 0, 2), Point(0, 0, 3)))
+        p1, e1, e2 = self.arrays(triangles)
+
+        for r in [
+            Ray(Point(0, 0.5, -2), Vector(0, 0, 1)),
+            Ray(Point(1, 1, -2), Vector(0, 0, 1)),
+            Ray(Point(-0.5, 0.25, -2), Vector(0, 0.1, 1)),
+        ]:
+            index, t, u, v = intersect_triangles(
+                (r.origin.x, r.origin.y, r.origin.z),
+                (r.direction.x, r.direction.y, r.direction.z),
+                p1,
+                e1,
+                e2,
+            )
+            expected = [(k, tri._local_intersect(r)) for k, tri in enumerate(triangles)]
+
+            assert index.tolist() == [k for k, xs in expected if xs]
+            assert t.tolist() == pytest.approx([xs[0].t for _, xs in expected if xs])
+
+
+class TestTriangleMesh:
+    @staticmethod
+    def grid(n: int = 6) -> tuple[np.ndarray, np.ndarray]:
+        """A bumpy n x n grid of vertices split into two triangles per cell"""
+        vertices = np.array(
+            [(x, y, math.sin(x) * math.cos(y)) for y in range(n) for x in range(n)],
+            dtype=np.float64,
+        )
+        triangles = []
+
+        for y in range(n - 1):
+            for x in range(n - 1):
+                a = y * n + x
+                triangles.append((a, a + 1, a + n + 1))
+                triangles.append((a, a + n + 1, a + n))
+
+        return vertices, np.array(triangles)
+
+    @staticmethod
+    def rays() -> list[Ray]:
+        return [
+            Ray(Point(x + 0.3, y + 0.6, -5), Vector(0.1, -0.05, 1))
+            for y in range(-1, 6)
+            for x in range(-1, 6)
+        ]
+
+    def test_a_mesh_is_bounded_by_its_vertices(self) -> None:
+        vertices, triangles = self.grid()
+        m = TriangleMesh(vertices, triangles)
+
+        assert m.face_count == 50
+        assert m.bounds.low == Point(0, 0, vertices[:, 2].min())
+        assert m.bounds.high == Point(5, 5, vertices[:, 2].max())
+
+    def test_a_mesh_matches_the_equivalent_triangles(self) -> None:
+        vertices, triangles = self.grid()
+        m = TriangleMesh(vertices, triangles)
+        g = Group()
+        g.extend(Triangle(*(Point(*vertices[i]) for i in t)) for t in triangles)
+
+        for r in self.rays():
+            xs = m.intersect(r)
+            expected = g.intersect(r)
+
+            assert [i.t for i in xs] == pytest.approx([e.t for e in expected])
+
+            for i, e in zip(xs, expected):
+                assert i.obj is m
+                assert triangles[i.face].tolist() == [
+                    vertices.tolist().index([p.x, p.y, p.z]) for p in e.obj.verts
+                ]
+                assert m.normal_at(r.position(i.t), i) == e.obj.normal_at(
+                    r.position(e.t), e
+                )
+
+    def test_flattening_cancelling_transforms_leaves_a_mesh_in_place(self) -> None:
+        vertices = np.array([(0, 1, 0), (-1, 0, 0), (1, 0, 0)], dtype=np.float64)
+        m = TriangleMesh(vertices, np.array([(0, 1, 2)]))
+        m.set_transform(Transforms.translation(5, 0, 0))
+        g = Group()
+        g.set_transform(Transforms.translation(-5, 0, 0))
+        g.add_child(m)
+        r = Ray(Point(0, 0.5, -2), Vector(0, 0, 1))
+
+        assert [i.t for i in g.intersect(r)] == [pytest.approx(2.0)]
+
+        g.flatten()
+
+        assert m.transform == Matrix.Identity()
+        assert [i.t for i in g.intersect(r)] == [pytest.approx(2.0)]
+
+    def test_a_mesh_with_normals_is_smooth_shaded(self) -> None:
+        vertices = np.array([(0, 1, 0), (-1, 0, 0), (1, 0, 0)])
+        normals = np.array([(0, 1, 0), (-1, 0, 0), (1, 0, 0)])
+        m = TriangleMesh(
+            vertices, np.array([(0, 1, 2)]), normals, np.array([(0, 1, 2)])
+        )
+        r = Ray(Point(-0.2, 0.3, -2), Vector(0, 0, 1))
+
+        xs = m.intersect(r)
+
+        assert math.isclose(xs[0].u, 0.45, abs_tol=EPSILON)
+        assert math.isclose(xs[0].v, 0.25, abs_tol=EPSILON)
+        assert m.normal_at(Point(0, 0, 0), xs[0]) == Vector(-0.5547, 0.83205, 0)
+
+    def test_baking_a_mesh_keeps_its_hits_and_normals(self) -> None:
+        vertices, triangles = self.grid()
+        moved = TriangleMesh(vertices, triangles)
+        moved.set_transform(
+            Transforms.scaling(-1, 2, 1) * Transforms.rotation_x(math.pi / 5)
+        )
+        baked = TriangleMesh(vertices, triangles)
+        baked.bake(moved.transform)
+
+        # The baked bounds fit the moved vertices rather than enclosing a moved box
+        outer = moved.bounds.transform(moved.transform)
+
+        assert baked.transform == Matrix.Identity()
+        assert outer.merge(baked.bounds) == outer
+
+        for r in self.rays():
+            xs = baked.intersect(r)
+            expected = moved.intersect(r)
+
+            assert [i.t for i in xs] == pytest.approx([e.t for e in expected])
+
+            for i, e in zip(xs, expected):
+                assert baked.normal_at(r.position(i.t), i) == moved.normal_at(
+                    r.position(e.t), e
+                )
+
+
+class TestMaterialInheritance:
+    red = Material(Colours.RED)
+    blue = Material(Colours.BLUE)
+
+    def test_children_inherit_the_material_of_their_group(self) -> None:
+        g = Group()
+        s = Sphere()
+        g.add_child(s)
+        g.material = self.red
+        g.resolve_materials()
+
+        assert s.effective_material is self.red
+        assert s.material == Material()
+
+    def test_own_materials_and_the_nearest_group_take_precedence(self) -> None:
+        outer = Group()
+        outer.material = self.red
+        inner = Group()
+        inner.material = self.blue
+        s1 = Sphere()
+        s2 = Sphere()
+        s2.material = Material(Colours.GREEN)
+        s3 = Sphere()
+        inner.extend([s1, s2])
+        outer.extend([inner, s3])
+        outer.resolve_materials()
+
+        assert s1.effective_material is self.blue
+        assert s2.effective_material.colour == Colours.GREEN
+        assert s3.effective_material is self.red
+
+    def test_a_default_material_group_passes_on_what_it_inherits(self) -> None:
+        outer = Group()
+        outer.material = self.red
+        inner = Group()
+        s = Sphere()
+        inner.add_child(s)
+        outer.add_child(inner)
+        outer.resolve_materials()
+
+        assert inner.effective_material is self.red
+        assert s.effective_material is self.red
+
+    def test_a_material_given_with_the_default_settings_is_not_inherited(
+        self,
+    ) -> None:
+        g = Group()
+        g.material = self.red
+        s = Sphere()
+        s.material = Material()
+        g.add_child(s)
+        g.resolve_materials()
+
+        assert s.effective_material.colour == Colours.WHITE
+
+    def test_the_world_passes_on_materials_given_after_it_was_prepared(self) -> None:
+        g = Group()
+        s = Sphere()
+        g.add_child(s)
+        w = World()
+        w.objects = [g]
+        w.prepare()
+        g.material = self.red
+        w.prepare()
+
+        assert s.effective_material is self.red
+
+    def test_csg_operands_inherit_the_material_of_the_csg(self) -> None:
+        s1 = Sphere()
+        s2 = Cube()
+        c = CSG(CSGOperation.difference, s1, s2)
+        c.material = self.red
+        c.resolve_materials()
+
+        assert s1.effective_material is self.red
+        assert s2.effective_material is self.red
+
+    def test_flattening_keeps_the_materials_of_flattened_groups(self) -> None:
+        outer = Group()
+        inner = Group()
+        inner.material = self.red
+        s = Sphere()
+        inner.add_child(s)
+        outer.add_child(inner)
+        outer.flatten()
+        outer.resolve_materials()
+
+        assert outer.children == [s]
+        assert s.effective_material is self.red
+
+    def test_a_linear_hierarchy_passes_its_material_on(self) -> None:
+        g = Group()
+        g.extend([Sphere() for _ in range(10)])
+        g.material = self.red
+        bvh = g.optimize(leaf_size=2, linear=True)
+        bvh.resolve_materials()
+
+        assert all(s.effective_material is self.red for s in bvh.leaves())
+
 
 class TestCSGShape:
     def test_csg_is_created_with_an_operation_and_two_shapes(self) -> None:
@@ -822,3 +1476,288 @@ class TestCSGShape:
         assert xs[0].obj == s1
         assert xs[1].t == 6.5
         assert xs[1].obj == s2
+
+    def test_filtering_intersections_when_operands_are_groups(self) -> None:
+        s1 = Sphere()
+        s2 = Cube()
+        g1 = Group()
+        g1.add_child(s1)
+        g2 = Group()
+        g2.add_child(s2)
+        c = CSG(CSGOperation.difference, g1, g2)
+        xs = [
+            Intersection(1, s1),
+            Intersection(2, s2),
+            Intersection(3, s1),
+            Intersection(4, s2),
+        ]
+
+        result = c.filter_intersections(xs)
+
+        assert len(result) == 2
+        assert result[0] == xs[0]
+        assert result[1] == xs[1]
+
+    def test_leaf_index_tracks_children_added_after_construction(self) -> None:
+        g = Group()
+        c = CSG(CSGOperation.union, g, Sphere())
+        outer = CSG(CSGOperation.difference, Cube(), c)
+
+        s = Sphere()
+        g.add_child(s)
+
+        assert c._sides[s] is True
+        assert outer._sides[s] is False
+
+    def test_replacing_an_operand_reindexes_the_csg(self) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+        c = CSG(CSGOperation.union, s1, Cube())
+
+        c.left = s2
+
+        assert s1 not in c._sides
+        assert c._sides[s2] is True
+        assert s2.parent == c
+
+    @pytest.mark.parametrize(
+        "op,low,high",
+        [
+            (CSGOperation.union, Point(-1, -1, -1), Point(3, 1, 1)),
+            (CSGOperation.intersection, Point(1, -1, -1), Point(1, 1, 1)),
+            (CSGOperation.difference, Point(-1, -1, -1), Point(1, 1, 1)),
+        ],
+    )
+    def test_csg_bounds_depend_on_the_operation(
+        self, op: CSGOperation, low: Point, high: Point
+    ) -> None:
+        s1 = Sphere()
+        s2 = Cube()
+        s2.set_transform(Transforms.translation(2, 0, 0))
+        c = CSG(op, s1, s2)
+
+        assert c.bounds == Bounds(low, high)
+
+    def test_csg_bounds_follow_operands_moved_after_construction(self) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+        c = CSG(CSGOperation.union, s1, s2)
+
+        s2.set_transform(Transforms.translation(0, 5, 0))
+
+        assert c.bounds == Bounds(Point(-1, -1, -1), Point(1, 6, 1))
+
+    def test_a_group_containing_a_csg_uses_its_bounds(self) -> None:
+        c = CSG(CSGOperation.intersection, Sphere(), Sphere())
+        c.set_transform(Transforms.translation(10, 0, 0))
+        g = Group()
+        g.add_child(c)
+
+        assert g.bounds == Bounds(Point(9, -1, -1), Point(11, 1, 1))
+
+    def test_a_ray_missing_the_csg_bounds_is_rejected_early(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+        c = CSG(CSGOperation.intersection, s1, s2)
+
+        def fail(_: Sphere, __: Ray, ___: list[Intersection]) -> None:
+            raise AssertionError("operand should not have been intersected")
+
+        # Objects are slotted, so it's the class that gets patched
+        monkeypatch.setattr(Sphere, "intersect_into", fail)
+
+        assert c.intersect(Ray(Point(0, 5, -5), Vector(0, 0, 1))) == []
+
+    def test_difference_skips_a_right_operand_the_ray_cannot_reach(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        s1 = Sphere()
+        s2 = Sphere()
+        s2.set_transform(Transforms.translation(0, 1.5, 0))
+        c = CSG(CSGOperation.difference, s1, s2)
+
+        intersect_into = Sphere.intersect_into
+
+        def fail(s: Sphere, ray: Ray, xs: list[Intersection]) -> None:
+            if s is s2:
+                raise AssertionError("right operand should not have been intersected")
+
+            intersect_into(s, ray, xs)
+
+        monkeypatch.setattr(Sphere, "intersect_into", fail)
+
+        xs = c.intersect(Ray(Point(0, -0.75, -5), Vector(0, 0, 1)))
+
+        assert len(xs) == 2
+        assert all(i.obj == s1 for i in xs)
+
+
+class TestInstance:
+    @staticmethod
+    def mesh() -> Group:
+        g = Group()
+        s = Sphere()
+        s.set_transform(Transforms.translation(0, 0, 2))
+        g.add_child(s)
+        g.add_child(Triangle(Point(-1, 1, 0), Point(-1, -1, 0), Point(1, -1, 0)))
+        g.set_transform(Transforms.scaling(2, 2, 2))
+        return g
+
+    def test_instances_share_a_shape_without_adopting_it(self) -> None:
+        shape = self.mesh()
+        a = Instance(shape)
+        b = Instance(shape)
+        g = Group()
+        g.add_child(a)
+        g.add_child(b)
+
+        assert a.shape is b.shape is shape
+        assert shape.parent is None
+
+    def test_an_instanced_shape_cannot_have_a_parent(self) -> None:
+        shape = self.mesh()
+        Group().add_child(shape)
+
+        with pytest.raises(ValueError):
+            Instance(shape)
+
+    def test_the_bounds_of_an_instance_enclose_the_transformed_shape(self) -> None:
+        i = Instance(self.mesh())
+        i.set_transform(Transforms.translation(10, 0, 0))
+        g = Group()
+        g.add_child(i)
+
+        assert i.bounds == Bounds(Point(-2, -2, 0), Point(2, 2, 6))
+        assert g.bounds == Bounds(Point(8, -2, 0), Point(12, 2, 6))
+
+    def test_hits_and_normals_match_a_copy_of_the_shape(self) -> None:
+        m = Transforms.translation(3, 1, 0) * Transforms.rotation_y(math.pi / 6)
+        instance = Instance(self.mesh())
+        instance.set_transform(m)
+        copy = Group()
+        copy.set_transform(m)
+        copy.add_child(self.mesh())
+
+        for r in [
+            Ray(Point(2.5, 0.5, -10), Vector(0, 0, 1)),
+            Ray(Point(5, 1.5, -10), Vector(0, 0, 1)),
+            Ray(Point(-5, 1, 3), Vector(1, 0, 0.1)),
+        ]:
+            expected = copy.intersect(r)
+            xs = instance.intersect(r)
+
+            assert len(xs) == len(expected) > 0
+
+            for i, e in zip(xs, expected):
+                assert i.obj is instance
+                assert i.inner is not None and type(i.inner.obj) is type(e.obj)
+                assert i.t == pytest.approx(e.t)
+                assert Computation(i, r).normalv == Computation(e, r).normalv
+
+    def test_an_instance_overrides_the_shape_material(self) -> None:
+        shape = self.mesh()
+        shape.material = Material(colour=Colours.RED)
+        m = Material(colour=Colours.BLUE)
+        r = Ray(Point(0, 0, -10), Vector(0, 0, 1))
+
+        for instance, expected in [
+            (Instance(shape), shape.material),
+            (Instance(shape, m), m),
+        ]:
+            w = World()
+            w.objects = [instance]
+            hit = w.intersect(r)[0]
+
+            assert Computation(hit, r).material is expected
+
+    def test_an_instance_shows_the_materials_of_the_shape_surfaces(self) -> None:
+        g = Group()
+        red = Sphere()
+        red.set_transform(Transforms.translation(-2, 0, 0))
+        red.material = Material(colour=Colours.RED)
+        blue = Sphere()
+        blue.set_transform(Transforms.translation(2, 0, 0))
+        blue.material = Material(colour=Colours.BLUE)
+        g.add_child(red)
+        g.add_child(blue)
+        w = World()
+        w.objects = [Instance(g)]
+
+        for x, expected in [(-2, Colours.RED), (2, Colours.BLUE)]:
+            r = Ray(Point(x, 0, -10), Vector(0, 0, 1))
+            hit = w.intersect(r)[0]
+
+            assert Computation(hit, r).material.colour == expected
+
+    def test_patterns_show_through_an_instance_as_on_the_shape(self) -> None:
+        def shape() -> Group:
+            s = Sphere()
+            s.set_transform(Transforms.scaling(4, 4, 4))
+            s.material = Material(Patterns.Stripes(Colours.RED, Colours.BLUE))
+            g = Group()
+            g.set_transform(Transforms.translation(0.5, 0, 0))
+            g.add_child(s)
+            return g
+
+        m = Transforms.translation(-1, 0.5, 0) * Transforms.rotation_z(0.3)
+        direct = Group()
+        direct.set_transform(m)
+        direct.add_child(shape())
+        instance = Instance(shape())
+        instance.set_transform(m)
+
+        c = Camera(21, 21, math.pi / 3)
+        c.transform = Transforms.view(Point(0, 0, -15), Point(0, 0, 0), Vector(0, 1, 0))
+        images = []
+
+        for o in [direct, instance]:
+            w = World(default=True)
+            w.objects = [o]
+            images.append(c.render(w))
+
+        for y in range(21):
+            for x in range(21):
+                assert images[1].get_pixel(x, y) == images[0].get_pixel(x, y)
+
+
+class TestBounds:
+    def test_transforming_bounds_encloses_the_transformed_box(self) -> None:
+        b = Bounds(Point(-1, -1, -1), Point(1, 1, 1))
+        m = Transforms.translation(1, 2, 3) * Transforms.rotation_y(math.pi / 4)
+
+        assert b.transform(m) == Bounds(
+            Point(1 - ROOT2, 1, 3 - ROOT2), Point(1 + ROOT2, 3, 3 + ROOT2)
+        )
+
+    def test_transforming_infinite_bounds_does_not_produce_nan(self) -> None:
+        b = Plane().bounds
+        t = b.transform(Transforms.rotation_x(math.pi / 2))
+
+        corners = [t.low.x, t.low.y, t.low.z, t.high.x, t.high.y, t.high.z]
+
+        assert not any(math.isnan(c) for c in corners)
+        assert t.low.y == -math.inf
+        assert t.high.x == math.inf
+
+    def test_merging_and_overlapping_bounds(self) -> None:
+        a = Bounds(Point(0, 0, 0), Point(2, 2, 2))
+        b = Bounds(Point(1, 1, 1), Point(3, 3, 3))
+
+        assert a.merge(b) == Bounds(Point(0, 0, 0), Point(3, 3, 3))
+        assert a.overlap(b) == Bounds(Point(1, 1, 1), Point(2, 2, 2))
+
+    def test_the_overlap_of_disjoint_bounds_is_empty(self) -> None:
+        a = Bounds(Point(0, 0, 0), Point(1, 1, 1))
+        b = Bounds(Point(2, 2, 2), Point(3, 3, 3))
+        r = Ray(Point(-5, 0.5, 0.5), Vector(1, 0, 0))
+
+        assert a.overlap(b).is_empty()
+        assert a.overlap(b).ray_span(r) is None
+
+    def test_the_span_of_a_ray_through_bounds(self) -> None:
+        b = Bounds(Point(-1, -1, -1), Point(1, 1, 1))
+
+        assert b.ray_span(Ray(Point(0, 0, -5), Vector(0, 0, 1))) == (4, 6)
+        assert b.ray_span(Ray(Point(0, 2, -5), Vector(0, 0, 1))) is None
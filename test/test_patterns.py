@@ -1,9 +1,21 @@
+import gc
+import math
+import pickle
+import warnings
+import weakref
+
+import numpy as np
+import pytest
+
 import ray_tracer.patterns as Patterns
 from ray_tracer.classes.colour import Colour, Colours
 from ray_tracer.classes.matrix import Matrix
 from ray_tracer.classes.point import Point
 from ray_tracer.classes.transforms import Transforms
+from ray_tracer.objects.group import Group
 from ray_tracer.objects.sphere import Sphere
+from ray_tracer.patterns.compiled import _PLACEMENTS, compiled
+from ray_tracer.patterns.noise import DEFAULT_SEED
 
 
 class TestPatterns:
@@ -110,3 +122,168 @@ class TestPatterns:
             assert pattern.colour_at(Point(0, 0, 0)) == Colours.WHITE
             assert pattern.colour_at(Point(0, 0, 0.99)) == Colours.WHITE
             assert pattern.colour_at(Point(0, 0, 1.01)) == Colours.BLACK
+
+    class TestNoise:
+        def test_each_noise_pattern_has_its_own_noise(self) -> None:
+            n = Patterns.Noise(Colours.WHITE, Colours.BLACK, 1)
+            before = n.noise(0.3, 0.6, 0.9)
+
+            other = Patterns.Noise(Colours.WHITE, Colours.BLACK, 2)
+
+            assert n.noise(0.3, 0.6, 0.9) == before
+            assert other.noise(0.3, 0.6, 0.9) != before
+            assert (
+                Patterns.Noise(Colours.WHITE, Colours.BLACK, 1).noise(0.3, 0.6, 0.9)
+                == before
+            )
+
+        def test_noise_has_the_same_seed_unless_asked_for_a_random_one(
+            self,
+        ) -> None:
+            assert Patterns.Noise(Colours.WHITE, Colours.BLACK).seed == DEFAULT_SEED
+            assert Patterns.Noise(Colours.WHITE, Colours.BLACK, None).seed != (
+                DEFAULT_SEED
+            )
+
+        def test_a_copied_noise_pattern_gives_the_same_noise(self) -> None:
+            n = Patterns.Noise(Colours.WHITE, Colours.BLACK, None)
+            copy = pickle.loads(pickle.dumps(n))
+
+            assert copy.seed == n.seed
+            assert copy.noise(0.3, 0.6, 0.9) == n.noise(0.3, 0.6, 0.9)
+
+        def test_baked_noise_is_interpolated_inside_the_cube(self) -> None:
+            n = Patterns.Noise(Colours.WHITE, Colours.BLACK, 5)
+            baked = Patterns.Noise(Colours.WHITE, Colours.BLACK, 5).bake(8, 1.0)
+            points = np.random.default_rng(1).uniform(-1.5, 1.5, (200, 3))
+            inside = np.all(np.abs(points) <= 1.0, axis=1)
+
+            exact = n.noise_array(points)
+
+            with pytest.warns(UserWarning, match="outside the cube"):
+                approx = baked.noise_array(points)
+
+            assert approx.tolist() == [
+                pytest.approx(baked.noise(*p)) for p in points.tolist()
+            ]
+            assert np.abs(approx - exact)[inside].max() < 0.05
+            assert approx[~inside].tolist() == exact[~inside].tolist()
+
+            # Samples fall on the lattice exactly
+            assert baked.noise(0.125, -0.5, 1.0) == pytest.approx(
+                n.noise(0.125, -0.5, 1.0)
+            )
+
+        def test_baked_noise_warns_once_when_used_outside_the_cube(self) -> None:
+            baked = Patterns.Noise(Colours.WHITE, Colours.BLACK, 6).bake(4, 1.0)
+
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                baked.noise(0.5, 0.5, 0.5)
+                baked.noise(1.5, 0.5, 0.5)
+                baked.noise(0.5, -2.0, 0.5)
+
+            assert [str(w.message) for w in caught] == [
+                "Baked noise used outside the cube from -1.0 to 1.0, which will show "
+                "as a seam.  Bake it with a larger extent"
+            ]
+
+        def test_baked_samples_are_shared_while_in_use(self) -> None:
+            a = Patterns.Noise(Colours.WHITE, Colours.BLACK, 7).bake(4, 1.0)
+            b = Patterns.Noise(Colours.WHITE, Colours.BLACK, 7).bake(4, 1.0)
+            samples = weakref.ref(a._lattice)
+
+            assert a._lattice is b._lattice
+
+            del a, b
+            gc.collect()
+
+            assert samples() is None
+
+    class TestCompiledPatterns:
+        @staticmethod
+        def nested() -> tuple[Patterns.Checkerboard, Patterns.Stripes]:
+            inner = Patterns.Stripes(Colour(0.2, 0.75, 0.4), Colour(0.8, 0.6, 0.3))
+            inner.set_transform(Transforms.rotation_y(math.pi / 2))
+            stripes = Patterns.Stripes(Colours.BLUE, inner)
+            stripes.set_transform(Transforms.scaling(0.5, 0.5, 0.5))
+            gradient = Patterns.Gradient(Colours.RED, Colours.WHITE)
+            gradient.set_transform(Transforms.translation(0.3, 0, 0))
+            rings = Patterns.Rings(
+                Patterns.Noise(Colours.GREEN, Patterns.TestPattern(), 3), gradient
+            )
+            blend = Patterns.Blend(rings, stripes, 0.25)
+            blend.set_transform(Transforms.rotation_z(0.3))
+
+            return Patterns.Checkerboard(stripes, blend), inner
+
+        @staticmethod
+        def shape() -> Sphere:
+            g = Group()
+            g.set_transform(
+                Transforms.rotation_y(0.5) * Transforms.translation(1, 0, 0)
+            )
+            s = Sphere()
+            s.set_transform(Transforms.scaling(2, 1.5, 2))
+            g.add_child(s)
+
+            return s
+
+        def test_a_compiled_pattern_gives_the_same_colours(self) -> None:
+            pattern, _ = self.nested()
+            s = self.shape()
+            points = [
+                Point(x / 3, y / 5, z / 7)
+                for x in range(-6, 7)
+                for y in range(-6, 7)
+                for z in range(-3, 4)
+            ]
+            expected = [pattern.colour_at_object(s, p) for p in points]
+
+            c = compiled(pattern, s)
+            colours = c.colours(np.array([[p.x, p.y, p.z] for p in points]))
+
+            assert [c.colour_at(p) for p in points] == expected
+            assert colours.shape == (len(points), 3)
+            assert colours.tolist() == [
+                pytest.approx([e.red, e.green, e.blue]) for e in expected
+            ]
+
+        def test_a_pattern_is_compiled_again_once_it_changes(self) -> None:
+            pattern, inner = self.nested()
+            s = self.shape()
+            p = Point(0.3, 0.2, 0.1)
+
+            c = compiled(pattern, s)
+            assert compiled(pattern, s) is c
+
+            inner.set_transform(Transforms.translation(0.5, 0, 0))
+            assert compiled(pattern, s) is not c
+            assert compiled(pattern, s).colour_at(p) == pattern.colour_at_object(s, p)
+
+            s.set_transform(Transforms.scaling(3, 3, 3))
+            assert compiled(pattern, s).colour_at(p) == pattern.colour_at_object(s, p)
+
+        def test_objects_placed_alike_share_a_compiled_pattern(self) -> None:
+            pattern, _ = self.nested()
+            s1, s2 = self.shape(), self.shape()
+            s3 = Sphere()
+
+            assert compiled(pattern, s1) is compiled(pattern, s2)
+            assert compiled(pattern, s1) is not compiled(pattern, s3)
+
+        def test_only_so_many_placements_are_kept_compiled(self) -> None:
+            pattern = Patterns.Stripes(Colours.WHITE, Colours.BLACK)
+            s = Sphere()
+
+            for i in range(_PLACEMENTS + 10):
+                s.set_transform(Transforms.translation(i, 0, 0))
+                compiled(pattern, s)
+
+            assert len(pattern.__dict__["_compiled"][1]) == _PLACEMENTS
+
+        def test_compiled_patterns_are_not_pickled(self) -> None:
+            pattern, _ = self.nested()
+            compiled(pattern, self.shape())
+
+            assert "_compiled" not in pickle.loads(pickle.dumps(pattern)).__dict__
@@ -1,10 +1,11 @@
 import math
 
 import pytest
+from numpy.linalg import LinAlgError
 
 from ray_tracer.classes.matrix import Matrix
 from ray_tracer.classes.point import Point
-from ray_tracer.classes.transforms import Transforms
+from ray_tracer.classes.transforms import Transforms, _build
 from ray_tracer.classes.vector import Vector
 
 
@@ -140,6 +141,65 @@ class TestTransformations:
 
             assert t * p == Point(15, 0, 7)
 
+    class TestTransformChain:
+        def test_chain_steps_are_applied_in_the_order_given(self) -> None:
+            t = Transforms.chain().rotate_x(math.pi / 2).scale(5, 5, 5)
+            t = t.translate(10, 5, 7)
+
+            assert t.build() * Point(1, 0, 1) == Point(15, 0, 7)
+
+        def test_chain_matches_multiplying_the_transforms(self) -> None:
+            t = (
+                Transforms.chain()
+                .shear(1, 0, 0, 0.5, 0, 0)
+                .scale(2, -3, 0.5)
+                .rotate_z(0.3)
+                .rotate_y(-1.1)
+                .translate(1, 2, 3)
+            )
+            m: Matrix = (
+                Transforms.translation(1, 2, 3)
+                * Transforms.rotation_y(-1.1)
+                * Transforms.rotation_z(0.3)
+                * Transforms.scaling(2, -3, 0.5)
+                * Transforms.shearing(1, 0, 0, 0.5, 0, 0)
+            )
+
+            assert t.build() == m
+            assert t.build().inverse() == Matrix(m.data.tolist()).inverse()
+
+        def test_identical_chains_are_interned(self) -> None:
+            start = Transforms.chain().scale(0.5, 0.5, 0.5)
+            a = start.translate(1, -1, 1).build()
+            b = Transforms.chain().scale(0.5, 0.5, 0.5).translate(1, -1, 1).build()
+
+            assert a is b
+            assert a.inverse() is b.inverse()
+            assert a.inverse().inverse() is a
+            assert start.then(Transforms.chain().translate(1, -1, 1)).build() is a
+
+        def test_only_the_most_recent_chains_are_interned(self) -> None:
+            limit = _build.cache_info().maxsize
+            assert limit is not None
+
+            for i in range(limit + 10):
+                Transforms.chain().translate(i, 0.25, 0.5).build()
+
+            assert _build.cache_info().currsize == limit
+
+        def test_chained_transforms_are_frozen(self) -> None:
+            m = Transforms.chain().translate(1, 2, 3).build()
+
+            assert m.frozen
+            with pytest.raises(ValueError, match="frozen"):
+                m[0, 3] = 5
+
+        def test_a_singular_chain_has_no_inverse(self) -> None:
+            m = Transforms.chain().scale(1, 0, 1).translate(1, 2, 3).build()
+
+            with pytest.raises(LinAlgError, match="not invertible"):
+                m.inverse()
+
     class TestViewTransform:
         def test_the_transformation_for_the_default_orientation(self) -> None:
             from_ = Point(0, 0, 0)
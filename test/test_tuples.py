@@ -204,3 +204,31 @@ class TestTuples:
         r = v.reflect(n)
 
         assert r == Vector(1, 0, 0)
+
+    def test_points_and_vectors_have_no_instance_dict(self) -> None:
+        for a in (Point(1, 2, 3), Vector(1, 2, 3)):
+            assert not hasattr(a, "__dict__")
+
+            with pytest.raises(AttributeError):
+                a.q = 1  # type: ignore[attr-defined]
+
+    def test_direct_construction_matches_the_constructors(self) -> None:
+        assert Point.of(1, 2, 3) == Point(1, 2, 3)
+        assert type(Point.of(1, 2, 3)) is Point
+        assert Vector.of(1, 2, 3) == Vector(1, 2, 3)
+        assert type(Vector.of(1, 2, 3)) is Vector
+
+    def test_arithmetic_keeps_point_and_vector_types(self) -> None:
+        p = Point(1, 2, 3)
+        v = Vector(4, 5, 6)
+
+        assert type(p + v) is Point
+        assert type(v + p) is Point
+        assert type(p - p) is Vector
+        assert type(p - v) is Point
+        assert type(v - v) is Vector
+        assert type(-v) is Vector
+        assert type(v * 2) is Vector
+        assert type(v / 2) is Vector
+        assert type(v.normalize()) is Vector
+        assert type(v.cross(v)) is Vector
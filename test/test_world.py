@@ -1,4 +1,5 @@
 import math
+import pickle
 
 import pytest
 
@@ -12,6 +13,7 @@ from ray_tracer.classes.transforms import Transforms
 from ray_tracer.classes.vector import Vector
 from ray_tracer.constants import EPSILON, ROOT2
 from ray_tracer.lights.point_light import PointLight
+from ray_tracer.objects.group import Group
 from ray_tracer.objects.plane import Plane
 from ray_tracer.objects.sphere import Sphere
 from ray_tracer.patterns.test_pattern import TestPattern
@@ -36,8 +38,8 @@ class TestWorld:
         w = World(True)
 
         assert light in w.lights
-        assert s1 in w.objects
-        assert s2 in w.objects
+        assert any(s1.structurally_equal(o) for o in w.objects)
+        assert any(s2.structurally_equal(o) for o in w.objects)
 
     def test_intersecting_a_world_with_a_ray(self) -> None:
         w = World(True)
@@ -51,6 +53,72 @@ class TestWorld:
         assert xs[2].t == 5.5
         assert xs[3].t == 6
 
+    def test_intersecting_a_world_tests_unbounded_objects_every_time(self) -> None:
+        w = World(True)
+        floor = Plane()
+        floor.set_transform(Transforms.translation(0, -1, 0))
+        w.objects.append(floor)
+
+        xs = w.intersect(Ray(Point(10, 5, 0), Vector(0, -1, 0)))
+
+        assert [i.obj for i in xs] == [floor]
+        assert w.prepare().unbounded == [floor]
+        assert floor.parent is None
+
+    def test_adding_and_replacing_objects_rebuilds_the_index(self) -> None:
+        w = World(True)
+        r = Ray(Point(10, 0, -5), Vector(0, 0, 1))
+        s = Sphere()
+        s.set_transform(Transforms.translation(10, 0, 0))
+
+        assert w.intersect(r) == []
+
+        w.objects.append(s)
+        assert [i.t for i in w.intersect(r)] == [4, 6]
+
+        del w.objects[-1]
+        assert w.intersect(r) == []
+
+        w.objects[0] = s
+        assert [i.t for i in w.intersect(r)] == [4, 6]
+
+        w.objects = [Sphere()]
+        assert w.intersect(r) == []
+
+    def test_moving_an_object_refits_the_index(self) -> None:
+        w = World(True)
+        r = Ray(Point(10, 0, -5), Vector(0, 0, 1))
+        index = w.prepare()
+
+        assert w.intersect(r) == []
+
+        w.objects[0].set_transform(Transforms.translation(10, 0, 0))
+
+        assert [i.t for i in w.intersect(r)] == [4, 6]
+        assert w.prepare() is index
+
+    def test_the_index_is_reused_while_nothing_changes(self) -> None:
+        w = World(True)
+
+        index = w.prepare()
+        w.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+
+        assert w.prepare() is index
+
+    def test_shading_uses_the_material_inherited_from_a_group(self) -> None:
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        material = Material(Colour(0.8, 1.0, 0.6), diffuse=0.7, specular=0.2)
+
+        w = World(True)
+        expected = w.colour_at(r)
+
+        g = Group()
+        g.add_child(Sphere())
+        g.material = material
+        w.objects[0] = g
+
+        assert w.colour_at(r) == expected
+
     def test_shading_an_intersection(self) -> None:
         w = World(True)
         r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
@@ -322,3 +390,17 @@ class TestWorld:
         c = w.shade_hit(comps, 5)
 
         assert c == Colour(0.92590, 0.68643, 0.68642)
+
+    def test_a_pickled_world_keeps_inherited_materials(self) -> None:
+        w = World(default=True)
+        g = Group()
+        g.material = Material(Colours.RED)
+        g.add_child(Sphere())
+        w.objects = [g]
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        expected = w.colour_at(r)
+
+        copy = pickle.loads(pickle.dumps(w))
+
+        assert expected.red > 0.5 > expected.green
+        assert copy.colour_at(r) == expected
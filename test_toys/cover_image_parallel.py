@@ -1,12 +1,10 @@
 import math
-from typing import cast
 
 from ray_tracer.camera import Camera
 from ray_tracer.classes.colour import Colour, Colours
 from ray_tracer.classes.material import Material
-from ray_tracer.classes.matrix import Matrix
 from ray_tracer.classes.point import Point
-from ray_tracer.classes.transforms import Transforms
+from ray_tracer.classes.transforms import TransformChain, Transforms
 from ray_tracer.classes.vector import Vector
 from ray_tracer.lights.point_light import PointLight
 from ray_tracer.objects.cube import Cube
@@ -42,24 +40,21 @@ materials = {
 }
 
 transforms = {
-    "standard": cast(
-        Matrix, Transforms.translation(1, -1, 1) * Transforms.scaling(0.5, 0.5, 0.5)
-    ),
+    "standard": Transforms.chain().scale(0.5, 0.5, 0.5).translate(1, -1, 1),
 }
 
-transforms["large"] = cast(
-    Matrix, transforms["standard"] * Transforms.scaling(3.5, 3.5, 3.5)
-)
-transforms["medium"] = cast(
-    Matrix, transforms["standard"] * Transforms.scaling(3, 3, 3)
+transforms["large"] = (
+    Transforms.chain().scale(3.5, 3.5, 3.5).then(transforms["standard"])
 )
-transforms["small"] = cast(Matrix, transforms["standard"] * Transforms.scaling(2, 2, 2))
+transforms["medium"] = Transforms.chain().scale(3, 3, 3).then(transforms["standard"])
+transforms["small"] = Transforms.chain().scale(2, 2, 2).then(transforms["standard"])
 
 
-def add_cube(mat: Material, obj_type: Matrix, position: Matrix) -> Cube:
+def add_cube(mat: Material, obj_type: TransformChain, position: TransformChain) -> Cube:
+    # Cubes of the same size in the same place share one interned transform
     c = Cube()
     c.material = mat
-    c.set_transform(cast(Matrix, position * obj_type))
+    c.set_transform(obj_type.then(position).build())
     return c
 
 
@@ -78,10 +73,7 @@ def run() -> None:
     backdrop = Plane()
     backdrop.material = Material(Colours.WHITE, ambient=1, diffuse=0, specular=0)
     backdrop.set_transform(
-        cast(
-            Matrix,
-            Transforms.translation(0, 0, 500) * Transforms.rotation_x(math.pi / 2),
-        )
+        Transforms.chain().rotate_x(math.pi / 2).translate(0, 0, 500).build()
     )
 
     s1 = Sphere()
@@ -95,7 +87,7 @@ def run() -> None:
         transparency=0.7,
         refractive_index=1.5,
     )
-    s1.set_transform(transforms["large"])
+    s1.set_transform(transforms["large"].build())
 
     world.objects = [backdrop, s1]
 
@@ -103,14 +95,14 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["medium"],
-            Transforms.translation(4, 0, 0),
+            Transforms.chain().translate(4, 0, 0),
         )
     )
     world.objects.append(
         add_cube(
             materials["blue"],
             transforms["large"],
-            Transforms.translation(8.5, 1.5, -0.5),
+            Transforms.chain().translate(8.5, 1.5, -0.5),
         )
     )
 
@@ -118,7 +110,7 @@ def run() -> None:
         add_cube(
             materials["red"],
             transforms["large"],
-            Transforms.translation(0, 0, 4),
+            Transforms.chain().translate(0, 0, 4),
         )
     )
 
@@ -126,7 +118,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["small"],
-            Transforms.translation(4, 0, 4),
+            Transforms.chain().translate(4, 0, 4),
         )
     )
 
@@ -134,7 +126,7 @@ def run() -> None:
         add_cube(
             materials["purple"],
             transforms["medium"],
-            Transforms.translation(7.5, 0.5, 4),
+            Transforms.chain().translate(7.5, 0.5, 4),
         )
     )
 
@@ -142,7 +134,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["medium"],
-            Transforms.translation(-0.25, 0.25, 8),
+            Transforms.chain().translate(-0.25, 0.25, 8),
         )
     )
 
@@ -150,7 +142,7 @@ def run() -> None:
         add_cube(
             materials["blue"],
             transforms["large"],
-            Transforms.translation(4, 1, 7.5),
+            Transforms.chain().translate(4, 1, 7.5),
         )
     )
 
@@ -158,7 +150,7 @@ def run() -> None:
         add_cube(
             materials["red"],
             transforms["medium"],
-            Transforms.translation(10, 2, 7.5),
+            Transforms.chain().translate(10, 2, 7.5),
         )
     )
 
@@ -166,7 +158,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["small"],
-            Transforms.translation(8, 2, 12),
+            Transforms.chain().translate(8, 2, 12),
         )
     )
 
@@ -174,7 +166,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["small"],
-            Transforms.translation(20, 1, 9),
+            Transforms.chain().translate(20, 1, 9),
         )
     )
 
@@ -182,7 +174,7 @@ def run() -> None:
         add_cube(
             materials["blue"],
             transforms["large"],
-            Transforms.translation(-0.5, -5, 0.25),
+            Transforms.chain().translate(-0.5, -5, 0.25),
         )
     )
 
@@ -190,7 +182,7 @@ def run() -> None:
         add_cube(
             materials["red"],
             transforms["large"],
-            Transforms.translation(4, -4, 0),
+            Transforms.chain().translate(4, -4, 0),
         )
     )
 
@@ -198,7 +190,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["large"],
-            Transforms.translation(8.5, -4, 0),
+            Transforms.chain().translate(8.5, -4, 0),
         )
     )
 
@@ -206,7 +198,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["large"],
-            Transforms.translation(0, -4, 4),
+            Transforms.chain().translate(0, -4, 4),
         )
     )
 
@@ -214,7 +206,7 @@ def run() -> None:
         add_cube(
             materials["purple"],
             transforms["large"],
-            Transforms.translation(-0.5, -4.5, 8),
+            Transforms.chain().translate(-0.5, -4.5, 8),
         )
     )
 
@@ -222,7 +214,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["large"],
-            Transforms.translation(0, -8, 4),
+            Transforms.chain().translate(0, -8, 4),
         )
     )
 
@@ -230,7 +222,7 @@ def run() -> None:
         add_cube(
             materials["white"],
             transforms["large"],
-            Transforms.translation(-0.5, -8.5, 8),
+            Transforms.chain().translate(-0.5, -8.5, 8),
         )
     )
 